@@ -14,6 +14,7 @@ import "./App.css";
 
 function App() {
   const [conversations, setConversations] = useState([]);
+  const [conversationsCursor, setConversationsCursor] = useState(null);
   const [activeConversation, setActiveConversation] = useState(null);
   const [user, setUser] = useState(null);
   const [authReady, setAuthReady] = useState(false);
@@ -93,9 +94,22 @@ function App() {
   const loadConversations = async () => {
     try {
       const data = await getConversations();
-      setConversations(data);
+      setConversations(data.results || []);
+      setConversationsCursor(data.next_cursor || null);
     } catch (error) {
       setConversations([]);
+      setConversationsCursor(null);
+    }
+  };
+
+  const loadMoreConversations = async () => {
+    if (!conversationsCursor) return;
+    try {
+      const data = await getConversations(conversationsCursor);
+      setConversations((prev) => [...prev, ...(data.results || [])]);
+      setConversationsCursor(data.next_cursor || null);
+    } catch (error) {
+      // Keep the pages that are already loaded.
     }
   };
 
@@ -127,6 +141,7 @@ function App() {
     clearAuthTokens();
     setUser(null);
     setConversations([]);
+    setConversationsCursor(null);
     setActiveConversation(null);
     setIsProfileOpen(false);
     setIsProfileModalOpen(false);
@@ -277,6 +292,8 @@ function App() {
                 setActiveConversation={setActiveConversation}
                 createNewChat={createNewChat}
                 onDeleteConversation={handleDeleteConversation}
+                hasMoreConversations={Boolean(conversationsCursor)}
+                onLoadMoreConversations={loadMoreConversations}
                 onNavigate={() => setIsSidebarOpen(false)}
               />
             </aside>
@@ -288,6 +305,8 @@ function App() {
             setActiveConversation={setActiveConversation}
             createNewChat={createNewChat}
             onDeleteConversation={handleDeleteConversation}
+            hasMoreConversations={Boolean(conversationsCursor)}
+            onLoadMoreConversations={loadMoreConversations}
           />
         )}
         <ChatWindow
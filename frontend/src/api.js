@@ -75,6 +75,8 @@ async function request(path, options = {}, requireAuth = true) {
 
   if (!response.ok) {
     const error =
+      // Busy/rate-limit answers (429/503) carry a readable `response` and `retry_after`.
+      (data?.retry_after && data?.response) ||
       data?.error ||
       data?.detail ||
       (rawText && rawText.startsWith("<!DOCTYPE") ? "Server returned HTML error page. Check backend logs/migrations." : rawText) ||
@@ -156,12 +158,24 @@ export async function sendMessage(
   });
 }
 
-export async function getConversation(id) {
-  return request(`conversation/${id}/`);
+// Returns { results, next_cursor, has_more }; `before` pages back through older
+// messages, `since` fetches only messages newer than that chat id.
+export async function getConversation(id, { before = null, since = null, limit = null } = {}) {
+  const params = new URLSearchParams();
+  if (before) params.set("before", String(before));
+  if (since) params.set("since", String(since));
+  if (limit) params.set("limit", String(limit));
+  const query = params.toString();
+  return request(`conversation/${id}/${query ? `?${query}` : ""}`);
 }
 
-export async function getConversations() {
-  return request("conversations/");
+// Returns one page: { results, next_cursor }. Pass next_cursor back to get the next page.
+export async function getConversations(cursor = null, limit = null) {
+  const params = new URLSearchParams();
+  if (cursor) params.set("cursor", cursor);
+  if (limit) params.set("limit", String(limit));
+  const query = params.toString();
+  return request(`conversations/${query ? `?${query}` : ""}`);
 }
 
 export async function editChatMessage(chatId, message, isVoice = false) {
@@ -196,3 +210,104 @@ export async function uploadReport(file, conversationId, preferredLanguage = "")
     body: formData,
   });
 }
+
+export async function uploadReports(files, conversationId, preferredLanguage = "") {
+  const formData = new FormData();
+  files.forEach((file) => formData.append("files", file));
+  if (conversationId) {
+    formData.append("conversation_id", conversationId);
+  }
+  if (preferredLanguage && preferredLanguage !== "auto") {
+    formData.append("preferred_language", preferredLanguage);
+  }
+
+  return request("upload-report/batch/", {
+    method: "POST",
+    body: formData,
+  });
+}
+
+// Streams upload progress as Server-Sent Events ("page", "summary", "faq") to
+// onEvent and resolves with the final "response" payload.
+export async function uploadReportStream(file, conversationId, preferredLanguage = "", onEvent = () => {}) {
+  const formData = new FormData();
+  formData.append("file", file);
+  if (conversationId) {
+    formData.append("conversation_id", conversationId);
+  }
+  if (preferredLanguage && preferredLanguage !== "auto") {
+    formData.append("preferred_language", preferredLanguage);
+  }
+
+  const headers = {};
+  const token = getAccessToken();
+  if (token) headers.Authorization = `Bearer ${token}`;
+
+  let response;
+  try {
+    response = await fetch(BASE_URL + "upload-report/stream/", {
+      method: "POST",
+      headers,
+      body: formData,
+    });
+  } catch (error) {
+    throw new Error(
+      `Network error: unable to reach API at ${BASE_URL}. Check backend server and REACT_APP_API_BASE_URL.`
+    );
+  }
+
+  const contentType = response.headers.get("content-type") || "";
+  if (!response.ok || !contentType.includes("text/event-stream") || !response.body) {
+    const rawText = await response.text();
+    let data = null;
+    try {
+      data = rawText ? JSON.parse(rawText) : null;
+    } catch (error) {
+      data = null;
+    }
+    if (!response.ok) {
+      throw new Error(data?.response || data?.error || data?.detail || "Request failed");
+    }
+    return data || {};
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let result = null;
+
+  const handleBlock = (block) => {
+    let event = "message";
+    const dataLines = [];
+    block.split("\n").forEach((line) => {
+      if (line.startsWith("event:")) event = line.slice(6).trim();
+      else if (line.startsWith("data:")) dataLines.push(line.slice(5).trim());
+    });
+    if (!dataLines.length) return;
+    let payload = null;
+    try {
+      payload = JSON.parse(dataLines.join("\n"));
+    } catch (error) {
+      return;
+    }
+    if (event === "error") throw new Error(payload.response || "Report processing failed");
+    if (event === "response") result = payload;
+    onEvent(event, payload);
+  };
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      handleBlock(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+    }
+  }
+  if (buffer.trim()) handleBlock(buffer);
+
+  if (!result) throw new Error("Upload stream ended before a response was received");
+  return result;
+}
@@ -58,7 +58,7 @@ function SpeakerIcon() {
 
 function ChatInput({ onSend, onUpload, onComposeStart, onSpeakerToggle }) {
   const [input, setInput] = useState("");
-  const [attachedFile, setAttachedFile] = useState(null);
+  const [attachedFiles, setAttachedFiles] = useState([]);
   const [isListening, setIsListening] = useState(false);
   const [hasMicDraft, setHasMicDraft] = useState(false);
   const [speakEnabled, setSpeakEnabled] = useState(false);
@@ -74,7 +74,7 @@ function ChatInput({ onSend, onUpload, onComposeStart, onSpeakerToggle }) {
     const message = input.trim();
     const usedVoiceInput = hasMicDraft || micActiveRef.current;
 
-    if (!message && !attachedFile) {
+    if (!message && !attachedFiles.length) {
       setError("Please enter a message or attach a file before sending.");
       return;
     }
@@ -83,9 +83,9 @@ function ChatInput({ onSend, onUpload, onComposeStart, onSpeakerToggle }) {
     if (onComposeStart) onComposeStart();
 
     try {
-      if (attachedFile && onUpload) {
-        await onUpload(attachedFile, { preferredLanguage: voiceLang });
-        setAttachedFile(null);
+      if (attachedFiles.length && onUpload) {
+        await onUpload(attachedFiles, { preferredLanguage: voiceLang });
+        setAttachedFiles([]);
       }
 
       if (message) {
@@ -115,9 +115,9 @@ function ChatInput({ onSend, onUpload, onComposeStart, onSpeakerToggle }) {
   };
 
   const handleFileChange = (e) => {
-    const file = e.target.files && e.target.files[0];
-    if (file) {
-      setAttachedFile(file);
+    const files = Array.from(e.target.files || []);
+    if (files.length) {
+      setAttachedFiles(files);
       if (onComposeStart) onComposeStart();
       if (error) setError("");
     }
@@ -125,7 +125,7 @@ function ChatInput({ onSend, onUpload, onComposeStart, onSpeakerToggle }) {
   };
 
   const clearAttachment = () => {
-    setAttachedFile(null);
+    setAttachedFiles([]);
   };
 
   const stopMic = () => {
@@ -273,10 +273,12 @@ function ChatInput({ onSend, onUpload, onComposeStart, onSpeakerToggle }) {
 
   return (
     <div className="chat-input">
-      {attachedFile ? (
+      {attachedFiles.length ? (
         <div className="chat-input-attachment-row">
-          <div className="attached-file-pill" title={attachedFile.name}>
-            <span>{attachedFile.name}</span>
+          <div className="attached-file-pill" title={attachedFiles.map((file) => file.name).join(", ")}>
+            <span>
+              {attachedFiles.length === 1 ? attachedFiles[0].name : `${attachedFiles.length} files`}
+            </span>
             <button
               type="button"
               className="remove-attachment-btn"
@@ -303,6 +305,7 @@ function ChatInput({ onSend, onUpload, onComposeStart, onSpeakerToggle }) {
         <input
           ref={fileInputRef}
           type="file"
+          multiple
           accept=".pdf,.png,.jpg,.jpeg,.bmp,.tif,.tiff,.webp,image/*"
           style={{ display: "none" }}
           onChange={handleFileChange}
@@ -3,7 +3,8 @@ import {
   sendMessage,
   getConversation,
   getConversations,
-  uploadReport,
+  uploadReportStream,
+  uploadReports,
   editChatMessage,
 } from "../api";
 import MessageBubble from "./MessageBubble";
@@ -13,6 +14,7 @@ function ChatWindow({ activeConversation, refreshConversations }) {
   const [messages, setMessages] = useState([]);
   const [conversationId, setConversationId] = useState(activeConversation);
   const [isLoadingConversation, setIsLoadingConversation] = useState(false);
+  const [olderMessagesCursor, setOlderMessagesCursor] = useState(null);
   const [hasStartedComposing, setHasStartedComposing] = useState(false);
   const [suggestedQuestions, setSuggestedQuestions] = useState([]);
   const [editingMessageId, setEditingMessageId] = useState(null);
@@ -30,6 +32,7 @@ function ChatWindow({ activeConversation, refreshConversations }) {
       setHasStartedComposing(false);
     } else {
       setMessages([]);
+      setOlderMessagesCursor(null);
       setConversationId(null);
       setHasStartedComposing(false);
     }
@@ -102,10 +105,14 @@ function ChatWindow({ activeConversation, refreshConversations }) {
     ];
 
     try {
-      const conversations = await getConversations();
-      const limited = (conversations || []).slice(0, 40);
+      const page = await getConversations(null, 40);
+      const limited = page?.results || [];
       const histories = await Promise.all(
-        limited.map((conv) => getConversation(conv.id).catch(() => []))
+        limited.map((conv) =>
+          getConversation(conv.id)
+            .then((page) => page?.results || [])
+            .catch(() => [])
+        )
       );
 
       const groups = [];
@@ -153,9 +160,11 @@ function ChatWindow({ activeConversation, refreshConversations }) {
     setIsLoadingConversation(true);
     try {
       const data = await getConversation(id);
-      setMessages(data);
-      if (Array.isArray(data) && data.length > 0) {
-        const last = data[data.length - 1];
+      const page = data?.results || [];
+      setMessages(page);
+      setOlderMessagesCursor(data?.next_cursor || null);
+      if (page.length > 0) {
+        const last = page[page.length - 1];
         lastBotReplyRef.current = last?.response || "";
       }
     } finally {
@@ -163,6 +172,13 @@ function ChatWindow({ activeConversation, refreshConversations }) {
     }
   };
 
+  const loadOlderMessages = async () => {
+    if (!conversationId || !olderMessagesCursor) return;
+    const data = await getConversation(conversationId, { before: olderMessagesCursor });
+    setMessages((prev) => [...(data?.results || []), ...prev]);
+    setOlderMessagesCursor(data?.next_cursor || null);
+  };
+
   const playAudio = async (audioBase64) => {
     if (!audioBase64) return false;
     const audio = new Audio(`data:audio/mp3;base64,${audioBase64}`);
@@ -263,10 +279,10 @@ function ChatWindow({ activeConversation, refreshConversations }) {
     loadSuggestedQuestions();
   };
 
-  const handleUpload = async (file, options = {}) => {
+  const handleUploadBatch = async (files, options = {}) => {
     setHasStartedComposing(true);
-    const data = await uploadReport(file, conversationId, options.preferredLanguage || "");
-    const uploadMessage = `[Uploaded File] ${file.name}`;
+    const data = await uploadReports(files, conversationId, options.preferredLanguage || "");
+    const uploadMessage = `[Uploaded Files] ${files.map((file) => file.name).join(", ")}`;
 
     if (!conversationId && data.conversation_id) {
       setConversationId(data.conversation_id);
@@ -279,6 +295,49 @@ function ChatWindow({ activeConversation, refreshConversations }) {
     ]);
   };
 
+  const handleUpload = async (file, options = {}) => {
+    if (Array.isArray(file)) {
+      if (file.length > 1) return handleUploadBatch(file, options);
+      file = file[0];
+    }
+    setHasStartedComposing(true);
+    const uploadMessage = `[Uploaded File] ${file.name}`;
+    const pendingKey = `upload-${Date.now()}`;
+    const updatePending = (response) =>
+      setMessages((prev) =>
+        prev.map((item) => (item.pendingKey === pendingKey ? { ...item, response } : item))
+      );
+
+    setMessages((prev) => [
+      ...prev,
+      { pendingKey, message: uploadMessage, response: "Reading file..." },
+    ]);
+
+    // Show the brief summary while FAQ matching and translation finish.
+    let data;
+    try {
+      data = await uploadReportStream(
+        file,
+        conversationId,
+        options.preferredLanguage || "",
+        (event, payload) => {
+          if (event === "page" && payload.page) updatePending(`Reading file... page ${payload.page}`);
+          if (event === "summary") updatePending(payload.summary);
+        }
+      );
+    } catch (error) {
+      setMessages((prev) => prev.filter((item) => item.pendingKey !== pendingKey));
+      throw error;
+    }
+
+    if (!conversationId && data.conversation_id) {
+      setConversationId(data.conversation_id);
+      refreshConversations();
+    }
+
+    updatePending(data.response);
+  };
+
   const handleSuggestionClick = async (question) => {
     setHasStartedComposing(true);
     await handleSend(question, { isVoice: false });
@@ -348,6 +407,11 @@ function ChatWindow({ activeConversation, refreshConversations }) {
             </div>
           </div>
         ) : null}
+        {!isLoadingConversation && olderMessagesCursor ? (
+          <button className="chat-suggestion-card" onClick={loadOlderMessages}>
+            Load earlier messages
+          </button>
+        ) : null}
         {!isLoadingConversation &&
           messages.map((msg, index) => (
             <div key={msg.id || index}>
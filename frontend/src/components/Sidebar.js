@@ -6,6 +6,8 @@ function Sidebar({
   setActiveConversation,
   createNewChat,
   onDeleteConversation,
+  hasMoreConversations,
+  onLoadMoreConversations,
   onNavigate,
 }) {
   const [confirmDeleteId, setConfirmDeleteId] = useState(null);
@@ -92,6 +94,15 @@ function Sidebar({
           </div>
         );
       })}
+
+      {hasMoreConversations ? (
+        <div
+          className="conversation-item"
+          onClick={() => onLoadMoreConversations && onLoadMoreConversations()}
+        >
+          <span className="conversation-title">Load older chats</span>
+        </div>
+      ) : null}
     </div>
   );
 }
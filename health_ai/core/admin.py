@@ -1,7 +1,9 @@
 from django.contrib import admin
-from .models import User, FAQ, ChatHistory, UploadedReport
+from .models import User, FAQ, ChatHistory, UploadedReport, ReportBlob, UploadSession
 
 admin.site.register(User)
 admin.site.register(FAQ)
 admin.site.register(ChatHistory)
 admin.site.register(UploadedReport)
+admin.site.register(ReportBlob)
+admin.site.register(UploadSession)
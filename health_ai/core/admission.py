@@ -0,0 +1,292 @@
+import asyncio
+import math
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+
+from .db_router import request_user_id
+
+# Admission control for the LLM/OCR-backed endpoints, per web process. Each
+# endpoint class ("chat", "upload") runs at most `concurrency` requests at once;
+# a request waits at most `max_wait` seconds for a slot and is shed straight
+# away when the recent service time says it could not get one in time. Each
+# user also has an in-process token bucket per class. Rejections are fast JSON answers
+# (429 rate limited, 503 overloaded) with Retry-After.
+
+POLL_SECONDS = 0.02
+BUCKET_PRUNE_AT = 10000
+# Weight of the newest sample in the moving averages.
+EWMA_ALPHA = 0.2
+
+
+def _ewma(average, sample, first):
+    return sample if first else average + EWMA_ALPHA * (sample - average)
+
+
+class EndpointClass:
+
+    def __init__(self, name, concurrency, max_wait, rate, burst):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.max_wait = max(0.0, max_wait)
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.completed = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.rate_limited = 0
+        self.service_ewma = 0.0
+        self.wait_ewma = 0.0
+        # Per-user token buckets: user id -> (tokens, timestamp).
+        self.buckets = {}
+
+    def _expected_wait(self):
+        # Requests ahead of this one, drained `concurrency` at a time.
+        ahead = self.active + self.waiting + 1 - self.concurrency
+        if ahead <= 0:
+            return 0.0
+        return ahead * self.service_ewma / self.concurrency
+
+    def _shed(self):
+        expected = self._expected_wait()
+        if expected > self.max_wait:
+            self.shed += 1
+            return max(1, math.ceil(expected))
+        return None
+
+    def _admit(self, waited):
+        self.active += 1
+        self.admitted += 1
+        self.wait_ewma = _ewma(self.wait_ewma, waited, self.admitted == 1)
+
+    def enter(self):
+        # Returns (admitted, retry_after).
+        with self._cond:
+            retry_after = self._shed()
+            if retry_after:
+                return False, retry_after
+            started = time.monotonic()
+            deadline = started + self.max_wait
+            self.waiting += 1
+            try:
+                while self.active >= self.concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        if self.active >= self.concurrency:
+                            self.timed_out += 1
+                            return False, max(1, math.ceil(self.service_ewma))
+            finally:
+                self.waiting -= 1
+            self._admit(time.monotonic() - started)
+            return True, 0
+
+    async def aenter(self):
+        # Polls instead of blocking, so waiting requests do not hold threads.
+        with self._cond:
+            retry_after = self._shed()
+            if retry_after:
+                return False, retry_after
+            self.waiting += 1
+        started = time.monotonic()
+        try:
+            while True:
+                with self._cond:
+                    if self.active < self.concurrency:
+                        self._admit(time.monotonic() - started)
+                        return True, 0
+                    if time.monotonic() - started >= self.max_wait:
+                        self.timed_out += 1
+                        return False, max(1, math.ceil(self.service_ewma))
+                await asyncio.sleep(POLL_SECONDS)
+        finally:
+            with self._cond:
+                self.waiting -= 1
+
+    def leave(self, service_seconds):
+        with self._cond:
+            self.active -= 1
+            self.completed += 1
+            self.service_ewma = _ewma(self.service_ewma, service_seconds, self.completed == 1)
+            self._cond.notify()
+
+    def record_rate_limited(self):
+        with self._cond:
+            self.rate_limited += 1
+
+    def pressure(self):
+        return self.active / self.concurrency
+
+    def stats(self):
+        with self._cond:
+            return {
+                "class": self.name,
+                "concurrency": self.concurrency,
+                "active": self.active,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "shed": self.shed,
+                "timed_out": self.timed_out,
+                "rate_limited": self.rate_limited,
+                "avg_service_ms": round(self.service_ewma * 1000, 1),
+                "avg_wait_ms": round(self.wait_ewma * 1000, 1),
+            }
+
+
+_classes = {}
+_classes_lock = threading.Lock()
+
+
+def endpoint_class(name):
+    klass = _classes.get(name)
+    if klass is None:
+        with _classes_lock:
+            klass = _classes.get(name)
+            if klass is None:
+                prefix = f"ADMISSION_{name.upper()}_"
+                klass = _classes[name] = EndpointClass(
+                    name,
+                    getattr(settings, prefix + "CONCURRENCY"),
+                    getattr(settings, prefix + "MAX_WAIT_MS") / 1000.0,
+                    getattr(settings, prefix + "RATE_PER_MIN") / 60.0,
+                    getattr(settings, prefix + "BURST"),
+                )
+    return klass
+
+
+def admission_status():
+    return [endpoint_class(name).stats() for name in ("chat", "upload")]
+
+
+def _spend_token(klass, user_id):
+    # Returns 0 when a token was taken, else the seconds until one is available.
+    if user_id is None or klass.rate <= 0:
+        return 0
+    now = time.monotonic()
+    with klass._cond:
+        tokens, stamp = klass.buckets.get(user_id, (klass.burst, now))
+        tokens = min(klass.burst, tokens + (now - stamp) * klass.rate)
+        if tokens < 1:
+            return max(1, math.ceil((1 - tokens) / klass.rate))
+        klass.buckets[user_id] = (tokens - 1, now)
+        if len(klass.buckets) > BUCKET_PRUNE_AT:
+            # Buckets idle long enough to be full again carry no state.
+            idle = klass.burst / klass.rate
+            klass.buckets = {
+                key: value for key, value in klass.buckets.items() if now - value[1] < idle
+            }
+    return 0
+
+
+def _rejection(klass, reason, retry_after):
+    if reason == "rate_limited":
+        klass.record_rate_limited()
+        message = "You are sending requests too quickly. Please wait a moment and try again."
+        status = 429
+    else:
+        message = "The service is busy right now. Please try again in a moment."
+        status = 503
+    response = JsonResponse(
+        {"response": message, "error": reason, "class": klass.name, "retry_after": retry_after},
+        status=status,
+    )
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+class _ReleaseAfter:
+    # Streamed content that releases the admission slot once the stream ends,
+    # fails, or is closed. Django closes the content when the client goes
+    # away, even before the first chunk, when a generator's finally would not
+    # run.
+
+    def __init__(self, content, release):
+        self._content = iter(content)
+        self._release = release
+        self._released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._content)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        try:
+            close = getattr(self._content, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._release()
+
+
+def admission(name):
+    # Apply above @api_view (or on an async view). Views can check
+    # request.admission_degraded to skip optional work (e.g. TTS) under load.
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if not settings.ADMISSION_ENABLED:
+                    return await view(request, *args, **kwargs)
+                klass = endpoint_class(name)
+                retry_after = _spend_token(klass, request_user_id(request))
+                if retry_after:
+                    return _rejection(klass, "rate_limited", retry_after)
+                admitted, retry_after = await klass.aenter()
+                if not admitted:
+                    return _rejection(klass, "overloaded", retry_after)
+                request.admission_degraded = klass.pressure() > settings.ADMISSION_DEGRADE_AT
+                started = time.monotonic()
+                try:
+                    return await view(request, *args, **kwargs)
+                finally:
+                    klass.leave(time.monotonic() - started)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not settings.ADMISSION_ENABLED:
+                return view(request, *args, **kwargs)
+            klass = endpoint_class(name)
+            retry_after = _spend_token(klass, request_user_id(request))
+            if retry_after:
+                return _rejection(klass, "rate_limited", retry_after)
+            admitted, retry_after = klass.enter()
+            if not admitted:
+                return _rejection(klass, "overloaded", retry_after)
+            request.admission_degraded = klass.pressure() > settings.ADMISSION_DEGRADE_AT
+            started = time.monotonic()
+            streaming = False
+            try:
+                response = view(request, *args, **kwargs)
+                if getattr(response, "streaming", False):
+                    # Streamed responses keep their slot until the stream ends.
+                    streaming = True
+                    response.streaming_content = _ReleaseAfter(
+                        response.streaming_content,
+                        lambda: klass.leave(time.monotonic() - started),
+                    )
+                return response
+            finally:
+                if not streaming:
+                    klass.leave(time.monotonic() - started)
+
+        return wrapper
+
+    return decorator
@@ -1,5 +1,24 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+def _install_query_timing(sender, connection, **kwargs):
+    from .pipeline_stats import time_query
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        connection_created.connect(_install_query_timing, dispatch_uid="core.query_timing")
+        # Registers the read-replica system checks.
+        from . import db_router  # noqa: F401
+        if getattr(settings, "OCR_WARM_ON_STARTUP", False):
+            from .ocr_backend import warm_up
+            warm_up(getattr(settings, "OCR_PRELOAD_LANGUAGES", []))
+        if getattr(settings, "WARMUP_ON_READY", False):
+            from .warmup import warm_up as warm_up_worker
+            warm_up_worker()
@@ -0,0 +1,187 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .admission import admission
+from .chat_store import add_chat_message, refresh_conversation_summary
+from .lanes import LaneFull, chat_lane
+from .models import ChatHistory, Conversation, User
+from .translation import adetect_language, atranslate_back, atranslate_to_en
+from .views import (
+    _contains_devanagari,
+    _faq_answer_en,
+    _is_truthy,
+    _lane_busy_payload,
+    _normalize_preferred_language,
+    _text_to_speech_base64,
+)
+
+# Async twins of chat_view and edit_chat_message for the ASGI profile. The
+# Groq calls are awaited, so a worker keeps serving other requests while a
+# chat waits on translation. Same URLs, payloads and responses as the DRF views.
+
+NOT_AUTHENTICATED = {"detail": "Authentication credentials were not provided."}
+
+
+async def _authenticated_user(request):
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        token = auth.get_validated_token(raw_token)
+        user = await User.objects.aget(pk=token[api_settings.USER_ID_CLAIM])
+    except (InvalidToken, TokenError, KeyError, User.DoesNotExist):
+        return None
+    if not user.is_active:
+        return None
+    # PrimaryPinMiddleware reads request.user, as it does for DRF views.
+    request.user = user
+    return user
+
+
+def _request_data(request):
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST
+
+
+async def _agenerate_chat_response(message, preferred_language=""):
+    source_lang = await adetect_language(message)
+    if _contains_devanagari(message):
+        source_lang = "hi"
+
+    message_en = await atranslate_to_en(message, source_lang)
+    response_en = await chat_lane().arun(_faq_answer_en, message, message_en, source_lang)
+
+    response_lang = preferred_language or source_lang
+    final_response = await atranslate_back(response_en, response_lang)
+    return final_response, response_lang
+
+
+async def _aspeech(final_response, detected_lang):
+    try:
+        return await chat_lane().arun(_text_to_speech_base64, final_response, detected_lang)
+    except LaneFull:
+        return None
+
+
+def _lane_busy_response(exc):
+    payload = _lane_busy_payload(exc)
+    response = JsonResponse(payload, status=503)
+    response["Retry-After"] = str(payload["retry_after"])
+    return response
+
+
+@admission("chat")
+@csrf_exempt
+@require_http_methods(["POST"])
+async def chat_view(request):
+    user = await _authenticated_user(request)
+    if user is None:
+        return JsonResponse(NOT_AUTHENTICATED, status=401)
+
+    data = _request_data(request)
+    message = data.get("message")
+    conversation_id = data.get("conversation_id")
+    is_voice = _is_truthy(data.get("is_voice", False))
+    preferred_language = _normalize_preferred_language(data.get("preferred_language"))
+
+    if not message:
+        return JsonResponse({"response": "Please provide a valid message."})
+
+    conversation = None
+    if conversation_id:
+        try:
+            conversation = await Conversation.objects.aget(id=conversation_id, user=user)
+        except (Conversation.DoesNotExist, ValueError):
+            conversation = None
+    if conversation is None:
+        conversation = await Conversation.objects.acreate(user=user)
+
+    try:
+        final_response, detected_lang = await _agenerate_chat_response(message, preferred_language)
+    except LaneFull as exc:
+        return _lane_busy_response(exc)
+
+    chat_entry = await sync_to_async(add_chat_message)(user, conversation, message, final_response, detected_lang)
+
+    payload = {
+        "response": final_response,
+        "conversation_id": conversation.id,
+        "chat_id": chat_entry.id,
+    }
+    if is_voice and not getattr(request, "admission_degraded", False):
+        audio_base64 = await _aspeech(final_response, detected_lang)
+        if audio_base64:
+            payload["audio_base64"] = audio_base64
+
+    return JsonResponse(payload)
+
+
+@admission("chat")
+@csrf_exempt
+@require_http_methods(["PUT"])
+async def edit_chat_message(request, chat_id):
+    user = await _authenticated_user(request)
+    if user is None:
+        return JsonResponse(NOT_AUTHENTICATED, status=401)
+
+    data = _request_data(request)
+    new_message = data.get("message")
+    is_voice = _is_truthy(data.get("is_voice", False))
+
+    if not new_message or not str(new_message).strip():
+        return JsonResponse({"error": "Please provide a valid edited message."}, status=400)
+
+    try:
+        chat_entry = await ChatHistory.objects.select_related("conversation").aget(id=chat_id, user=user)
+    except ChatHistory.DoesNotExist:
+        return JsonResponse({"error": "Chat message not found."}, status=404)
+
+    try:
+        final_response, detected_lang = await _agenerate_chat_response(new_message)
+    except LaneFull as exc:
+        return _lane_busy_response(exc)
+
+    later_messages = ChatHistory.objects.filter(
+        conversation_id=chat_entry.conversation_id
+    ).filter(
+        Q(created_at__gt=chat_entry.created_at)
+        | Q(created_at=chat_entry.created_at, id__gt=chat_entry.id)
+    )
+    deleted_count = await later_messages.acount()
+    await later_messages.adelete()
+
+    chat_entry.message = new_message
+    chat_entry.response = final_response
+    chat_entry.language = detected_lang
+    await chat_entry.asave(update_fields=["message", "response", "language"])
+    if chat_entry.conversation_id:
+        await sync_to_async(refresh_conversation_summary)(chat_entry.conversation, touched_at=timezone.now())
+
+    payload = {
+        "id": chat_entry.id,
+        "message": chat_entry.message,
+        "response": chat_entry.response,
+        "deleted_messages_count": deleted_count,
+    }
+    if is_voice and not getattr(request, "admission_degraded", False):
+        audio_base64 = await _aspeech(final_response, detected_lang)
+        if audio_base64:
+            payload["audio_base64"] = audio_base64
+
+    return JsonResponse(payload, status=200)
@@ -0,0 +1,48 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, Max, Value, When
+
+from .models import ChatHistory, Conversation
+
+FIRST_MESSAGE_PREVIEW_CHARS = 255
+
+
+def _preview(message):
+    return " ".join(str(message or "").split())[:FIRST_MESSAGE_PREVIEW_CHARS]
+
+
+def add_chat_message(user, conversation, message, response, language):
+    # Every ChatHistory insert goes through here so the conversation summary
+    # columns change in the same transaction as the row.
+    with transaction.atomic():
+        chat_entry = ChatHistory.objects.create(
+            user=user,
+            conversation=conversation,
+            message=message,
+            response=response,
+            language=language,
+        )
+        if conversation is not None:
+            # Conditions see the pre-update row, so message_count=0 means "first message".
+            Conversation.objects.filter(pk=conversation.pk).update(
+                first_message=Case(
+                    When(message_count=0, then=Value(_preview(message))),
+                    default=F("first_message"),
+                ),
+                message_count=F("message_count") + 1,
+                last_activity_at=chat_entry.created_at,
+            )
+    return chat_entry
+
+
+def refresh_conversation_summary(conversation, touched_at=None):
+    # Recomputes the summary columns after edits or deletes.
+    with transaction.atomic():
+        locked = Conversation.objects.select_for_update().get(pk=conversation.pk)
+        messages = ChatHistory.objects.filter(conversation=locked)
+        stats = messages.aggregate(count=Count("id"), last=Max("created_at"))
+        first = messages.order_by("created_at", "id").values_list("message", flat=True).first()
+        locked.first_message = _preview(first)
+        locked.message_count = stats["count"]
+        locked.last_activity_at = touched_at or stats["last"] or locked.created_at
+        locked.save(update_fields=["first_message", "message_count", "last_activity_at"])
+    return locked
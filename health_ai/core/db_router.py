@@ -0,0 +1,147 @@
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.checks import Tags, Warning, register
+
+REPLICA_ALIAS = "replica"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Alias that reads go to for the current request (set by @replica_reads), and
+# whether the current request has written to the primary.
+_read_alias = ContextVar("db_read_alias", default=None)
+_wrote = ContextVar("db_wrote", default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def _pin_key(user_id):
+    return f"db-primary-pin:{user_id}"
+
+
+@register(Tags.database)
+def check_pin_cache(app_configs, **kwargs):
+    # Per-process caches would keep a pin from the other workers.
+    backend = settings.CACHES["default"]["BACKEND"]
+    if replica_configured() and backend.endswith(("LocMemCache", "DummyCache")):
+        return [
+            Warning(
+                "The read-replica pins need a cache shared by all workers.",
+                hint="Set CACHE_URL to a Redis URL, or use the DatabaseCache that settings.py configures.",
+                id="core.W001",
+            )
+        ]
+    return []
+
+
+def pin_to_primary(user_id):
+    # A user who just wrote reads from the primary for a while, so replica lag
+    # never hides their own writes.
+    cache.set(_pin_key(user_id), 1, getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 10))
+
+
+def is_pinned_to_primary(user_id):
+    return bool(cache.get(_pin_key(user_id)))
+
+
+def _is_cache_table(model):
+    # DatabaseCache entries (the pins): read where they are written, and
+    # setting a pin is not a write of the request's own data.
+    return model._meta.app_label == "django_cache"
+
+
+class ReadReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if _wrote.get() or _is_cache_table(model):
+            return "default"
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        if not _is_cache_table(model):
+            _wrote.set(True)
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
+
+
+def request_user_id(request):
+    # Reads the user id from the JWT without touching the database, so the
+    # pin check happens before authentication queries are routed.
+    header = request.META.get("HTTP_AUTHORIZATION", "").split()
+    if len(header) != 2:
+        return None
+    try:
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        from rest_framework_simplejwt.settings import api_settings
+
+        token = JWTAuthentication().get_validated_token(header[1].encode("utf-8"))
+        return token.get(api_settings.USER_ID_CLAIM)
+    except Exception:
+        return None
+
+
+def replica_reads(view):
+    # Routes a read-only view (including its authentication lookup) to the
+    # replica. Apply it above @api_view.
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not replica_configured() or request.method not in SAFE_METHODS:
+            return view(request, *args, **kwargs)
+        user_id = request_user_id(request)
+        if user_id is not None and is_pinned_to_primary(user_id):
+            return view(request, *args, **kwargs)
+
+        token = _read_alias.set(REPLICA_ALIAS)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+
+    return wrapper
+
+
+def _should_pin(request):
+    user = getattr(request, "user", None)
+    return _wrote.get() and replica_configured() and user is not None and user.is_authenticated
+
+
+class PrimaryPinMiddleware:
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self._acall(request)
+        token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _should_pin(request):
+                pin_to_primary(request.user.id)
+        finally:
+            _wrote.reset(token)
+        return response
+
+    async def _acall(self, request):
+        token = _wrote.set(False)
+        try:
+            response = await self.get_response(request)
+            if _should_pin(request):
+                await sync_to_async(pin_to_primary)(request.user.id)
+        finally:
+            _wrote.reset(token)
+        return response
@@ -0,0 +1,213 @@
+import base64
+import json
+import logging
+import re
+import threading
+import time
+import urllib.request
+from collections.abc import Mapping
+
+from django.conf import settings
+
+# Google ID-token verification with a local key cache. google-auth's
+# verify_oauth2_token fetches Google's certificates on every call; here the
+# keys from GOOGLE_CERTS_URL are kept for the response's Cache-Control max-age
+# and refreshed in the background shortly before they expire, so logins only
+# wait for a fetch on a cold cache or when a token is signed by a key we have
+# not seen yet (rotation). GOOGLE_CERTS_URL may serve a JWKS ({"keys": [...]},
+# Google's oauth2/v3/certs) or a {kid: PEM} map (oauth2/v1/certs); a local file
+# or server can stand in for Google.
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+MAX_AGE_RE = re.compile(r"(?:^|,)\s*max-age\s*=\s*(\d+)", re.IGNORECASE)
+# Used when the response has no max-age, and as a floor so a misconfigured
+# server cannot make every login refetch.
+DEFAULT_MAX_AGE = 300
+MIN_MAX_AGE = 60
+# Refresh in the background once this fraction of the lifetime has passed.
+REFRESH_AHEAD = 0.9
+# An unknown key id triggers at most one refetch per this many seconds.
+UNKNOWN_KID_REFETCH_SECONDS = 30
+
+
+class CertificateFetchError(Exception):
+    pass
+
+
+def _b64_int(value):
+    return int.from_bytes(base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)), "big")
+
+
+def _jwk_to_pem(jwk):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicNumbers
+
+    key = RSAPublicNumbers(_b64_int(jwk["e"]), _b64_int(jwk["n"])).public_key()
+    # PKCS#1 PEM loads in both of google-auth's RSA verifiers.
+    return key.public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.PKCS1).decode("ascii")
+
+
+def parse_certs(payload):
+    if isinstance(payload.get("keys"), list):
+        return {
+            jwk["kid"]: _jwk_to_pem(jwk)
+            for jwk in payload["keys"]
+            if jwk.get("kty") == "RSA" and jwk.get("kid")
+        }
+    return {kid: pem for kid, pem in payload.items() if isinstance(pem, str)}
+
+
+def _max_age(headers):
+    cache_control = headers.get("Cache-Control") or ""
+    match = MAX_AGE_RE.search(cache_control)
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        max_age = 0
+    elif match:
+        max_age = int(match.group(1)) - int(headers.get("Age") or 0)
+    else:
+        max_age = DEFAULT_MAX_AGE
+    return max(MIN_MAX_AGE, max_age)
+
+
+def _fetch():
+    request = urllib.request.Request(settings.GOOGLE_CERTS_URL, headers={"Accept": "application/json"})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=settings.GOOGLE_CERTS_TIMEOUT) as response:
+            keys = parse_certs(json.load(response))
+            max_age = _max_age(response.headers)
+    except Exception as exc:
+        raise CertificateFetchError(f"Cannot fetch {settings.GOOGLE_CERTS_URL}: {exc}") from exc
+    if not keys:
+        raise CertificateFetchError(f"No RSA keys at {settings.GOOGLE_CERTS_URL}")
+    logger.info(
+        "Fetched %d Google signing keys in %.1f ms (max-age %ds)",
+        len(keys), (time.perf_counter() - started) * 1000, max_age,
+    )
+    return keys, max_age
+
+
+class CertCache:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # One fetch at a time; requests arriving meanwhile use its result.
+        self._fetch_lock = threading.Lock()
+        self._refreshing = False
+        self.keys = {}
+        self.fetched_at = 0.0
+        self.refresh_at = 0.0
+        self.expires_at = 0.0
+        self.fetches = 0
+
+    def _refresh(self, seen_fetched_at):
+        with self._fetch_lock:
+            if self.fetched_at != seen_fetched_at:
+                return self.keys
+            keys, max_age = _fetch()
+            now = time.monotonic()
+            with self._lock:
+                self.keys = keys
+                self.fetched_at = now
+                self.refresh_at = now + max_age * REFRESH_AHEAD
+                self.expires_at = now + max_age
+                self.fetches += 1
+            return keys
+
+    def _refresh_in_background(self, seen_fetched_at):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self._refresh(seen_fetched_at)
+            except CertificateFetchError as exc:
+                logger.warning("Background refresh of Google signing keys failed: %s", exc)
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="google-certs-refresh", daemon=True).start()
+
+    def current(self):
+        now = time.monotonic()
+        with self._lock:
+            keys, fetched_at = self.keys, self.fetched_at
+            refresh_at, expires_at = self.refresh_at, self.expires_at
+        if not keys:
+            return self._refresh(fetched_at)
+        if now >= expires_at:
+            try:
+                return self._refresh(fetched_at)
+            except CertificateFetchError as exc:
+                # Google keeps retired keys published for days; stale keys beat failing logins.
+                logger.warning("Using expired Google signing keys: %s", exc)
+                return keys
+        if now >= refresh_at:
+            self._refresh_in_background(fetched_at)
+        return keys
+
+    def for_unknown_kid(self, kid):
+        with self._lock:
+            keys, fetched_at = self.keys, self.fetched_at
+        if kid in keys or time.monotonic() - fetched_at < UNKNOWN_KID_REFETCH_SECONDS:
+            return keys
+        return self._refresh(fetched_at)
+
+    def status(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "url": settings.GOOGLE_CERTS_URL,
+                "keys": sorted(self.keys),
+                "fetches": self.fetches,
+                "expires_in": round(self.expires_at - now, 1) if self.keys else None,
+            }
+
+
+class _KeySet(Mapping):
+    # What jwt.decode looks the token's key id up in: a miss refetches once
+    # (key rotation) instead of failing.
+
+    def __init__(self, cache, keys):
+        self._cache = cache
+        self._keys = keys
+
+    def __getitem__(self, kid):
+        if kid not in self._keys:
+            self._keys = self._cache.for_unknown_kid(kid)
+        return self._keys[kid]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+cert_cache = CertCache()
+
+
+def verify_id_token(token, audiences):
+    # Returns the token's claims. Raises ValueError for a token that is not a
+    # valid Google ID token for one of `audiences`, CertificateFetchError when
+    # no signing keys can be loaded, ImportError without google-auth.
+    from google.auth import jwt
+
+    keys = _KeySet(cert_cache, cert_cache.current())
+    # Signature, iat and exp; the token is decoded once for all audiences.
+    claims = jwt.decode(token, certs=keys, audience=None)
+    if claims.get("aud") not in audiences:
+        raise ValueError(f"Token has wrong audience {claims.get('aud')}")
+    if claims.get("iss") not in GOOGLE_ISSUERS:
+        raise ValueError(f"Token has wrong issuer {claims.get('iss')}")
+    return claims
+
+
+def prefetch_certs():
+    cert_cache.current()
+    return cert_cache.status()
@@ -3,6 +3,9 @@ try:
 except Exception:
     Groq = None
 import os
+from django.conf import settings
+from .metrics import groq_call
+from .pipeline_stats import increment
 
 client = None
 
@@ -11,6 +14,10 @@ def _get_client():
     global client
     if client is not None:
         return client
+    if settings.BACKEND_STUBS:
+        from .stubs import StubGroq
+        client = StubGroq()
+        return client
     if Groq is None:
         return None
     api_key = (os.getenv("GROQ_API_KEY", "") or "").strip()
@@ -28,12 +35,13 @@ def generate_response(context, question):
     if active_client is None:
         return "AI model is not configured. Please set GROQ_API_KEY."
     try:
-        completion = active_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"""
+        with groq_call("llama-3.3-70b-versatile", "answer"):
+            completion = active_client.chat.completions.create(
+                model="llama-3.3-70b-versatile",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": f"""
 You are a professional medical assistant AI.
 
 Use the provided FAQ context if relevant.
@@ -50,10 +58,14 @@ Keep the response clear, short, and medically helpful.
 Context:
 {context}
 """
-                },
-                {"role": "user", "content": question}
-            ],
-        )
+                    },
+                    {"role": "user", "content": question}
+                ],
+            )
+        increment("llm_calls")
+        usage = getattr(completion, "usage", None)
+        if getattr(usage, "total_tokens", 0):
+            increment("llm_tokens", usage.total_tokens)
         return completion.choices[0].message.content
     except Exception:
         return "AI model request failed. Please check GROQ_API_KEY and network access."
@@ -2,8 +2,11 @@ import json
 import os
 import re
 from django.conf import settings
+from .pipeline_stats import stage
 
 FAQ_FILE = os.path.join(settings.BASE_DIR, "core", "faqs.json")
+# Parsed once per process and re-read only when the file changes.
+_faqs = None
 
 HINDI_TOKEN_MAP = {
     "वजन": "weight",
@@ -139,8 +142,12 @@ CONCEPT_PATTERNS = [
 
 
 def load_faqs():
-    with open(FAQ_FILE, "r", encoding="utf-8") as file:
-        return json.load(file)
+    global _faqs
+    mtime = os.stat(FAQ_FILE).st_mtime_ns
+    if _faqs is None or _faqs[0] != mtime:
+        with open(FAQ_FILE, "r", encoding="utf-8") as file:
+            _faqs = (mtime, json.load(file))
+    return _faqs[1]
 
 
 def _stem_token(token):
@@ -204,6 +211,11 @@ def _overlap_score(phrase, query_tokens):
 
 
 def search_faq_json(query):
+    with stage("faq_search"):
+        return _search_faq_json(query)
+
+
+def _search_faq_json(query):
     query_text = (query or "").lower().strip()
     if not query_text:
         return None
@@ -0,0 +1,305 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+
+from .pipeline_stats import collect, current_timings, fold, record_stage, record_timings, stage
+from .profiling import RequestProfile, current_profile, sampled_call, sampling
+
+# Execution lanes. Report extraction (rasterisation + OCR) is CPU-bound and runs
+# in a small process pool; chat/LLM work is I/O-bound and runs on a wide thread
+# pool. Each lane admits at most workers + queue_limit jobs and rejects the
+# rest with LaneFull, so a burst of uploads waits in its own lane (or is turned
+# away) instead of holding the CPU and threads that chat requests need.
+
+
+class LaneFull(Exception):
+
+    def __init__(self, lane):
+        super().__init__(f"{lane.name} lane is full")
+        self.lane = lane
+
+
+class Lane:
+
+    def __init__(self, name, kind, workers, queue_limit):
+        self.name = name
+        self.kind = kind
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._lock = threading.Lock()
+        self._executor = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        # spawn: forking a threaded web worker is not safe.
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=_init_process_worker,
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix=f"{self.name}-lane"
+                        )
+        return self._executor
+
+    def _release(self, _future):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+        self._slots.release()
+
+    def _acquire(self, block):
+        if not self._slots.acquire(blocking=block):
+            with self._lock:
+                self.rejected += 1
+            raise LaneFull(self)
+        with self._lock:
+            self.in_flight += 1
+
+    def submit(self, fn, *args, block=False):
+        # block=True waits for a free slot instead of raising LaneFull.
+        self._acquire(block)
+        try:
+            if self.kind == "process":
+                future = self._get_executor().submit(fn, *args)
+            else:
+                # Thread lanes keep the caller's context (stats, DB routing, profiling).
+                future = self._get_executor().submit(contextvars.copy_context().run, sampled_call, fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def run(self, fn, *args):
+        if self.kind == "process":
+            return self.submit(fn, *args).result()
+        # A sync caller (a WSGI request thread) would only block while a pool
+        # thread did the work: run it here, holding a slot so the lane still
+        # caps how many run at once.
+        self._acquire(False)
+        try:
+            return fn(*args)
+        finally:
+            self._release(None)
+
+    async def arun(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self):
+        with self._lock:
+            in_flight = self.in_flight
+            completed = self.completed
+            rejected = self.rejected
+        return {
+            "lane": self.name,
+            "kind": self.kind,
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "running": min(in_flight, self.workers),
+            "queued": max(0, in_flight - self.workers),
+            "completed": completed,
+            "rejected": rejected,
+            # 1.0 means every worker is busy and the queue is full.
+            "saturation": round(in_flight / (self.workers + self.queue_limit), 3),
+        }
+
+
+_lanes = {}
+_lanes_lock = threading.Lock()
+_inline_ocr = False
+_page_queues = None
+
+
+def _lane(name, kind, workers, queue_limit):
+    lane = _lanes.get(name)
+    if lane is None:
+        with _lanes_lock:
+            lane = _lanes.get(name)
+            if lane is None:
+                lane = _lanes[name] = Lane(name, kind, max(1, workers), max(0, queue_limit))
+    return lane
+
+
+def ocr_lane():
+    return _lane("ocr", "process", settings.OCR_LANE_WORKERS, settings.OCR_LANE_QUEUE)
+
+
+def chat_lane():
+    return _lane("chat", "thread", settings.CHAT_LANE_WORKERS, settings.CHAT_LANE_QUEUE)
+
+
+def lanes_status():
+    ocr_lane()
+    chat_lane()
+    return [lane.stats() for lane in _lanes.values()]
+
+
+def use_inline_ocr():
+    # For processes that are already CPU workers (ingest_reports): extract in
+    # the calling process instead of handing off to another pool.
+    global _inline_ocr
+    _inline_ocr = True
+
+
+def _init_process_worker():
+    import django
+    django.setup()
+
+
+def _file_source(uploaded_file):
+    # Process workers get a path when the upload is on disk, bytes otherwise.
+    temporary_file_path = getattr(uploaded_file, "temporary_file_path", None)
+    if temporary_file_path is not None:
+        return temporary_file_path()
+    path = getattr(getattr(uploaded_file, "file", None), "name", None)
+    if isinstance(path, str) and os.path.isfile(path):
+        return path
+    uploaded_file.seek(0)
+    data = uploaded_file.read()
+    uploaded_file.seek(0)
+    return data
+
+
+def _page_queue():
+    # Queues a lane process can be handed as a job argument; the manager is
+    # started (one more spawned process) on first use.
+    global _page_queues
+    if _page_queues is None:
+        with _lanes_lock:
+            if _page_queues is None:
+                _page_queues = multiprocessing.get_context("spawn").Manager()
+    return _page_queues.Queue()
+
+
+def _extract_pages(source, name, content_type, preferred_language, profile=False, page_queue=None):
+    # With page_queue, each page is put on it as soon as it is read (and a
+    # final None) instead of being returned.
+    from django.core.files import File
+    from .views import _iter_report_pages
+
+    request_profile = RequestProfile() if profile else None
+    pages = []
+    try:
+        with collect() as stats, record_timings() as timings, sampling(request_profile):
+            with (open(source, "rb") if isinstance(source, str) else BytesIO(source)) as handle:
+                uploaded_file = File(handle, name=name)
+                uploaded_file.content_type = content_type
+                for page in _iter_report_pages(uploaded_file, preferred_language):
+                    if page_queue is None:
+                        pages.append(page)
+                    else:
+                        page_queue.put(page)
+    finally:
+        if page_queue is not None:
+            page_queue.put(None)
+    stacks = dict(request_profile.stacks) if request_profile else {}
+    return pages, dict(stats), timings.as_dict(), stacks
+
+
+def _submit_to_lane(uploaded_file, preferred_language, block, page_queue=None):
+    return ocr_lane().submit(
+        _extract_pages,
+        _file_source(uploaded_file),
+        uploaded_file.name,
+        getattr(uploaded_file, "content_type", "") or "",
+        preferred_language,
+        current_profile() is not None,
+        page_queue,
+        block=block,
+    )
+
+
+def submit_report_extraction(uploaded_file, preferred_language="", block=False):
+    # Returns a future of (pages, stats, timings, stacks), where pages are the (page_index, text)
+    # pairs of _iter_report_pages. Raises LaneFull when the OCR lane is saturated,
+    # unless block is set.
+    if _inline_ocr or settings.OCR_LANE_WORKERS <= 0:
+        from .views import _iter_report_pages
+
+        future = Future()
+        try:
+            # Counted directly in this process, so no stats to fold in.
+            future.set_result((list(_iter_report_pages(uploaded_file, preferred_language)), {}, {}, {}))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    return _submit_to_lane(uploaded_file, preferred_language, block)
+
+
+def report_extraction_result(future):
+    with stage("ocr_lane"):
+        pages, stats, timings, stacks = future.result()
+    _fold_extraction(stats, timings, stacks)
+    return pages
+
+
+def _fold_extraction(stats, timings, stacks):
+    # Work done in a worker process was counted, timed and sampled there; fold
+    # it into this one.
+    fold(stats)
+    request_timings = current_timings()
+    if request_timings is not None:
+        request_timings.merge(timings)
+    request_profile = current_profile()
+    if request_profile is not None and stacks:
+        request_profile.merge(stacks, "ocr_lane_process")
+
+
+def extract_report_pages(uploaded_file, preferred_language=""):
+    return report_extraction_result(submit_report_extraction(uploaded_file, preferred_language))
+
+
+def iter_report_pages(uploaded_file, preferred_language=""):
+    # Like extract_report_pages, but yields each (page_index, text) as the lane
+    # process reads it, so streamed uploads can report pages as they go.
+    # Raises LaneFull (on the first next()) when the OCR lane is saturated.
+    if _inline_ocr or settings.OCR_LANE_WORKERS <= 0:
+        from .views import _iter_report_pages
+
+        yield from _iter_report_pages(uploaded_file, preferred_language)
+        return
+
+    page_queue = _page_queue()
+    future = _submit_to_lane(uploaded_file, preferred_language, False, page_queue)
+    # One ocr_lane run covering the whole wait for the lane; the time the
+    # caller spends on each yielded page is not counted.
+    waited = 0.0
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                page = page_queue.get(timeout=1)
+            except queue.Empty:
+                # A crashed lane process never sends the final None.
+                if future.done() and future.exception() is not None:
+                    raise future.exception()
+                continue
+            finally:
+                waited += time.perf_counter() - started
+            if page is None:
+                break
+            yield page
+        started = time.perf_counter()
+        _pages, stats, timings, stacks = future.result()
+        waited += time.perf_counter() - started
+    finally:
+        record_stage("ocr_lane", waited)
+    _fold_extraction(stats, timings, stacks)
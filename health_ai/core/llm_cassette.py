@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import threading
+from types import SimpleNamespace
+
+from django.conf import settings
+
+# Record/replay for the Groq completions behind detect_language and the
+# translation helpers. A cassette is a JSON file of responses keyed by a hash
+# of (model, messages, temperature). In "record" mode, misses go to the real
+# client (or the BACKEND_STUBS stand-in) and are saved; in "replay" mode, misses
+# raise CassetteMiss, which the translation helpers treat like any failed call.
+# Enabled with LLM_CASSETTE / LLM_CASSETTE_MODE, or use_cassette() (golden_benchmark).
+
+
+class CassetteMiss(Exception):
+    pass
+
+
+def request_key(kwargs):
+    request = {
+        "model": kwargs.get("model"),
+        "messages": kwargs.get("messages"),
+        "temperature": kwargs.get("temperature"),
+    }
+    return hashlib.sha256(json.dumps(request, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _response(entry):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=entry["content"]))],
+        usage=SimpleNamespace(total_tokens=entry.get("total_tokens", 0)),
+    )
+
+
+class Cassette:
+
+    def __init__(self, path, mode="replay"):
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as handle:
+                self.entries = json.load(handle)
+
+    def lookup(self, kwargs):
+        key = request_key(kwargs)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return key, _response(entry)
+            self.misses += 1
+        if self.mode != "record":
+            raise CassetteMiss(key)
+        return key, None
+
+    def record(self, key, kwargs, response):
+        messages = kwargs.get("messages") or []
+        entry = {
+            "model": kwargs.get("model"),
+            # Enough of the request to review a cassette diff by eye.
+            "prompt": messages[0]["content"] if messages else "",
+            "text": messages[-1]["content"] if messages else "",
+            "content": response.choices[0].message.content,
+            "total_tokens": getattr(getattr(response, "usage", None), "total_tokens", 0) or 0,
+        }
+        with self._lock:
+            self.entries[key] = entry
+            self.recorded += 1
+            self._save()
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(self.entries, handle, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temporary, self.path)
+
+    def client(self, factory):
+        return _CassetteClient(self, factory)
+
+    def async_client(self, factory):
+        return _AsyncCassetteClient(self, factory)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "recorded": self.recorded}
+
+
+class _CassetteCompletions:
+
+    def __init__(self, cassette, factory):
+        self.cassette = cassette
+        self.factory = factory
+
+    def create(self, **kwargs):
+        key, response = self.cassette.lookup(kwargs)
+        if response is not None:
+            return response
+        inner = self.factory()
+        if inner is None:
+            raise CassetteMiss(key)
+        response = inner.chat.completions.create(**kwargs)
+        self.cassette.record(key, kwargs, response)
+        return response
+
+
+class _AsyncCassetteCompletions(_CassetteCompletions):
+
+    async def create(self, **kwargs):
+        key, response = self.cassette.lookup(kwargs)
+        if response is not None:
+            return response
+        inner = self.factory()
+        if inner is None:
+            raise CassetteMiss(key)
+        response = await inner.chat.completions.create(**kwargs)
+        self.cassette.record(key, kwargs, response)
+        return response
+
+
+class _CassetteClient:
+
+    def __init__(self, cassette, factory):
+        self.chat = SimpleNamespace(completions=_CassetteCompletions(cassette, factory))
+
+
+class _AsyncCassetteClient:
+
+    def __init__(self, cassette, factory):
+        self.chat = SimpleNamespace(completions=_AsyncCassetteCompletions(cassette, factory))
+
+
+_active = None
+_active_lock = threading.Lock()
+
+
+def active_cassette():
+    global _active
+    if _active is None and settings.LLM_CASSETTE:
+        with _active_lock:
+            if _active is None:
+                _active = Cassette(settings.LLM_CASSETTE, settings.LLM_CASSETTE_MODE)
+    return _active
+
+
+def use_cassette(path, mode="replay"):
+    global _active
+    with _active_lock:
+        _active = Cassette(path, mode) if path else None
+    return _active
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import re
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.report_parser import SECTION_LABELS, parse_report
+from core.views import _build_brief_file_summary, _build_upload_file_section
+
+CALLER_LABEL_SETS = [
+    ["Disease Name", "Disease"],
+    ["Symptoms", "Symptom"],
+    ["Home Care", "Home Care Advice", "Home Management", "Home Management & Support"],
+    ["Disease Name", "Disease", "Name of the disease", "Illness", "Condition"],
+    ["Symptoms", "Symptom", "Common symptoms"],
+] + [list(labels) for labels in SECTION_LABELS.values()]
+
+
+# Regex cascade the parser replaced; kept here as the benchmark baseline.
+def _legacy_extract_report_field(text, labels):
+    value = " ".join((text or "").split())
+    if not value:
+        return ""
+
+    label_group = "|".join(re.escape(label) for label in labels)
+    pattern = (
+        rf"(?:{label_group})\s*[:\-]\s*(.+?)"
+        r"(?=(?:\bDisease(?:\s*Name)?\b|\bSymptoms?\b|\bPossible\s*Causes?\b|"
+        r"\bHome\s*Care(?:\s*Advice)?\b|\bHome\s*Management(?:\s*&\s*Support)?\b|"
+        r"\bWhen\s*to\s*Visit(?:\s*a)?\s*Doctor\b|$))"
+    )
+    match = re.search(pattern, value, flags=re.IGNORECASE)
+    return match.group(1).strip(" .;,\n\t") if match else ""
+
+
+def _legacy_fields(text):
+    return [_legacy_extract_report_field(text, labels) for labels in CALLER_LABEL_SETS]
+
+
+def _parser_fields(text):
+    parsed = parse_report.__wrapped__(text)
+    return [parsed.field(labels) for labels in CALLER_LABEL_SETS]
+
+
+def _best_of(repeat, iterations, func, samples):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for sample in samples:
+                func(sample)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark the single-pass report parser against the legacy regex cascade."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=os.path.join(settings.MEDIA_ROOT, "reports"))
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        import pdfplumber
+
+        path = options["path"]
+        if not os.path.isdir(path):
+            raise CommandError(f"Report directory not found: {path}")
+
+        texts = []
+        seen = set()
+        for name in sorted(os.listdir(path)):
+            if not name.lower().endswith(".pdf"):
+                continue
+            file_path = os.path.join(path, name)
+            with open(file_path, "rb") as handle:
+                digest = hashlib.sha256(handle.read()).hexdigest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+            try:
+                with pdfplumber.open(file_path) as pdf:
+                    text = " ".join((page.extract_text() or "") for page in pdf.pages)
+            except Exception as exc:
+                self.stderr.write(f"skip {name}: {exc}")
+                continue
+            if text.strip():
+                texts.append(text)
+
+        if not texts:
+            raise CommandError("No PDF text layers found to benchmark.")
+
+        mismatches = 0
+        for text in texts:
+            if _legacy_fields(text) != _parser_fields(text):
+                mismatches += 1
+
+        iterations = options["iterations"]
+        repeat = options["repeat"]
+        legacy = _best_of(repeat, iterations, _legacy_fields, texts)
+        parser = _best_of(repeat, iterations, _parser_fields, texts)
+        calls = iterations * len(texts)
+
+        def _summaries(text):
+            parse_report.cache_clear()
+            _build_upload_file_section(text)
+            _build_brief_file_summary(text)
+
+        summaries = _best_of(repeat, iterations, _summaries, texts)
+
+        self.stdout.write(f"unique reports: {len(texts)} ({sum(len(t) for t in texts)} chars)")
+        self.stdout.write(f"field mismatches vs legacy: {mismatches}")
+        self.stdout.write(f"legacy cascade:      {legacy / calls * 1e6:9.1f} us/report")
+        self.stdout.write(f"single-pass parser:  {parser / calls * 1e6:9.1f} us/report")
+        self.stdout.write(f"speedup:             {legacy / parser if parser else 0:9.2f}x")
+        self.stdout.write(f"upload sections:     {summaries / calls * 1e6:9.1f} us/report")
+        if mismatches:
+            raise CommandError(f"{mismatches} report(s) parsed differently from the legacy cascade.")
@@ -0,0 +1,151 @@
+import json
+import os
+import re
+import time
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+GOLDEN_SET = os.path.join(settings.BASE_DIR, "core", "golden_set.json")
+GOLDEN_CASSETTE = os.path.join(settings.BASE_DIR, "core", "golden_cassette.json")
+# English chat answers start with the matched FAQ (see _faq_answer_en).
+ANSWER_DISEASE = re.compile(r"^Disease: (.+?)\. Possible Causes:")
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the golden set of multilingual chat queries and reports through the pipeline and report "
+        "FAQ-match accuracy, latency and LLM calls. Replays LLM answers from a cassette, so it runs offline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--set", dest="golden_set", default=GOLDEN_SET)
+        parser.add_argument("--cassette", default=GOLDEN_CASSETTE)
+        parser.add_argument(
+            "--record", action="store_true", help="Call Groq for requests missing from the cassette and save them."
+        )
+        parser.add_argument(
+            "--allow-misses", action="store_true",
+            help="Report results even when LLM requests are missing from the cassette (they use the no-LLM path).",
+        )
+        parser.add_argument("--reports", default=os.path.join(settings.MEDIA_ROOT, "reports"))
+        parser.add_argument("--min-accuracy", type=float, default=0.0, help="Fail when accuracy is below this.")
+        parser.add_argument("--json", dest="json_path", help="Also write per-item results to this file.")
+
+    def handle(self, *args, **options):
+        from core.lanes import use_inline_ocr
+        from core.llm_cassette import use_cassette
+
+        try:
+            with open(options["golden_set"], encoding="utf-8") as handle:
+                golden = json.load(handle)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read golden set {options['golden_set']}: {exc}")
+
+        if not options["record"] and not os.path.exists(options["cassette"]):
+            self.stderr.write(f"No cassette at {options['cassette']}; every LLM request will miss.")
+        cassette = use_cassette(options["cassette"], "record" if options["record"] else "replay")
+        # Extract in this process, as ingest_reports does.
+        use_inline_ocr()
+        try:
+            results = [self._run_query(item) for item in golden.get("queries", [])]
+            results += [self._run_report(item, options["reports"]) for item in golden.get("reports", [])]
+        finally:
+            use_cassette(None)
+
+        for result in results:
+            mark = "ok  " if result["correct"] else "MISS"
+            self.stdout.write(
+                f"{mark} {result['kind']:<6} {result['ms']:>8.1f} ms  llm {result['llm_calls']:>2}  "
+                f"expected {result['expected']!s:<20} got {result['got']!s:<20} {result['input'][:50]}"
+            )
+
+        self.stdout.write("")
+        for kind in ("query", "report"):
+            self._summary(kind, [result for result in results if result["kind"] == kind])
+        self._summary("all", results)
+        stats = cassette.stats()
+        self.stdout.write(
+            f"cassette {options['cassette']}: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['recorded']} recorded"
+        )
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as handle:
+                json.dump({"results": results, "cassette": stats}, handle, ensure_ascii=False, indent=2)
+        if stats["misses"] and not options["record"] and not options["allow_misses"]:
+            # The numbers above then describe the no-LLM fallback, not the pipeline.
+            raise CommandError(
+                f"{stats['misses']} LLM requests are missing from the cassette and fell back to the no-LLM path; "
+                "run with --record (GROQ_API_KEY set) to fill it, or pass --allow-misses."
+            )
+        accuracy = sum(result["correct"] for result in results) / len(results) if results else 0.0
+        if accuracy < options["min_accuracy"]:
+            raise CommandError(f"accuracy {accuracy:.1%} is below --min-accuracy {options['min_accuracy']:.1%}")
+
+    def _measure(self, kind, label, expected, run):
+        from core.pipeline_stats import collect
+
+        with collect() as stats:
+            started = time.perf_counter()
+            got = run()
+            elapsed = time.perf_counter() - started
+        return {
+            "kind": kind,
+            "input": label,
+            "expected": expected,
+            "got": got,
+            "correct": got == expected,
+            "ms": round(elapsed * 1000, 1),
+            "llm_calls": stats.get("llm_calls", 0),
+            "llm_tokens": stats.get("llm_tokens", 0),
+        }
+
+    def _run_query(self, item):
+        from core.views import _generate_chat_response
+
+        def run():
+            # English replies, so the matched FAQ can be read off the answer.
+            final_response, _lang = _generate_chat_response(item["message"], "en")
+            match = ANSWER_DISEASE.match(final_response or "")
+            return match.group(1).lower() if match else None
+
+        return self._measure("query", item["message"], item.get("expected"), run)
+
+    def _run_report(self, item, reports_dir):
+        from core.lanes import extract_report_pages
+        from core.views import _format_report_response, _join_page_texts, _match_report_faq
+
+        path = os.path.join(reports_dir, item["file"])
+        if not os.path.isfile(path):
+            raise CommandError(f"Golden report not found: {path}")
+
+        def run():
+            with open(path, "rb") as handle:
+                uploaded_file = File(handle, name=item["file"])
+                uploaded_file.content_type = "application/pdf" if path.lower().endswith(".pdf") else ""
+                extracted_text = _join_page_texts(extract_report_pages(uploaded_file))
+            detected_lang, extracted_text_en, faq = _match_report_faq(extracted_text)
+            _format_report_response(extracted_text, detected_lang, extracted_text_en, faq)
+            return faq["keyword"] if faq else None
+
+        return self._measure("report", item["file"], item.get("expected"), run)
+
+    def _summary(self, label, results):
+        if not results:
+            return
+        latencies = sorted(result["ms"] for result in results)
+        correct = sum(result["correct"] for result in results)
+        llm_calls = sum(result["llm_calls"] for result in results)
+        self.stdout.write(
+            f"{label:<7} accuracy {correct}/{len(results)} ({correct / len(results):.1%})  "
+            f"p50 {_percentile(latencies, 0.5):.1f} ms  p95 {_percentile(latencies, 0.95):.1f} ms  "
+            f"LLM calls {llm_calls} ({llm_calls / len(results):.2f}/item), "
+            f"{sum(result['llm_tokens'] for result in results)} tokens"
+        )
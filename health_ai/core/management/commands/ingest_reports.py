@@ -0,0 +1,165 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+STAT_KEYS = ("pages", "ocr_passes", "llm_calls", "blob_hits", "output_hits")
+
+
+def _init_worker():
+    import django
+    django.setup()
+    # Connections inherited from the parent process must not be shared.
+    connections.close_all()
+
+
+def _ingest_one(path, user_id, preferred_language):
+    from core.lanes import use_inline_ocr
+    from core.models import Conversation, User
+    from core.pipeline_stats import collect
+    from core.views import _is_supported_upload, _process_uploaded_report
+
+    # The ingest workers are the CPU pool; do not hand off to the OCR lane.
+    use_inline_ocr()
+    started = time.perf_counter()
+    record = {"path": path, "status": "ok"}
+    with collect() as stats:
+        try:
+            user = User.objects.get(pk=user_id)
+            with open(path, "rb") as handle:
+                uploaded_file = File(handle, name=os.path.basename(path))
+                if not _is_supported_upload(uploaded_file):
+                    record["status"] = "skipped"
+                else:
+                    conversation = Conversation.objects.create(user=user)
+                    _process_uploaded_report(user, conversation, uploaded_file, preferred_language)
+                    record["conversation_id"] = conversation.id
+        except Exception as exc:
+            record["status"] = "error"
+            record["error"] = f"{type(exc).__name__}: {exc}"
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    record.update({key: stats.get(key, 0) for key in STAT_KEYS})
+    return record
+
+
+def _read_manifest(manifest):
+    base = os.path.dirname(os.path.abspath(manifest))
+    paths = []
+    with open(manifest, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return paths
+
+
+def _read_checkpoint(checkpoint):
+    # Last record per path wins, so failed documents are retried on resume.
+    done = set()
+    if not checkpoint or not os.path.exists(checkpoint):
+        return done
+    with open(checkpoint, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") in {"ok", "skipped"}:
+                done.add(record["path"])
+            else:
+                done.discard(record.get("path"))
+    return done
+
+
+class Command(BaseCommand):
+    help = "Ingest a directory or manifest of report PDFs/images through the upload pipeline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=os.path.join(settings.MEDIA_ROOT, "reports"))
+        parser.add_argument("--manifest", help="Text file with one report path per line.")
+        parser.add_argument("--user", required=True, help="Username that will own the ingested reports.")
+        parser.add_argument("--preferred-language", default="")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--checkpoint", help="JSONL progress file; completed reports are skipped on rerun.")
+        parser.add_argument("--limit", type=int, default=0)
+
+    def handle(self, *args, **options):
+        from core.models import User
+        from core.views import _normalize_preferred_language
+
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"User not found: {options['user']}")
+        preferred_language = _normalize_preferred_language(options["preferred_language"])
+
+        if options["manifest"]:
+            paths = _read_manifest(options["manifest"])
+        else:
+            path = options["path"]
+            if not os.path.isdir(path):
+                raise CommandError(f"Report directory not found: {path}")
+            paths = [
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if os.path.isfile(os.path.join(path, name))
+            ]
+        paths = [os.path.abspath(path) for path in paths]
+
+        checkpoint = options["checkpoint"]
+        done = _read_checkpoint(checkpoint)
+        pending = [path for path in paths if path not in done]
+        self.stdout.write(f"{len(pending)} report(s) to ingest, {len(paths) - len(pending)} already done")
+        if options["limit"]:
+            pending = pending[:options["limit"]]
+        if not pending:
+            return
+
+        totals = dict.fromkeys(STAT_KEYS, 0)
+        counts = {"ok": 0, "skipped": 0, "error": 0}
+        started = time.perf_counter()
+        log = open(checkpoint, "a", encoding="utf-8") if checkpoint else None
+        try:
+            for record in self._run(pending, user.pk, preferred_language, options["workers"]):
+                counts[record["status"]] += 1
+                for key in STAT_KEYS:
+                    totals[key] += record[key]
+                if record["status"] == "error":
+                    self.stderr.write(f"error {record['path']}: {record['error']}")
+                if log is not None:
+                    log.write(json.dumps(record) + "\n")
+                    log.flush()
+        finally:
+            if log is not None:
+                log.close()
+        elapsed = max(time.perf_counter() - started, 1e-9)
+
+        self.stdout.write(
+            f"ingested: {counts['ok']}  skipped: {counts['skipped']}  errors: {counts['error']}  "
+            f"in {elapsed:.1f}s"
+        )
+        self.stdout.write(f"docs/sec:    {counts['ok'] / elapsed:9.2f}")
+        self.stdout.write(f"pages/sec:   {totals['pages'] / elapsed:9.2f}  ({totals['pages']} pages)")
+        self.stdout.write(f"OCR passes:  {totals['ocr_passes']:9d}")
+        self.stdout.write(f"LLM calls:   {totals['llm_calls']:9d}")
+        self.stdout.write(
+            f"cache hits:  {totals['blob_hits']:9d} extraction, {totals['output_hits']} processed output"
+        )
+
+    def _run(self, paths, user_id, preferred_language, workers):
+        if workers <= 1:
+            for path in paths:
+                yield _ingest_one(path, user_id, preferred_language)
+            return
+
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(_ingest_one, path, user_id, preferred_language) for path in paths]
+            for future in as_completed(futures):
+                yield future.result()
@@ -0,0 +1,326 @@
+import http.client
+import json
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Typed and transliterated messages in the mix the app sees: English, Hindi
+# (Devanagari and romanized) and Gujarati, some with a preferred reply language.
+MESSAGES = [
+    ("I have fever and body pain since yesterday", ""),
+    ("What should I do for a sore throat?", ""),
+    ("headache and nausea in the morning", ""),
+    ("my child has a cough and cold", "hi"),
+    ("stomach pain after eating", ""),
+    ("mujhe bukhar hai aur sir dard ho raha hai", ""),
+    ("pet me dard hai kya karu", "hi"),
+    ("मुझे बुखार और खांसी है", ""),
+    ("मेरे सिर में बहुत दर्द है", "en"),
+    ("મને તાવ અને માથાનો દુખાવો છે", ""),
+    ("મને ખાંસી છે, શું કરવું?", "gu"),
+    ("I feel dizzy and tired all the time", "gu"),
+]
+
+DEFAULT_MIX = "chat=60,edit=10,upload=10,conversations=20"
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile.
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _multipart(fields, file_field, filename, content, content_type):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    parts.append(
+        (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        + content
+        + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class VirtualUser:
+    # One simulated client: its own user, JWT, keep-alive connection and
+    # conversation, issuing requests back to back until the step ends.
+
+    def __init__(self, target, token, reports, mix, options, rng):
+        self.target = target
+        self.token = token
+        self.reports = reports
+        self.operations, self.weights = zip(*mix.items())
+        self.options = options
+        self.rng = rng
+        self.connection = None
+        self.conversation_id = None
+        self.chat_ids = []
+
+    def _connect(self):
+        factory = http.client.HTTPSConnection if self.target.scheme == "https" else http.client.HTTPConnection
+        self.connection = factory(self.target.hostname, self.target.port, timeout=self.options["timeout"])
+
+    def _request(self, method, path, body=None, content_type=None):
+        headers = {"Authorization": f"Bearer {self.token}"}
+        if content_type:
+            headers["Content-Type"] = content_type
+        for attempt in range(2):
+            if self.connection is None:
+                self._connect()
+            try:
+                self.connection.request(method, self.target.path.rstrip("/") + path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                data = response.read()
+                if response.getheader("Connection", "").lower() == "close":
+                    self.connection.close()
+                    self.connection = None
+                return response.status, data
+            except (ConnectionError, http.client.HTTPException):
+                # The server closed an idle keep-alive connection; retry once on a new one.
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+    def _json(self, data):
+        try:
+            return json.loads(data or b"{}")
+        except ValueError:
+            return {}
+
+    def chat(self):
+        message, preferred_language = self.rng.choice(MESSAGES)
+        payload = {"message": message, "is_voice": self.rng.random() < self.options["voice_ratio"]}
+        if preferred_language:
+            payload["preferred_language"] = preferred_language
+        if self.conversation_id:
+            payload["conversation_id"] = self.conversation_id
+        status, data = self._request("POST", "/chat/", json.dumps(payload), "application/json")
+        if status == 200:
+            body = self._json(data)
+            self.conversation_id = body.get("conversation_id") or self.conversation_id
+            if body.get("chat_id"):
+                self.chat_ids = (self.chat_ids + [body["chat_id"]])[-20:]
+        return status
+
+    def edit(self):
+        if not self.chat_ids:
+            return self.chat()
+        chat_id = self.chat_ids.pop()
+        message, _preferred_language = self.rng.choice(MESSAGES)
+        body = json.dumps({"message": message})
+        status, _data = self._request("PUT", f"/chat/{chat_id}/edit/", body, "application/json")
+        return status
+
+    def upload(self):
+        name, content = self.rng.choice(self.reports)
+        if not self.options["reuse_uploads"]:
+            # A PDF comment after %%EOF makes each upload new content, so it is
+            # extracted instead of answered from the report blob cache.
+            content = content + f"\n%loadtest {uuid.uuid4().hex}\n".encode()
+        fields = {"conversation_id": self.conversation_id} if self.conversation_id else {}
+        body, content_type = _multipart(fields, "file", name, content, "application/pdf")
+        status, _data = self._request("POST", "/upload-report/", body, content_type)
+        return status
+
+    def conversations(self):
+        status, _data = self._request("GET", "/conversations/")
+        return status
+
+    def run(self, deadline, results):
+        while time.monotonic() < deadline:
+            operation = self.rng.choices(self.operations, self.weights)[0]
+            started = time.perf_counter()
+            try:
+                status = getattr(self, operation)()
+            except Exception as exc:
+                status = type(exc).__name__
+                self.close()
+            results.append((operation, status, time.perf_counter() - started))
+            if self.options["think_time"] > 0:
+                time.sleep(self.rng.expovariate(1.0 / self.options["think_time"]))
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def _summarise(concurrency, results, elapsed):
+    latencies = sorted(latency for _operation, _status, latency in results)
+    statuses = Counter(status for _operation, status, _latency in results)
+    errors = sum(count for status, count in statuses.items() if not (isinstance(status, int) and status < 400))
+    shed = statuses.get(429, 0) + statuses.get(503, 0)
+    total = len(results)
+    per_operation = defaultdict(list)
+    for operation, status, latency in results:
+        per_operation[operation].append((status, latency))
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "throughput": total / elapsed if elapsed else 0.0,
+        "ok_throughput": (total - errors) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p90_ms": _percentile(latencies, 0.90) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        "error_rate": errors / total if total else 0.0,
+        "shed": shed,
+        "statuses": {str(status): count for status, count in statuses.items()},
+        "operations": {
+            operation: {
+                "requests": len(entries),
+                "p50_ms": _percentile(sorted(latency for _status, latency in entries), 0.50) * 1000,
+                "p99_ms": _percentile(sorted(latency for _status, latency in entries), 0.99) * 1000,
+                "errors": sum(1 for status, _latency in entries if not (isinstance(status, int) and status < 400)),
+            }
+            for operation, entries in sorted(per_operation.items())
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive a running server (chat, edit, upload, conversation list) at increasing concurrency and "
+        "report throughput, latency percentiles and error rates. Start the server with "
+        "BACKEND_STUBS=true so Groq, gTTS and OCR are local stand-ins, against the same database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000/api", help="API base URL of the running server.")
+        parser.add_argument("--concurrency", default="1,2,4,8,16,32", help="Comma-separated concurrency steps.")
+        parser.add_argument("--duration", type=float, default=20.0, help="Seconds per concurrency step.")
+        parser.add_argument("--mix", default=DEFAULT_MIX, help="Operation weights, e.g. chat=60,upload=10.")
+        parser.add_argument("--reports", default=os.path.join(settings.MEDIA_ROOT, "reports"))
+        parser.add_argument(
+            "--think-time", type=float, default=0.0, help="Mean pause between a client's requests (seconds)."
+        )
+        parser.add_argument("--voice-ratio", type=float, default=0.1, help="Share of chats that ask for TTS.")
+        parser.add_argument("--reuse-uploads", action="store_true", help="Upload identical bytes (cache hits).")
+        parser.add_argument("--timeout", type=float, default=120.0)
+        parser.add_argument("--max-error-rate", type=float, default=0.05)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--json", dest="json_path", help="Also write the step results to this file.")
+
+    def handle(self, *args, **options):
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from core.models import User
+
+        try:
+            steps = [int(value) for value in options["concurrency"].split(",") if value.strip()]
+            mix = {
+                name.strip(): float(weight)
+                for name, weight in (item.split("=") for item in options["mix"].split(",") if item.strip())
+            }
+        except ValueError:
+            raise CommandError("--concurrency and --mix must look like 1,2,4 and chat=60,upload=10.")
+        unknown = set(mix) - {"chat", "edit", "upload", "conversations"}
+        if unknown or not steps or min(steps) < 1:
+            raise CommandError(f"Bad --mix or --concurrency ({', '.join(sorted(unknown)) or 'empty'}).")
+        target = urlsplit(options["url"])
+
+        reports = []
+        if mix.get("upload"):
+            path = options["reports"]
+            if not os.path.isdir(path):
+                raise CommandError(f"Report directory not found: {path}")
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(".pdf"):
+                    with open(os.path.join(path, name), "rb") as handle:
+                        reports.append((name, handle.read()))
+            if not reports:
+                raise CommandError(f"No PDFs in {path}")
+
+        # One user per virtual client, so per-user rate limits apply as they
+        # would to real users.
+        tokens = []
+        for index in range(max(steps)):
+            user, _created = User.objects.get_or_create(
+                username=f"loadtest-{index}",
+                defaults={"email": f"loadtest-{index}@example.com", "role": "patient"},
+            )
+            tokens.append(str(RefreshToken.for_user(user).access_token))
+
+        self.stdout.write(f"target {options['url']}  mix {options['mix']}  {options['duration']:.0f}s per step")
+        self.stdout.write(
+            f"{'conc':>5} {'reqs':>7} {'req/s':>8} {'ok/s':>8} {'p50 ms':>8} {'p90 ms':>8} "
+            f"{'p99 ms':>8} {'max ms':>8} {'errors':>7} {'shed':>6}"
+        )
+        rng = random.Random(options["seed"])
+        summaries = []
+        for concurrency in steps:
+            results = []
+            clients = [
+                VirtualUser(target, tokens[index], reports, mix, options, random.Random(rng.random()))
+                for index in range(concurrency)
+            ]
+            started = time.monotonic()
+            deadline = started + options["duration"]
+            threads = [threading.Thread(target=client.run, args=(deadline, results)) for client in clients]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - started
+            for client in clients:
+                client.close()
+
+            summary = _summarise(concurrency, results, elapsed)
+            summaries.append(summary)
+            self.stdout.write(
+                f"{concurrency:>5} {summary['requests']:>7} {summary['throughput']:>8.1f} "
+                f"{summary['ok_throughput']:>8.1f} {summary['p50_ms']:>8.0f} {summary['p90_ms']:>8.0f} "
+                f"{summary['p99_ms']:>8.0f} {summary['max_ms']:>8.0f} {summary['error_rate']:>6.1%} "
+                f"{summary['shed']:>6}"
+            )
+            if options["verbosity"] > 1:
+                for operation, stats in summary["operations"].items():
+                    self.stdout.write(
+                        f"      {operation:<14} {stats['requests']:>6} reqs  p50 {stats['p50_ms']:>7.0f} ms  "
+                        f"p99 {stats['p99_ms']:>7.0f} ms  errors {stats['errors']}"
+                    )
+                self.stdout.write(f"      statuses {summary['statuses']}")
+
+        self.stdout.write(self._saturation(summaries, options["max_error_rate"]))
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as handle:
+                json.dump(summaries, handle, indent=2)
+
+    def _saturation(self, summaries, max_error_rate):
+        # Saturated at the first step where successful throughput stops growing
+        # by at least 10%, or errors pass the allowed rate.
+        best = None
+        for summary in summaries:
+            if summary["error_rate"] > max_error_rate:
+                reason = f"error rate {summary['error_rate']:.1%} at concurrency {summary['concurrency']}"
+                break
+            if best is not None and summary["ok_throughput"] < best["ok_throughput"] * 1.1:
+                reason = f"throughput flat from concurrency {best['concurrency']} to {summary['concurrency']}"
+                break
+            best = summary
+        else:
+            return "not saturated: throughput still growing at the highest concurrency step"
+        if best is None:
+            return f"saturated at the first step ({reason})"
+        return (
+            f"saturation point: ~{best['concurrency']} concurrent clients, "
+            f"{best['ok_throughput']:.1f} ok req/s, p99 {best['p99_ms']:.0f} ms ({reason})"
+        )
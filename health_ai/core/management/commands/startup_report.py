@@ -0,0 +1,106 @@
+import json
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter, so imports are measured cold.
+COLD_START = """
+import json, sys, time
+# Keep spawned OCR lane processes from adding their imports to the report.
+sys._xoptions.pop("importtime", None)
+started = time.perf_counter()
+import django
+django.setup()
+setup_ms = (time.perf_counter() - started) * 1000
+from core.warmup import warm_up
+report = warm_up(%r)
+print("STARTUP_REPORT " + json.dumps({"setup_ms": round(setup_ms, 1), "warmup": report}))
+"""
+# "import time:  self [us] | cumulative | imported package", nested by indentation.
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure a worker's cold start in a fresh interpreter: django.setup(), each warm-up "
+        "component, and the slowest imports (python -X importtime)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--components", help="Comma-separated warm-up components (default: WARMUP_COMPONENTS)."
+        )
+        parser.add_argument("--top", type=int, default=20, help="Imports to list.")
+        parser.add_argument(
+            "--budget-ms", type=float, default=None,
+            help="Fail when setup plus warm-up takes longer (default: WARMUP_BUDGET_MS, 0 = no limit).",
+        )
+        parser.add_argument("--json", dest="json_path", help="Also write the report to this file.")
+
+    def handle(self, *args, **options):
+        components = settings.WARMUP_COMPONENTS
+        if options["components"]:
+            components = [name.strip() for name in options["components"].split(",") if name.strip()]
+        env = {**os.environ, "WARMUP_ON_READY": "false", "OCR_WARM_ON_STARTUP": "false"}
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", COLD_START % (components,)],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        result = None
+        for line in proc.stdout.splitlines():
+            if line.startswith("STARTUP_REPORT "):
+                result = json.loads(line[len("STARTUP_REPORT "):])
+        if proc.returncode != 0 or result is None:
+            errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+            raise CommandError("Cold start failed:\n" + "\n".join(errors[-20:]))
+
+        imports = []
+        for line in proc.stderr.splitlines():
+            match = IMPORT_LINE.match(line)
+            if match:
+                imports.append(
+                    {
+                        "module": match.group(4),
+                        "self_ms": int(match.group(1)) / 1000,
+                        "cumulative_ms": int(match.group(2)) / 1000,
+                        "depth": len(match.group(3)) // 2,
+                    }
+                )
+        # Self time summed by top-level package.
+        packages = {}
+        for item in imports:
+            package = item["module"].split(".")[0]
+            packages[package] = packages.get(package, 0.0) + item["self_ms"]
+
+        warmup = result["warmup"]
+        total_ms = result["setup_ms"] + warmup["total_ms"]
+        self.stdout.write(f"django.setup()                {result['setup_ms']:>9.1f} ms")
+        for item in warmup["components"]:
+            mark = "" if item["ok"] else "  FAILED"
+            detail = f"  {item['detail']}" if item["detail"] else ""
+            self.stdout.write(f"  {item['component']:<36} {item['ms']:>9.1f} ms{mark}{detail}")
+        self.stdout.write(f"warm-up                       {warmup['total_ms']:>9.1f} ms")
+        self.stdout.write(f"cold start                    {total_ms:>9.1f} ms")
+
+        top = options["top"]
+        self.stdout.write(f"\nimports: {len(imports)} modules, {sum(item['self_ms'] for item in imports):.1f} ms")
+        self.stdout.write("slowest packages (self time):")
+        for package, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f"  {package:<40} {ms:>9.1f} ms")
+        self.stdout.write("slowest imports (cumulative):")
+        for item in sorted(imports, key=lambda item: -item["cumulative_ms"])[:top]:
+            self.stdout.write(f"  {item['module']:<56} {item['cumulative_ms']:>9.1f} ms  self {item['self_ms']:.1f}")
+
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as handle:
+                json.dump(
+                    {**result, "total_ms": round(total_ms, 1), "packages": packages, "imports": imports},
+                    handle, indent=2,
+                )
+        budget = settings.WARMUP_BUDGET_MS if options["budget_ms"] is None else options["budget_ms"]
+        if budget and total_ms > budget:
+            raise CommandError(f"cold start took {total_ms:.1f} ms, over the {budget:.0f} ms budget")
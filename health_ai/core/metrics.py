@@ -0,0 +1,234 @@
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+
+# Counters, gauges and histograms in Prometheus text format. Each process keeps
+# its own registry and, when METRICS_DIR is set, a background thread writes it
+# to METRICS_DIR/<pid>-<start>.json every METRICS_FLUSH_SECONDS. The
+# metrics endpoint adds up the files of every process sharing the directory
+# (gunicorn workers, OCR lane workers), so it reports the whole deployment
+# whichever worker answers. Counters and histograms of exited processes are
+# kept so totals never go backwards; gauges only count live processes.
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRICS = {
+    "http_requests_total": ("counter", "Requests by route, method and status."),
+    "http_request_duration_seconds": ("histogram", "Request latency by route and method."),
+    "pipeline_stage_duration_seconds": ("histogram", "Duration of one run of a pipeline stage."),
+    "pipeline_events_total": ("counter", "Pipeline work: pages, OCR passes, LLM calls and tokens, cache hits."),
+    "groq_request_duration_seconds": ("histogram", "Groq completion latency by model and prompt."),
+    "groq_errors_total": ("counter", "Failed Groq completions by model, prompt and error."),
+    "faq_lookups_total": ("counter", "FAQ lookups by source, detected language and whether a FAQ matched."),
+    "cache_requests_total": ("counter", "Report cache lookups by cache and result (hit/miss)."),
+    "warmup_duration_seconds": ("histogram", "Worker startup warm-up time by component."),
+    "lane_jobs": ("gauge", "Jobs in an execution lane by state (running/queued)."),
+    "admission_requests": ("gauge", "Requests in an admission class by state (active/waiting)."),
+}
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_started = int(time.time())
+_flusher_pid = None
+
+
+def _key(name, labels):
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def count(name, amount=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+    _ensure_flusher()
+
+
+def observe(name, value, **labels):
+    key = _key(name, labels)
+    with _lock:
+        entry = _histograms.get(key)
+        if entry is None:
+            # Per-bucket counts (the last one is +Inf), sum, count.
+            entry = _histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+        entry[0][bisect_left(BUCKETS, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+    _ensure_flusher()
+
+
+@contextmanager
+def groq_call(model, prompt):
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as exc:
+        count("groq_errors_total", model=model, prompt=prompt, error=type(exc).__name__)
+        raise
+    finally:
+        observe("groq_request_duration_seconds", time.perf_counter() - started, model=model, prompt=prompt)
+
+
+def _gauges():
+    from .admission import admission_status
+    from .lanes import lanes_status
+
+    gauges = {}
+    for lane in lanes_status():
+        for state in ("running", "queued"):
+            gauges[_key("lane_jobs", {"lane": lane["lane"], "state": state})] = lane[state]
+    for klass in admission_status():
+        for state in ("active", "waiting"):
+            gauges[_key("admission_requests", {"class": klass["class"], "state": state})] = klass[state]
+    return gauges
+
+
+def _snapshot():
+    with _lock:
+        counters = list(_counters.items())
+        histograms = [(key, [list(entry[0]), entry[1], entry[2]]) for key, entry in _histograms.items()]
+    return {
+        "pid": os.getpid(),
+        "counters": [[name, labels, value] for (name, labels), value in counters],
+        "histograms": [[name, labels, entry] for (name, labels), entry in histograms],
+        "gauges": [[name, labels, value] for (name, labels), value in _gauges().items()],
+    }
+
+
+def _own_file(directory):
+    return os.path.join(directory, f"{os.getpid()}-{_started}.json")
+
+
+def flush():
+    directory = settings.METRICS_DIR
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    path = _own_file(directory)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as handle:
+        json.dump(_snapshot(), handle)
+    os.replace(temporary, path)
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(settings.METRICS_FLUSH_SECONDS)
+        try:
+            flush()
+        except OSError:
+            pass
+
+
+def _ensure_flusher():
+    global _flusher_pid
+    # Keyed by pid: a forked child needs its own thread.
+    if _flusher_pid == os.getpid() or not settings.METRICS_DIR:
+        return
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_periodically, name="metrics-flush", daemon=True).start()
+
+
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception:
+        pass
+
+
+atexit.register(_flush_at_exit)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _snapshots():
+    own = _snapshot()
+    directory = settings.METRICS_DIR
+    if not directory or not os.path.isdir(directory):
+        return [own]
+    snapshots = [own]
+    own_file = os.path.basename(_own_file(directory))
+    for filename in os.listdir(directory):
+        if not filename.endswith(".json") or filename == own_file:
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as handle:
+                snapshot = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        if not _alive(snapshot.get("pid", 0)):
+            snapshot["gauges"] = []
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels_text(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    counters = {}
+    gauges = {}
+    histograms = {}
+    for snapshot in _snapshots():
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, value in snapshot["gauges"]:
+            key = (name, tuple(map(tuple, labels)))
+            gauges[key] = gauges.get(key, 0) + value
+        for name, labels, (buckets, total, observations) in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            entry = histograms.setdefault(key, [[0] * (len(BUCKETS) + 1), 0.0, 0])
+            entry[0] = [a + b for a, b in zip(entry[0], buckets)]
+            entry[1] += total
+            entry[2] += observations
+
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        values = counters if kind == "counter" else gauges
+        if kind != "histogram":
+            for (metric, labels), value in sorted(values.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels_text(labels)} {_number(value)}")
+            continue
+        for (metric, labels), (buckets, total, observations) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip((*BUCKETS, "+Inf"), buckets):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_labels_text(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_labels_text(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels_text(labels)} {observations}")
+    return "\n".join(lines) + "\n"
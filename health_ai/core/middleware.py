@@ -0,0 +1,147 @@
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .metrics import count, observe
+from .pipeline_stats import record_timings
+
+timing_logger = logging.getLogger("core.timing")
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    # WhiteNoise is sync-only; under ASGI that makes Django run every async
+    # view through one shared thread, so concurrent chats would queue. This
+    # keeps the chain async and only touches the filesystem in a thread.
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self._acall(request)
+        return super().__call__(request)
+
+    async def _acall(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+def _server_timing(stages, total_ms):
+    entries = []
+    for name, values in stages.items():
+        counters = " ".join(f"{key}={value}" for key, value in values.items() if key != "ms")
+        entries.append(f'{name};dur={values.get("ms", 0)};desc="{counters}"')
+    entries.append(f"total;dur={round(total_ms, 1)}")
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    # Times the pipeline stages of each request (see pipeline_stats.stage),
+    # reports them in a Server-Timing header and logs them as one structured
+    # record on the "core.timing" logger; request count and latency go to the
+    # metrics (core/metrics.py). Streamed responses are logged and measured
+    # when the stream ends; their header only has the stages run before it started.
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self._acall(request)
+        started = time.perf_counter()
+        with record_timings() as timings:
+            response = self.get_response(request)
+        return self._finish(request, response, timings, started)
+
+    async def _acall(self, request):
+        started = time.perf_counter()
+        with record_timings() as timings:
+            response = await self.get_response(request)
+        return self._finish(request, response, timings, started)
+
+    def _finish(self, request, response, timings, started):
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = _server_timing(
+                timings.as_dict(), (time.perf_counter() - started) * 1000
+            )
+        if not getattr(response, "streaming", False):
+            _request_finished(request, response, timings, started)
+        elif response.is_async:
+            response.streaming_content = _atimed_stream(
+                response.streaming_content, request, response, timings, started
+            )
+        else:
+            response.streaming_content = _timed_stream(
+                response.streaming_content, request, response, timings, started
+            )
+        return response
+
+
+def _request_finished(request, response, timings, started):
+    seconds = time.perf_counter() - started
+    match = getattr(request, "resolver_match", None)
+    route = match.route if match is not None else "unmatched"
+    count("http_requests_total", route=route, method=request.method, status=response.status_code)
+    observe("http_request_duration_seconds", seconds, route=route, method=request.method)
+    if not timing_logger.isEnabledFor(logging.INFO):
+        return
+    record = {
+        "method": request.method,
+        "path": request.path,
+        "status": response.status_code,
+        "total_ms": round(seconds * 1000, 1),
+        "stages": timings.as_dict(),
+    }
+    timing_logger.info(json.dumps(record), extra={"timing": record})
+
+
+def _timed_stream(content, request, response, timings, started):
+    iterator = iter(content)
+    try:
+        while True:
+            # The stream runs outside the middleware call, so the request's
+            # timings are made current again for each chunk.
+            with record_timings(timings):
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    break
+            yield chunk
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+        _request_finished(request, response, timings, started)
+
+
+async def _atimed_stream(content, request, response, timings, started):
+    iterator = aiter(content)
+    try:
+        while True:
+            with record_timings(timings):
+                try:
+                    chunk = await anext(iterator)
+                except StopAsyncIteration:
+                    break
+            yield chunk
+    finally:
+        _request_finished(request, response, timings, started)
@@ -0,0 +1,62 @@
+from django.db import migrations, transaction
+from django.db.models import Count, Max, OuterRef, Subquery
+
+BATCH_SIZE = 500
+PREVIEW_CHARS = 255
+
+
+def backfill_conversation_summary(apps, schema_editor):
+    Conversation = apps.get_model("core", "Conversation")
+    ChatHistory = apps.get_model("core", "ChatHistory")
+    db_alias = schema_editor.connection.alias
+
+    last_id = 0
+    while True:
+        first_message = (
+            ChatHistory.objects.using(db_alias)
+            .filter(conversation=OuterRef("pk"))
+            .order_by("created_at", "id")
+            .values("message")[:1]
+        )
+        conversations = list(
+            Conversation.objects.using(db_alias)
+            .filter(id__gt=last_id)
+            .annotate(first=Subquery(first_message))
+            .order_by("id")[:BATCH_SIZE]
+        )
+        if not conversations:
+            break
+        ids = [conversation.id for conversation in conversations]
+        stats = {
+            row["conversation_id"]: row
+            for row in ChatHistory.objects.using(db_alias)
+            .filter(conversation_id__in=ids)
+            .values("conversation_id")
+            .annotate(count=Count("id"), last=Max("created_at"))
+        }
+
+        for conversation in conversations:
+            row = stats.get(conversation.id)
+            conversation.first_message = " ".join((conversation.first or "").split())[:PREVIEW_CHARS]
+            conversation.message_count = row["count"] if row else 0
+            conversation.last_activity_at = (row["last"] if row else None) or conversation.created_at
+
+        # One short transaction per batch keeps locks brief on large tables.
+        with transaction.atomic(using=db_alias):
+            Conversation.objects.using(db_alias).bulk_update(
+                conversations, ["first_message", "message_count", "last_activity_at"]
+            )
+        last_id = ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0009_conversation_summary_and_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_conversation_summary, migrations.RunPython.noop),
+    ]
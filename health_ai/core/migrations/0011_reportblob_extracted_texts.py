@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_backfill_conversation_summary'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='reportblob',
+            name='extracted_text',
+        ),
+        migrations.AddField(
+            model_name='reportblob',
+            name='extracted_texts',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.conf import settings
+import os
 
 
 class User(AbstractUser):
@@ -47,6 +48,15 @@ class FAQ(models.Model):
 class Conversation(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Summary columns kept in step with ChatHistory by core/chat_store.py.
+    first_message = models.CharField(max_length=255, blank=True, default='')
+    message_count = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='conversation_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.created_at}"
@@ -69,13 +79,46 @@ class ChatHistory(models.Model):
     language = models.CharField(max_length=10)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['conversation', 'created_at', 'id'], name='chathistory_conv_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.created_at}"
 
 
+def report_blob_upload_to(instance, filename):
+    ext = os.path.splitext(filename or "")[1].lower()
+    return f"reports/blobs/{instance.sha256[:2]}/{instance.sha256}{ext}"
+
+
+class ReportBlob(models.Model):
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to=report_blob_upload_to)
+    size = models.PositiveBigIntegerField(default=0)
+    # Extracted text keyed like processed_outputs: OCR of images and scanned
+    # pages depends on the requested language.
+    extracted_texts = models.JSONField(default=dict, blank=True)
+    # Final responses keyed by requested output language ("auto" when none was given).
+    processed_outputs = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+
 class UploadedReport(models.Model):
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    blob = models.ForeignKey(
+        ReportBlob,
+        on_delete=models.SET_NULL,
+        related_name="reports",
+        null=True,
+        blank=True
+    )
     file = models.FileField(upload_to='reports/')
     extracted_text = models.TextField(null=True, blank=True)
     processed_output = models.TextField(null=True, blank=True)
@@ -83,3 +126,24 @@ class UploadedReport(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.created_at}"
+
+
+class UploadSession(models.Model):
+
+    STATUS_CHOICES = (
+        ('active', 'Active'),
+        ('completed', 'Completed'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    file_name = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True, default='')
+    total_size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True, default='')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.file_name} ({self.received}/{self.total_size})"
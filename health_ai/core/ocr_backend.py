@@ -0,0 +1,200 @@
+import os
+import shutil
+import threading
+from django.conf import settings
+from .pipeline_stats import increment, stage
+
+try:
+    import tesserocr
+except Exception:
+    tesserocr = None
+
+backend = None
+_available_languages = None
+_tesseract_ready = None
+_lock = threading.Lock()
+
+
+def _resolve_tessdata_dir():
+    candidates = [
+        os.getenv("TESSDATA_PREFIX", "").strip(),
+        os.path.join(os.getenv("LOCALAPPDATA", ""), "TesseractData", "tessdata"),
+        r"C:\Program Files\Tesseract-OCR\tessdata",
+        r"C:\Program Files (x86)\Tesseract-OCR\tessdata",
+    ]
+    for raw in candidates:
+        if not raw:
+            continue
+        path = raw.rstrip("\\/")
+        if os.path.isdir(path):
+            return path
+    return ""
+
+
+# Spawns one `tesseract` process per call (pytesseract). Kept as the fallback
+# when libtesseract bindings are not installed.
+class PytesseractBackend:
+
+    name = "pytesseract"
+
+    def is_ready(self):
+        try:
+            import pytesseract
+        except Exception:
+            return False
+
+        if shutil.which("tesseract"):
+            return True
+
+        candidates = [
+            os.getenv("TESSERACT_CMD", "").strip(),
+            r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+            r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
+        ]
+        for path in candidates:
+            if path and os.path.exists(path):
+                pytesseract.pytesseract.tesseract_cmd = path
+                return True
+
+        return False
+
+    def languages(self):
+        import pytesseract
+        return pytesseract.get_languages(config="") or []
+
+    def image_to_string(self, image, lang, psm):
+        import pytesseract
+        return pytesseract.image_to_string(image, lang=lang, config=f"--oem 3 --psm {psm}") or ""
+
+    def detect_orientation_script(self, image):
+        import pytesseract
+        osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+        return {
+            "orient_deg": int(osd.get("orientation", 0) or 0),
+            "orient_conf": float(osd.get("orientation_conf", 0) or 0),
+            "script": osd.get("script", "") or "",
+            "script_conf": float(osd.get("script_conf", 0) or 0),
+        }
+
+
+# In-process libtesseract engine. Each worker thread keeps one loaded engine per
+# language combination, so models are read from disk once per worker.
+class TesserocrBackend:
+
+    name = "tesserocr"
+
+    def __init__(self):
+        self._local = threading.local()
+        self._tessdata = _resolve_tessdata_dir()
+
+    def _api(self, lang):
+        apis = getattr(self._local, "apis", None)
+        if apis is None:
+            apis = self._local.apis = {}
+        api = apis.get(lang)
+        if api is None:
+            if self._tessdata:
+                api = tesserocr.PyTessBaseAPI(path=self._tessdata, lang=lang)
+            else:
+                api = tesserocr.PyTessBaseAPI(lang=lang)
+            apis[lang] = api
+        return api
+
+    def is_ready(self):
+        try:
+            return bool(self.languages())
+        except Exception:
+            return False
+
+    def languages(self):
+        if self._tessdata:
+            _path, langs = tesserocr.get_languages(self._tessdata)
+        else:
+            _path, langs = tesserocr.get_languages()
+        return langs or []
+
+    def image_to_string(self, image, lang, psm):
+        api = self._api(lang)
+        api.SetPageSegMode(psm)
+        api.SetImage(image)
+        return api.GetUTF8Text() or ""
+
+    def detect_orientation_script(self, image):
+        api = self._api("osd")
+        api.SetPageSegMode(tesserocr.PSM.OSD_ONLY)
+        api.SetImage(image)
+        osd = api.DetectOrientationScript() or {}
+        return {
+            "orient_deg": int(osd.get("orient_deg", 0) or 0),
+            "orient_conf": float(osd.get("orient_conf", 0) or 0),
+            "script": osd.get("script_name", "") or "",
+            "script_conf": float(osd.get("script_conf", 0) or 0),
+        }
+
+
+def get_backend():
+    global backend
+    if backend is not None:
+        return backend
+
+    with _lock:
+        if backend is None:
+            choice = (getattr(settings, "OCR_BACKEND", "auto") or "auto").strip().lower()
+            if choice == "stub" or getattr(settings, "BACKEND_STUBS", False):
+                from .stubs import StubOcrBackend
+                backend = StubOcrBackend()
+            elif choice in {"auto", "tesserocr"} and tesserocr is not None:
+                candidate = TesserocrBackend()
+                backend = candidate if candidate.is_ready() else PytesseractBackend()
+            else:
+                backend = PytesseractBackend()
+    return backend
+
+
+def is_ready():
+    global _tesseract_ready
+    if _tesseract_ready is None:
+        _tesseract_ready = get_backend().is_ready()
+    return _tesseract_ready
+
+
+def available_languages():
+    # Discovered once per worker; installed traineddata does not change at runtime.
+    global _available_languages
+    if _available_languages is None:
+        try:
+            langs = get_backend().languages()
+            _available_languages = frozenset(str(lang).strip().lower() for lang in langs)
+        except Exception:
+            _available_languages = frozenset()
+    return _available_languages
+
+
+def image_to_string(image, lang, psm=3):
+    with stage("ocr_pass"):
+        increment("ocr_passes")
+        return get_backend().image_to_string(image, lang, psm)
+
+
+def detect_orientation_script(image):
+    # Needs osd.traineddata; callers fall back to a script probe when it is missing.
+    if "osd" not in available_languages():
+        return None
+    try:
+        with stage("ocr_osd"):
+            increment("ocr_passes")
+            return get_backend().detect_orientation_script(image)
+    except Exception:
+        return None
+
+
+def warm_up(langs=()):
+    if not is_ready():
+        return False
+    available = available_languages()
+    active = get_backend()
+    if isinstance(active, TesserocrBackend):
+        for lang in langs:
+            if all(part in available for part in lang.split("+")):
+                active._api(lang)
+    return True
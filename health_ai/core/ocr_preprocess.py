@@ -0,0 +1,219 @@
+from statistics import median
+from django.conf import settings
+from PIL import Image, ImageFilter, ImageOps
+
+if hasattr(Image, "Resampling"):
+    UPSAMPLE_FILTER = Image.Resampling.LANCZOS
+    ROTATE_FILTER = Image.Resampling.BICUBIC
+    PROFILE_FILTER = Image.Resampling.BOX
+    NEAREST_FILTER = Image.Resampling.NEAREST
+else:
+    UPSAMPLE_FILTER = Image.LANCZOS
+    ROTATE_FILTER = Image.BICUBIC
+    PROFILE_FILTER = Image.BOX
+    NEAREST_FILTER = Image.NEAREST
+
+THUMBNAIL_MAX_SIDE = 1000
+SKEW_MAX_DEGREES = 5.0
+SKEW_STEP_DEGREES = 0.5
+INK_THRESHOLD = 165
+BINARY_LUT = [255 if p > INK_THRESHOLD else 0 for p in range(256)]
+INK_LUT = [255 if p <= INK_THRESHOLD else 0 for p in range(256)]
+
+
+def _tile_max_pixels():
+    return int(getattr(settings, "OCR_TILE_MAX_PIXELS", 6_000_000))
+
+
+def _small_glyph_px():
+    return int(getattr(settings, "OCR_SMALL_GLYPH_PX", 24))
+
+
+def _ink_thumbnail(gray):
+    # Downscaled ink mask (ink=255) used for every layout decision on the page.
+    factor = max(1, max(gray.size) // THUMBNAIL_MAX_SIDE)
+    thumb = gray.reduce(factor) if factor > 1 else gray.copy()
+    ink = ImageOps.autocontrast(thumb).point(INK_LUT)
+    thumb.close()
+    return ink, factor
+
+
+def _row_profile(ink):
+    # Mean ink per row, computed by PIL by squashing the mask to one column.
+    column = ink.resize((1, ink.height), PROFILE_FILTER)
+    profile = list(column.getdata())
+    column.close()
+    return profile
+
+
+def _estimate_skew(ink):
+    best_angle = 0.0
+    best_score = None
+    steps = int(SKEW_MAX_DEGREES / SKEW_STEP_DEGREES)
+    # 0 first, then outwards: only a strictly sharper profile moves the angle,
+    # so blank/uniform pages stay unrotated and ties keep the smaller rotation.
+    for step in sorted(range(-steps, steps + 1), key=abs):
+        angle = step * SKEW_STEP_DEGREES
+        rotated = ink.rotate(angle, resample=NEAREST_FILTER, fillcolor=0) if angle else ink
+        profile = _row_profile(rotated)
+        # Text lines aligned with rows give the sharpest projection profile.
+        score = sum((a - b) ** 2 for a, b in zip(profile, profile[1:]))
+        if best_score is None or score > best_score:
+            best_score = score
+            best_angle = angle
+    return best_angle
+
+
+def _text_bbox(ink):
+    denoised = ink.filter(ImageFilter.MedianFilter(3))
+    bbox = denoised.getbbox()
+    denoised.close()
+    if not bbox:
+        return None
+    left, top, right, bottom = bbox
+    if (right - left) * (bottom - top) < 0.01 * ink.width * ink.height:
+        return None
+    pad_x = max(2, int(ink.width * 0.02))
+    pad_y = max(2, int(ink.height * 0.02))
+    return (
+        max(0, left - pad_x),
+        max(0, top - pad_y),
+        min(ink.width, right + pad_x),
+        min(ink.height, bottom + pad_y),
+    )
+
+
+def _ink_runs(profile, min_level=4):
+    runs = []
+    start = None
+    for index, level in enumerate(profile):
+        if level >= min_level and start is None:
+            start = index
+        elif level < min_level and start is not None:
+            runs.append((start, index))
+            start = None
+    if start is not None:
+        runs.append((start, len(profile)))
+    return runs
+
+
+def _split_rows(height, max_rows, blank_rows, factor):
+    # Cut tall pages at blank rows (line gaps) so no text line is split.
+    bounds = []
+    start = 0
+    while height - start > max_rows:
+        target = start + max_rows
+        floor = start + max_rows // 2
+        cut = next(
+            (row * factor for row in reversed(blank_rows) if floor <= row * factor <= target),
+            target,
+        )
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, height))
+    return bounds
+
+
+def _upscale_for(runs, factor):
+    line_heights = [(end - start) * factor for start, end in runs]
+    glyph_px = median(line_heights) if line_heights else 0
+    return 2 if 0 < glyph_px < _small_glyph_px() else 1
+
+
+def text_line_stats(gray):
+    # (number of text lines, median line height in pixels) from the ink profile.
+    ink, factor = _ink_thumbnail(gray)
+    runs = _ink_runs(_row_profile(ink))
+    ink.close()
+    line_heights = [(end - start) * factor for start, end in runs]
+    return len(line_heights), (median(line_heights) if line_heights else 0)
+
+
+def estimate_line_height(gray):
+    return text_line_stats(gray)[1]
+
+
+class PreparedPage:
+
+    def __init__(self, gray, tile_bounds):
+        self.gray = gray
+        self.tile_bounds = tile_bounds
+
+    def tiles(self):
+        # Yields (tile, upscale) so only tiles with small glyphs get upsampled.
+        for top, bottom, upscale in self.tile_bounds:
+            yield self.gray.crop((0, top, self.gray.width, bottom)), upscale
+
+    def close(self):
+        self.gray.close()
+
+
+def prepare_page(image):
+    if image.mode not in {"L", "RGB"}:
+        rgb = image.convert("RGB")
+        gray = rgb.convert("L")
+        rgb.close()
+    else:
+        gray = image.convert("L")
+
+    ink, factor = _ink_thumbnail(gray)
+    angle = _estimate_skew(ink)
+    if angle:
+        rotated = gray.rotate(angle, resample=ROTATE_FILTER, expand=True, fillcolor=255)
+        gray.close()
+        ink.close()
+        gray = rotated
+        ink, factor = _ink_thumbnail(gray)
+
+    bbox = _text_bbox(ink)
+    if bbox:
+        left, top, right, bottom = bbox
+        cropped = gray.crop((left * factor, top * factor, right * factor, bottom * factor))
+        gray.close()
+        gray = cropped
+        trimmed = ink.crop(bbox)
+        ink.close()
+        ink = trimmed
+
+    profile = _row_profile(ink)
+    ink.close()
+    max_rows = max(64, _tile_max_pixels() // max(1, gray.width))
+    blank_rows = [index for index, level in enumerate(profile) if level == 0]
+    tile_bounds = []
+    for top, bottom in _split_rows(gray.height, max_rows, blank_rows, factor):
+        upscale = _upscale_for(_ink_runs(profile[top // factor:bottom // factor]), factor)
+        if upscale == 1:
+            tile_bounds.append((top, bottom, 1))
+            continue
+        # Upscaled tiles are split again so they still fit the pixel budget.
+        small_rows = max(32, max_rows // (upscale * upscale))
+        offset = top // factor
+        tile_blank_rows = [row - offset for row in blank_rows if offset <= row < bottom // factor]
+        for sub_top, sub_bottom in _split_rows(bottom - top, small_rows, tile_blank_rows, factor):
+            tile_bounds.append((top + sub_top, top + sub_bottom, upscale))
+    return PreparedPage(gray, tile_bounds)
+
+
+def ocr_variants(tile, upscale=1):
+    # Yields one preprocessing variant at a time and drops each intermediate as
+    # soon as the next one is derived, so at most two page-sized copies are live.
+    yield tile
+    autocontrast = ImageOps.autocontrast(tile)
+    yield autocontrast
+    sharpened = autocontrast.filter(ImageFilter.SHARPEN)
+    autocontrast.close()
+    yield sharpened
+    if upscale > 1:
+        upscaled = sharpened.resize(
+            (max(1, sharpened.width * upscale), max(1, sharpened.height * upscale)),
+            UPSAMPLE_FILTER,
+        )
+        sharpened.close()
+        yield upscaled
+        thresholded = upscaled.point(BINARY_LUT)
+        upscaled.close()
+    else:
+        thresholded = sharpened.point(BINARY_LUT)
+        sharpened.close()
+    yield thresholded
+    thresholded.close()
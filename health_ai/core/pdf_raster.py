@@ -0,0 +1,104 @@
+from django.conf import settings
+
+from .pipeline_stats import stage
+
+try:
+    import pypdfium2 as pdfium
+except Exception:
+    pdfium = None
+
+PROBE_DPI = 72
+
+
+def _setting(name, default):
+    return int(getattr(settings, name, default))
+
+
+# Renders straight from PDFium into an 8-bit grayscale bitmap, skipping the
+# RGB render and annotation pass that pdfplumber's page.to_image() performs.
+class PdfiumRasterizer:
+
+    name = "pypdfium2"
+
+    def __init__(self, uploaded_file):
+        temporary_path = getattr(uploaded_file, "temporary_file_path", None)
+        if temporary_path:
+            source = temporary_path()
+        else:
+            uploaded_file.seek(0)
+            source = uploaded_file.read()
+        self._doc = pdfium.PdfDocument(source)
+
+    def page_size(self, page_index):
+        return self._doc[page_index].get_size()
+
+    def render(self, page_index, dpi):
+        page = self._doc[page_index]
+        try:
+            bitmap = page.render(scale=dpi / 72.0, grayscale=True, may_draw_forms=False)
+            return bitmap.to_pil()
+        finally:
+            page.close()
+
+    def close(self):
+        self._doc.close()
+
+
+class PdfplumberRasterizer:
+
+    name = "pdfplumber"
+
+    def __init__(self, pdf):
+        self._pdf = pdf
+
+    def page_size(self, page_index):
+        page = self._pdf.pages[page_index]
+        return page.width, page.height
+
+    def render(self, page_index, dpi):
+        image = self._pdf.pages[page_index].to_image(resolution=dpi).original
+        gray = image.convert("L")
+        image.close()
+        return gray
+
+    def close(self):
+        pass
+
+
+def open_rasterizer(uploaded_file, pdf):
+    choice = (getattr(settings, "PDF_RASTERIZER", "auto") or "auto").strip().lower()
+    if choice in {"auto", "pypdfium2"} and pdfium is not None:
+        try:
+            return PdfiumRasterizer(uploaded_file)
+        except Exception:
+            pass
+    return PdfplumberRasterizer(pdf)
+
+
+def choose_dpi(rasterizer, page_index):
+    from .ocr_preprocess import estimate_line_height
+
+    min_dpi = _setting("PDF_RASTER_MIN_DPI", 150)
+    max_dpi = _setting("PDF_RASTER_MAX_DPI", 300)
+    target_line_px = _setting("PDF_RASTER_TARGET_LINE_PX", 32)
+    max_pixels = _setting("PDF_RASTER_MAX_PIXELS", 9_000_000)
+
+    # A cheap low-resolution probe tells how tall text lines are on this page.
+    probe = rasterizer.render(page_index, PROBE_DPI)
+    try:
+        line_px = estimate_line_height(probe)
+    finally:
+        probe.close()
+    dpi = PROBE_DPI * target_line_px / line_px if line_px else max_dpi
+    dpi = max(min_dpi, min(max_dpi, dpi))
+
+    width_pt, height_pt = rasterizer.page_size(page_index)
+    page_pixels = (width_pt / 72.0 * dpi) * (height_pt / 72.0 * dpi)
+    if page_pixels > max_pixels:
+        dpi *= (max_pixels / page_pixels) ** 0.5
+    return max(72, int(dpi))
+
+
+def render_page_for_ocr(rasterizer, page_index):
+    with stage("rasterize"):
+        return rasterizer.render(page_index, choose_dpi(rasterizer, page_index))
@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .metrics import count, observe
+
+# Process-wide counters for pipeline work (pages, OCR passes, LLM calls, ...).
+totals = Counter()
+_lock = threading.Lock()
+_current = ContextVar("pipeline_stats", default=None)
+# Per-request stage timings (set by ServerTimingMiddleware) and the stage that
+# is running, so counters can be attributed to it.
+_timings = ContextVar("pipeline_timings", default=None)
+_stage = ContextVar("pipeline_stage", default=None)
+
+
+def increment(name, amount=1):
+    _add(name, amount)
+    count("pipeline_events_total", amount, event=name)
+
+
+def fold(stats):
+    # Adds counts made in an OCR lane worker process to this request and the
+    # process totals. The worker exported them to the metrics itself.
+    for name, amount in stats.items():
+        _add(name, amount)
+
+
+def _add(name, amount):
+    stats = _current.get()
+    if stats is not None:
+        stats[name] += amount
+    timings = _timings.get()
+    stage_name = _stage.get()
+    if timings is not None and stage_name is not None:
+        timings.add(stage_name, **{name: amount})
+    with _lock:
+        totals[name] += amount
+
+
+@contextmanager
+def collect():
+    # Counts work done inside the block (in this thread/context) separately
+    # from the process totals, e.g. per document or per request.
+    stats = Counter()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def snapshot():
+    with _lock:
+        return dict(totals)
+
+
+class Timings:
+    # stage name -> {"ms": total milliseconds, "count": runs, <counter>: n, ...}.
+    # Shared by the threads a request fans out to, hence the lock.
+
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, ms=0.0, count=0, **counters):
+        with self._lock:
+            entry = self.stages.setdefault(name, Counter())
+            entry["ms"] += ms
+            entry["count"] += count
+            entry.update(counters)
+
+    def merge(self, stages):
+        for name, values in stages.items():
+            self.add(name, **values)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                name: {key: round(value, 1) if key == "ms" else value for key, value in entry.items()}
+                for name, entry in self.stages.items()
+            }
+
+
+@contextmanager
+def record_timings(timings=None):
+    # Pass an existing Timings to keep adding to it (e.g. while a streamed
+    # response is produced after the view returned).
+    timings = timings or Timings()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def current_timings():
+    return _timings.get()
+
+
+def current_stage():
+    return _stage.get()
+
+
+@contextmanager
+def stage(name):
+    # Times the block as one run of `name` (in the metrics and, inside a timed
+    # request, in its timings); counters incremented inside it (LLM calls,
+    # tokens, OCR passes, ...) are attributed to it as well.
+    token = _stage.set(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+        record_stage(name, time.perf_counter() - started)
+
+
+def record_stage(name, seconds):
+    # One run of `name` timed by the caller, for work that cannot sit in a
+    # single `with stage(...)` block (e.g. waits spread over a generator).
+    observe("pipeline_stage_duration_seconds", seconds, stage=name)
+    timings = _timings.get()
+    if timings is not None:
+        timings.add(name, ms=seconds * 1000, count=1)
+
+
+def time_query(execute, sql, params, many, context):
+    # Database execute wrapper (installed in CoreConfig.ready): times queries
+    # as db_read / db_write stages while a request is being timed.
+    if _timings.get() is None:
+        return execute(sql, params, many, context)
+    name = "db_read" if sql.lstrip()[:6].upper() == "SELECT" else "db_write"
+    with stage(name):
+        return execute(sql, params, many, context)
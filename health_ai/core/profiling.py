@@ -0,0 +1,244 @@
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+# Sampling profiler for production requests. A profiled request registers the
+# threads doing its work (the request thread, chat lane threads it hands work
+# to); one background thread per process samples their stacks every
+# PROFILE_SAMPLE_INTERVAL_MS. OCR lane processes sample themselves and send
+# their stacks back with the extraction result. Profiles are stored as
+# flamegraph-collapsed stacks in PROFILE_DIR, keeping the newest
+# PROFILE_RING_SIZE. Unlike cProfile this costs nothing in the profiled code
+# and any number of requests can be profiled at once.
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_ID_RE = re.compile(r"^[\w.-]+$")
+
+_profile = ContextVar("request_profile", default=None)
+_registered = {}
+_cond = threading.Condition()
+_sampler = None
+
+
+class RequestProfile:
+
+    def __init__(self):
+        self.stacks = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def add(self, stack, count=1):
+        with self._lock:
+            self.stacks[stack] += count
+            self.samples += count
+
+    def merge(self, stacks, prefix):
+        for stack, count in stacks.items():
+            self.add(f"{prefix};{stack}", count)
+
+
+def _frame_name(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame):
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _sample_forever():
+    while True:
+        with _cond:
+            while not _registered:
+                _cond.wait()
+            targets = list(_registered.items())
+        frames = sys._current_frames()
+        for ident, profile in targets:
+            frame = frames.get(ident)
+            if frame is not None:
+                profile.add(_collapse(frame))
+        time.sleep(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000.0)
+
+
+def _ensure_sampler():
+    global _sampler
+    # Keyed by pid: a forked child needs its own thread.
+    if _sampler == os.getpid():
+        return
+    _sampler = os.getpid()
+    threading.Thread(target=_sample_forever, name="profile-sampler", daemon=True).start()
+
+
+def current_profile():
+    return _profile.get()
+
+
+@contextmanager
+def sampling(profile):
+    # Samples the calling thread into `profile` (no-op for None) and makes it
+    # the current profile, so lane jobs submitted from here are sampled too.
+    if profile is None:
+        yield
+        return
+    ident = threading.get_ident()
+    token = _profile.set(profile)
+    with _cond:
+        _ensure_sampler()
+        previous = _registered.get(ident)
+        _registered[ident] = profile
+        _cond.notify()
+    try:
+        yield
+    finally:
+        with _cond:
+            if previous is None:
+                _registered.pop(ident, None)
+            else:
+                _registered[ident] = previous
+        _profile.reset(token)
+
+
+def sampled_call(fn, *args):
+    # Runs a thread lane job under the submitting request's profile.
+    with sampling(_profile.get()):
+        return fn(*args)
+
+
+def _wants_profile(request):
+    if request.META.get(PROFILE_HEADER) == "1":
+        user = getattr(request, "user", None)
+        if user is not None and user.is_staff:
+            return True
+    return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def _save(profile_id, meta, profile):
+    directory = settings.PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{profile_id}.json")
+    with profile._lock:
+        stacks = dict(profile.stacks)
+        samples = profile.samples
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as handle:
+        json.dump({**meta, "samples": samples, "stacks": stacks}, handle)
+    os.replace(temporary, path)
+
+    # Bounded ring: drop the oldest profiles beyond PROFILE_RING_SIZE.
+    names = sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+    for name in names[: max(0, len(names) - settings.PROFILE_RING_SIZE)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+def _finish(profile_id, meta, profile, started, response):
+    meta["status"] = response.status_code
+    meta["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    try:
+        _save(profile_id, meta, profile)
+    except OSError:
+        pass
+
+
+def _profiled_stream(content, profile_id, meta, profile, started, response):
+    iterator = iter(content)
+    try:
+        while True:
+            with sampling(profile):
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    break
+            yield chunk
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+        _finish(profile_id, meta, profile, started, response)
+
+
+def profiled(view):
+    # Apply below @api_view (so request.user is authenticated). A request is
+    # profiled when a staff user sends "X-Profile: 1", or at random with
+    # probability PROFILE_SAMPLE_RATE. The response carries X-Profile-Id.
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not _wants_profile(request):
+            return view(request, *args, **kwargs)
+        profile = RequestProfile()
+        # Sortable by time, so the ring drops the oldest first.
+        profile_id = f"{time.time_ns()}-{os.getpid()}-{view.__name__}"
+        user = getattr(request, "user", None)
+        meta = {
+            "id": profile_id,
+            "view": view.__name__,
+            "method": request.method,
+            "path": request.path,
+            "user_id": getattr(user, "id", None),
+            "pid": os.getpid(),
+            "started_at": time.time(),
+            "interval_ms": settings.PROFILE_SAMPLE_INTERVAL_MS,
+        }
+        started = time.perf_counter()
+        with sampling(profile):
+            response = view(request, *args, **kwargs)
+        response["X-Profile-Id"] = profile_id
+        if getattr(response, "streaming", False):
+            response.streaming_content = _profiled_stream(
+                response.streaming_content, profile_id, meta, profile, started, response
+            )
+        else:
+            _finish(profile_id, meta, profile, started, response)
+        return response
+
+    return wrapper
+
+
+def list_profiles():
+    directory = settings.PROFILE_DIR
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        data.pop("stacks", None)
+        profiles.append(data)
+    return profiles
+
+
+def load_profile(profile_id):
+    if not PROFILE_ID_RE.match(profile_id or ""):
+        return None
+    try:
+        with open(os.path.join(settings.PROFILE_DIR, f"{profile_id}.json")) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def collapsed_stacks(profile_data):
+    # One "frame;frame;... count" line per stack, root first (flamegraph.pl,
+    # speedscope, inferno).
+    stacks = sorted(profile_data.get("stacks", {}).items(), key=lambda item: -item[1])
+    return "".join(f"{stack} {count}\n" for stack, count in stacks)
@@ -0,0 +1,90 @@
+import re
+from bisect import bisect_right
+from functools import lru_cache
+
+SECTION_LABELS = {
+    "disease": ("Disease Name", "Disease", "Name of the disease", "Illness", "Condition"),
+    "symptoms": ("Symptoms", "Symptom", "Common symptoms"),
+    "causes": ("Possible Causes", "Possible Cause", "Causes"),
+    "home_care": ("Home Care", "Home Care Advice", "Home Management", "Home Management & Support"),
+    "when_to_visit": ("When to Visit a Doctor", "When to Visit Doctor", "When to Visit"),
+}
+
+# A section value runs until the next section heading word (or the end of text).
+STOP_RE = re.compile(
+    r"\bDisease(?:\s*Name)?\b|\bSymptoms?\b|\bPossible\s*Causes?\b|"
+    r"\bHome\s*Care(?:\s*Advice)?\b|\bHome\s*Management(?:\s*&\s*Support)?\b|"
+    r"\bWhen\s*to\s*Visit(?:\s*a)?\s*Doctor\b",
+    re.IGNORECASE,
+)
+
+# Every label and every stop heading starts with one of these words, so a single
+# scan for them finds all candidate positions in the text.
+ANCHOR_WORDS = ("condition", "possible", "symptom", "disease", "illness", "common", "cause", "home", "name", "when")
+ANCHOR_RE = re.compile("|".join(ANCHOR_WORDS), re.IGNORECASE)
+
+ALL_LABELS = tuple(dict.fromkeys(label for labels in SECTION_LABELS.values() for label in labels))
+LABEL_RES = {
+    label: re.compile(rf"{re.escape(label)}\s*[:\-]\s*", re.IGNORECASE)
+    for label in ALL_LABELS
+}
+LABELS_BY_WORD = {}
+for _label in ALL_LABELS:
+    _word = next(word for word in ANCHOR_WORDS if _label.lower().startswith(word))
+    LABELS_BY_WORD.setdefault(_word, []).append(_label)
+
+
+class ParsedReport:
+
+    def __init__(self, text, label_hits, stops):
+        self.text = text
+        self._label_hits = label_hits
+        self._stops = stops
+
+    def _value_end(self, value_start):
+        index = bisect_right(self._stops, value_start)
+        return self._stops[index] if index < len(self._stops) else len(self.text)
+
+    def field(self, labels):
+        # Leftmost labelled occurrence wins; at equal positions the earlier
+        # label in `labels` wins, matching an ordered regex alternation.
+        best = None
+        for order, label in enumerate(labels):
+            for position, value_start in self._label_hits.get(label, ()):
+                if value_start >= len(self.text):
+                    continue
+                if best is None or (position, order) < best[:2]:
+                    best = (position, order, value_start)
+                break
+        if best is None:
+            return ""
+        value_start = best[2]
+        return self.text[value_start:self._value_end(value_start)].strip(" .;,\n\t")
+
+    def section(self, name):
+        return self.field(SECTION_LABELS[name])
+
+    def sections(self):
+        return {name: self.section(name) for name in SECTION_LABELS}
+
+
+def _scan(text):
+    label_hits = {}
+    stops = []
+    for anchor in ANCHOR_RE.finditer(text):
+        position = anchor.start()
+        stop = STOP_RE.match(text, position)
+        if stop:
+            stops.append(position)
+        for label in LABELS_BY_WORD.get(anchor.group(0).lower(), ()):
+            hit = LABEL_RES[label].match(text, position)
+            if hit:
+                label_hits.setdefault(label, []).append((position, hit.end()))
+    return label_hits, stops
+
+
+@lru_cache(maxsize=64)
+def parse_report(text):
+    value = " ".join((text or "").split())
+    label_hits, stops = _scan(value)
+    return ParsedReport(value, label_hits, stops)
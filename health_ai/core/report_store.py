@@ -0,0 +1,132 @@
+import hashlib
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db import IntegrityError, transaction
+
+from .models import ReportBlob, report_blob_upload_to
+
+
+# Hashes multipart uploads while Django streams them in. Chunks are passed on
+# unchanged, so the default memory/temporary-file handlers still build the file.
+class ContentHashUploadHandler(FileUploadHandler):
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.digests = []
+        self._digest = None
+        self._size = 0
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._digest = hashlib.sha256()
+        self._size = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        if self._digest is not None:
+            self._digest.update(raw_data)
+            self._size += len(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self._digest is not None:
+            self.digests.append((self.field_name, self.file_name, self._digest.hexdigest(), self._size))
+            self._digest = None
+        return None
+
+
+def hash_uploaded_file(uploaded_file):
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    try:
+        uploaded_file.seek(0)
+    except Exception:
+        pass
+    return digest.hexdigest(), size
+
+
+def uploaded_file_digest(request, uploaded_file):
+    # Prefer the digest computed during upload parsing; hash the file otherwise.
+    # Digests are recorded in upload order, the order the parser appends files
+    # to request.FILES, so the n-th file of a field has the n-th digest of that
+    # field (names alone are ambiguous: phone photos are all "image.jpg").
+    django_request = getattr(request, "_request", request)
+    for handler in getattr(django_request, "upload_handlers", None) or []:
+        digests = getattr(handler, "digests", None)
+        if not digests:
+            continue
+        for field, files in request.FILES.lists():
+            for index, candidate in enumerate(files):
+                if candidate is not uploaded_file:
+                    continue
+                field_digests = [(digest, size) for name, _file_name, digest, size in digests if name == field]
+                if index < len(field_digests) and field_digests[index][1] == uploaded_file.size:
+                    return field_digests[index]
+    return hash_uploaded_file(uploaded_file)
+
+
+def find_report_blob(digest):
+    if not digest:
+        return None
+    return ReportBlob.objects.filter(sha256=digest).first()
+
+
+def store_report_blob(uploaded_file, digest, size):
+    existing = find_report_blob(digest)
+    if existing:
+        return existing
+
+    blob = ReportBlob(sha256=digest, size=size)
+    name = report_blob_upload_to(blob, uploaded_file.name)
+    if default_storage.exists(name):
+        blob.file.name = name
+    else:
+        blob.file.save(name, uploaded_file, save=False)
+
+    try:
+        with transaction.atomic():
+            blob.save()
+    except IntegrityError:
+        # Another worker stored the same content first; keep its blob.
+        if blob.file.name != name:
+            default_storage.delete(blob.file.name)
+        return ReportBlob.objects.get(sha256=digest)
+    return blob
+
+
+def cached_extracted_text(blob, language_key):
+    return (blob.extracted_texts or {}).get(language_key) if blob else None
+
+
+def remember_extracted_text(blob, language_key, extracted_text):
+    if not extracted_text or cached_extracted_text(blob, language_key):
+        return
+    blob.extracted_texts = _remember(blob, "extracted_texts", language_key, extracted_text)
+
+
+def cached_processed_output(blob, output_key):
+    entry = (blob.processed_outputs or {}).get(output_key) if blob else None
+    if not entry or not entry.get("response"):
+        return None
+    return entry
+
+
+def remember_processed_output(blob, output_key, response, language):
+    blob.processed_outputs = _remember(
+        blob, "processed_outputs", output_key, {"response": response, "language": language}
+    )
+
+
+def _remember(blob, field, key, value):
+    # Per-language entries of a JSON column, updated under a row lock so
+    # concurrent uploads of the same content keep each other's entries.
+    with transaction.atomic():
+        locked = ReportBlob.objects.select_for_update().get(pk=blob.pk)
+        entries = dict(getattr(locked, field) or {})
+        entries[key] = value
+        setattr(locked, field, entries)
+        locked.save(update_fields=[field])
+    return entries
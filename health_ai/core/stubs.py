@@ -0,0 +1,108 @@
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+from django.conf import settings
+
+# Local stand-ins for Groq, gTTS and Tesseract, used when BACKEND_STUBS is set
+# (load tests, offline runs). Each call waits for STUB_*_LATENCY_MS (+/- the
+# jitter fraction) and returns a plausible answer, so the rest of the pipeline
+# - views, lanes, admission, database - runs as it does in production.
+
+REPORT_TEXT = (
+    "Patient Report\n"
+    "Disease: Fever\n"
+    "Symptoms: high temperature, body pain, chills\n"
+    "Possible Causes: viral infection\n"
+    "Home Care: rest well, drink fluids\n"
+    "When to Visit Doctor: if fever lasts more than 3 days\n"
+)
+
+
+def _latency(setting_ms):
+    jitter = settings.STUB_LATENCY_JITTER
+    return max(0.0, setting_ms / 1000.0 * random.uniform(1 - jitter, 1 + jitter))
+
+
+def _script_language(text):
+    if any("\u0900" <= ch <= "\u097f" for ch in text):
+        return "hi"
+    if any("\u0a80" <= ch <= "\u0aff" for ch in text):
+        return "gu"
+    return "en"
+
+
+def _completion_text(system_prompt, text):
+    if system_prompt.startswith("Detect"):
+        return _script_language(text)
+    if "English" in system_prompt:
+        english = " ".join("".join(ch for ch in text if ch.isascii()).split())
+        return english or "I have fever and headache."
+    if "to Hindi" in system_prompt:
+        return "अनुवाद: " + text
+    if "to Gujarati" in system_prompt:
+        return "અનુવાદ: " + text
+    return text
+
+
+def _completion(messages):
+    system_prompt = messages[0]["content"] if messages else ""
+    text = messages[-1]["content"] if messages else ""
+    content = _completion_text(system_prompt, text)
+    tokens = len(system_prompt.split()) + len(text.split()) + len(content.split())
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(total_tokens=tokens),
+    )
+
+
+class _Completions:
+
+    def create(self, model=None, messages=(), **kwargs):
+        time.sleep(_latency(settings.STUB_LLM_LATENCY_MS))
+        return _completion(messages)
+
+
+class _AsyncCompletions:
+
+    async def create(self, model=None, messages=(), **kwargs):
+        await asyncio.sleep(_latency(settings.STUB_LLM_LATENCY_MS))
+        return _completion(messages)
+
+
+class StubGroq:
+
+    def __init__(self, api_key=None):
+        self.chat = SimpleNamespace(completions=_Completions())
+
+
+class AsyncStubGroq:
+
+    def __init__(self, api_key=None):
+        self.chat = SimpleNamespace(completions=_AsyncCompletions())
+
+
+def speech_bytes(text, lang):
+    time.sleep(_latency(settings.STUB_TTS_LATENCY_MS))
+    # Roughly the size of a short gTTS MP3.
+    return b"ID3" + bytes(min(len(text or ""), 4000) * 8)
+
+
+class StubOcrBackend:
+
+    name = "stub"
+
+    def is_ready(self):
+        return True
+
+    def languages(self):
+        return ["eng", "hin", "guj", "osd"]
+
+    def image_to_string(self, image, lang, psm):
+        time.sleep(_latency(settings.STUB_OCR_LATENCY_MS))
+        return REPORT_TEXT
+
+    def detect_orientation_script(self, image):
+        time.sleep(_latency(settings.STUB_OCR_LATENCY_MS))
+        return {"orient_deg": 0, "orient_conf": 10.0, "script": "Latin", "script_conf": 10.0}
@@ -1,3 +1,265 @@
-from django.test import TestCase
+import base64
+import http.server
+import json
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import router
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import google_auth
+from .admission import admission, endpoint_class
+from .chat_store import add_chat_message, refresh_conversation_summary
+from .db_router import (
+    REPLICA_ALIAS,
+    PrimaryPinMiddleware,
+    _pin_key,
+    _read_alias,
+    _wrote,
+    check_pin_cache,
+    pin_to_primary,
+    replica_reads,
+)
+from .models import ChatHistory, Conversation, User
+
+SHARED_CACHE = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "django_cache"}}
+
+
+@replica_reads
+def _read_alias_view(request):
+    return JsonResponse({"alias": router.db_for_read(User)})
+
+
+# Routing decisions with a replica configured; the pins are kept in the
+# DatabaseCache settings.py uses when DATABASE_REPLICA_URL is set. To run the
+# views against two real SQLite files, see the db_router section of
+# IMPLEMENTATION_GUIDE.md.
+@override_settings(CACHES=SHARED_CACHE)
+class ReadReplicaRoutingTests(TestCase):
+
+    def setUp(self):
+        call_command("createcachetable", verbosity=0)
+        patcher = mock.patch("core.db_router.replica_configured", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username="reader", password="pw")
+        self.other = User.objects.create_user(username="other", password="pw")
+
+    def _read_alias(self, user):
+        request = self.factory.get("/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        request.user = user
+        return json.loads(PrimaryPinMiddleware(_read_alias_view)(request).content)["alias"]
+
+    def _write_request(self, user):
+        def view(request):
+            User.objects.filter(pk=user.pk).update(language="hi")
+            return HttpResponse()
+
+        request = self.factory.post("/")
+        request.user = user
+        PrimaryPinMiddleware(view)(request)
+
+    def test_unpinned_reads_go_to_replica(self):
+        self.assertEqual(self._read_alias(self.user), REPLICA_ALIAS)
+
+    def test_write_pins_the_user_to_primary(self):
+        self._write_request(self.user)
+        self.assertEqual(self._read_alias(self.user), "default")
+        self.assertEqual(self._read_alias(self.other), REPLICA_ALIAS)
+
+    def test_read_only_request_does_not_pin(self):
+        request = self.factory.get("/")
+        request.user = self.user
+        PrimaryPinMiddleware(lambda request: HttpResponse(list(User.objects.all())))(request)
+        self.assertEqual(self._read_alias(self.user), REPLICA_ALIAS)
+
+    def test_pin_is_visible_to_other_workers(self):
+        pin_to_primary(self.user.pk)
+        # A separate cache connection, as another worker process would open.
+        other_worker = caches.create_connection("default")
+        self.assertTrue(other_worker.get(_pin_key(self.user.pk)))
+
+    def test_pins_are_read_from_primary(self):
+        cache_model = caches["default"].cache_model_class
+        read_token = _read_alias.set(REPLICA_ALIAS)
+        wrote_token = _wrote.set(False)
+        try:
+            self.assertEqual(router.db_for_read(cache_model), "default")
+            router.db_for_write(cache_model)
+            self.assertFalse(_wrote.get())
+        finally:
+            _wrote.reset(wrote_token)
+            _read_alias.reset(read_token)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_per_process_cache_is_flagged(self):
+        self.assertEqual([warning.id for warning in check_pin_cache(None)], ["core.W001"])
+
+
+def _signing_key(kid):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from google.auth import crypt
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    numbers = key.public_key().public_numbers()
+
+    def b64(value):
+        return base64.urlsafe_b64encode(value.to_bytes((value.bit_length() + 7) // 8, "big")).rstrip(b"=").decode()
+
+    jwk = {"kty": "RSA", "kid": kid, "alg": "RS256", "use": "sig", "n": b64(numbers.n), "e": b64(numbers.e)}
+    return crypt.RSASigner.from_string(pem, kid), jwk
+
+
+class _KeySetHandler(http.server.BaseHTTPRequestHandler):
+    published = {"keys": []}
+    fetches = 0
+
+    def do_GET(self):
+        type(self).fetches += 1
+        body = json.dumps(self.published).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Cache-Control", "public, max-age=3600")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# Google sign-in against a key set served from a local server standing in for
+# GOOGLE_CERTS_URL.
+class GoogleKeySetTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.signer, jwk = _signing_key("current")
+        cls.unknown_signer, _jwk = _signing_key("unpublished")
+        _KeySetHandler.published = {"keys": [jwk]}
+        cls.server = http.server.HTTPServer(("127.0.0.1", 0), _KeySetHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.certs_url = f"http://127.0.0.1:{cls.server.server_port}/certs"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        _KeySetHandler.fetches = 0
+        patcher = mock.patch.object(google_auth, "cert_cache", google_auth.CertCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        settings_override = override_settings(GOOGLE_CERTS_URL=self.certs_url, GOOGLE_CLIENT_IDS=["web-client"])
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client = APIClient()
+
+    def _token(self, signer, **claims):
+        from google.auth import jwt
+
+        now = int(time.time())
+        claims = {
+            "iss": "https://accounts.google.com",
+            "aud": "web-client",
+            "sub": "1",
+            "email": "patient@example.com",
+            "name": "Google Patient",
+            "iat": now,
+            "exp": now + 600,
+            **claims,
+        }
+        return jwt.encode(signer, claims).decode()
+
+    def _login(self, token):
+        return self.client.post("/api/auth/google-login/", {"id_token": token}, format="json")
+
+    def test_keys_are_fetched_once_across_logins(self):
+        for _ in range(3):
+            self.assertEqual(self._login(self._token(self.signer)).status_code, 200)
+        self.assertEqual(_KeySetHandler.fetches, 1)
+
+    def test_wrong_audience_is_rejected(self):
+        self.assertEqual(self._login(self._token(self.signer, aud="other-client")).status_code, 401)
+
+    def test_unknown_key_id_refetches_once_then_rejects(self):
+        self.assertEqual(self._login(self._token(self.signer)).status_code, 200)
+        # Past the refetch interval, as a rotation would find the cache.
+        google_auth.cert_cache.fetched_at -= google_auth.UNKNOWN_KID_REFETCH_SECONDS + 1
+        self.assertEqual(self._login(self._token(self.unknown_signer)).status_code, 401)
+        self.assertEqual(_KeySetHandler.fetches, 2)
+        # A second token with that key id right away does not fetch again.
+        self.assertEqual(self._login(self._token(self.unknown_signer)).status_code, 401)
+        self.assertEqual(_KeySetHandler.fetches, 2)
+
+
+@admission("upload")
+def _streamed_upload_view(request):
+    return StreamingHttpResponse(iter(["start", "response"]))
+
+
+class AdmissionStreamingTests(TestCase):
+
+    def _active(self):
+        return endpoint_class("upload").stats()["active"]
+
+    def test_slot_is_held_until_the_stream_ends(self):
+        response = _streamed_upload_view(RequestFactory().post("/"))
+        self.assertEqual(self._active(), 1)
+        self.assertEqual(list(response), [b"start", b"response"])
+        self.assertEqual(self._active(), 0)
+        response.close()
+        self.assertEqual(self._active(), 0)
+
+    def test_slot_is_released_when_closed_before_the_first_chunk(self):
+        # A client that disconnects before anything was sent.
+        response = _streamed_upload_view(RequestFactory().post("/"))
+        response.close()
+        self.assertEqual(self._active(), 0)
+
+
+class ConversationHistoryETagTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="patient", password="pw")
+        self.conversation = Conversation.objects.create(user=self.user)
+        self.first = add_chat_message(self.user, self.conversation, "fever", "rest", "en")
+        add_chat_message(self.user, self.conversation, "headache", "water", "en")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f"/api/conversation/{self.conversation.id}/"
+
+    def _get(self, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(self.url, **headers)
+
+    def test_unchanged_history_is_not_modified(self):
+        etag = self._get()["ETag"]
+        self.assertEqual(self._get(etag).status_code, 304)
+
+    def test_edit_invalidates_the_etag(self):
+        response = self._get()
+        self.assertEqual(len(response.json()["results"]), 2)
+        # What edit_chat_message does: rewrite the row, drop the later ones.
+        ChatHistory.objects.filter(conversation=self.conversation, id__gt=self.first.id).delete()
+        ChatHistory.objects.filter(id=self.first.id).update(message="chills", response="blanket")
+        refresh_conversation_summary(self.conversation, touched_at=timezone.now())
+        response = self._get(response["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["message"], row["response"]) for row in response.json()["results"]], [("chills", "blanket")]
+        )
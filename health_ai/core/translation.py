@@ -1,17 +1,36 @@
+import asyncio
 import re
 import os
+from django.conf import settings
+from .llm_cassette import active_cassette
+from .metrics import groq_call
+from .pipeline_stats import current_stage, increment, stage
 try:
-    from groq import Groq
+    from groq import AsyncGroq, Groq
 except Exception:
-    Groq = None
+    AsyncGroq = Groq = None
 
 client = None
+# The async client's connection pool belongs to the event loop it was created
+# on, so it is cached as (loop, client) and rebuilt if the loop changes.
+async_client = None
 
 
 def _get_client():
+    cassette = active_cassette()
+    if cassette is not None:
+        return cassette.client(_groq_client)
+    return _groq_client()
+
+
+def _groq_client():
     global client
     if client is not None:
         return client
+    if settings.BACKEND_STUBS:
+        from .stubs import StubGroq
+        client = StubGroq()
+        return client
     if Groq is None:
         return None
     api_key = (os.getenv("GROQ_API_KEY", "") or "").strip()
@@ -24,6 +43,34 @@ def _get_client():
     return client
 
 
+def _get_async_client():
+    cassette = active_cassette()
+    if cassette is not None:
+        return cassette.async_client(_async_groq_client)
+    return _async_groq_client()
+
+
+def _async_groq_client():
+    global async_client
+    loop = asyncio.get_running_loop()
+    if async_client is not None and async_client[0] is loop:
+        return async_client[1]
+    if settings.BACKEND_STUBS:
+        from .stubs import AsyncStubGroq
+        async_client = (loop, AsyncStubGroq())
+        return async_client[1]
+    if AsyncGroq is None:
+        return None
+    api_key = (os.getenv("GROQ_API_KEY", "") or "").strip()
+    if not api_key:
+        return None
+    try:
+        async_client = (loop, AsyncGroq(api_key=api_key))
+    except Exception:
+        return None
+    return async_client[1]
+
+
 def _script_lang_hint(text):
     value = text or ""
     if any("\u0900" <= ch <= "\u097f" for ch in value):
@@ -105,32 +152,75 @@ def _target_language_instruction(lang_code):
     return lang_code
 
 
+DETECT_PROMPT = "Detect the language of the following text. Only return language code like en, hi, fr, etc."
+
+
+def _completion_kwargs(system_prompt, text, model):
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": text},
+        ],
+        "temperature": 0,
+    }
+
+
+def _count_usage(response):
+    usage = getattr(response, "usage", None)
+    tokens = getattr(usage, "total_tokens", 0) or 0
+    if tokens:
+        increment("llm_tokens", tokens)
+
+
+def _hinted_language(text):
+    return _script_lang_hint(text) or _romanized_lang_hint(text)
+
+
 # 🔍 Detect Language
 def detect_language(text):
-    script_hint = _script_lang_hint(text)
-    if script_hint:
-        return script_hint
-    romanized_hint = _romanized_lang_hint(text)
-    if romanized_hint:
-        return romanized_hint
+    hint = _hinted_language(text)
+    if hint:
+        return hint
     active_client = _get_client()
     if active_client is None:
         return "en"
 
-    try:
-        response = active_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "Detect the language of the following text. Only return language code like en, hi, fr, etc."},
-                {"role": "user", "content": text}
-            ],
-            temperature=0
-        )
-        raw = response.choices[0].message.content
-        return _normalize_lang_code(raw)
-    except Exception:
+    with stage("detect_language"):
+        try:
+            with groq_call("llama-3.3-70b-versatile", "detect_language"):
+                response = active_client.chat.completions.create(
+                    **_completion_kwargs(DETECT_PROMPT, text, "llama-3.3-70b-versatile")
+                )
+            increment("llm_calls")
+            _count_usage(response)
+            raw = response.choices[0].message.content
+            return _normalize_lang_code(raw)
+        except Exception:
+            return "en"
+
+
+async def adetect_language(text):
+    hint = _hinted_language(text)
+    if hint:
+        return hint
+    active_client = _get_async_client()
+    if active_client is None:
         return "en"
 
+    with stage("detect_language"):
+        try:
+            with groq_call("llama-3.3-70b-versatile", "detect_language"):
+                response = await active_client.chat.completions.create(
+                    **_completion_kwargs(DETECT_PROMPT, text, "llama-3.3-70b-versatile")
+                )
+            increment("llm_calls")
+            _count_usage(response)
+            raw = response.choices[0].message.content
+            return _normalize_lang_code(raw)
+        except Exception:
+            return "en"
+
 
 def _translate_with_prompt(system_prompt, text, model="llama-3.1-8b-instant"):
     active_client = _get_client()
@@ -138,28 +228,59 @@ def _translate_with_prompt(system_prompt, text, model="llama-3.1-8b-instant"):
         return text
 
     try:
-        response = active_client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text},
-            ],
-            temperature=0,
-        )
+        with groq_call(model, current_stage() or "translate"):
+            response = active_client.chat.completions.create(**_completion_kwargs(system_prompt, text, model))
+        increment("llm_calls")
+        _count_usage(response)
         return (response.choices[0].message.content or "").strip()
     except Exception:
         return text
 
 
-# 🔁 Translate to English
-def translate_to_en(text, detected_lang=None):
+async def _atranslate_with_prompt(system_prompt, text, model="llama-3.1-8b-instant"):
+    active_client = _get_async_client()
+    if active_client is None:
+        return text
+
+    try:
+        with groq_call(model, current_stage() or "translate"):
+            response = await active_client.chat.completions.create(**_completion_kwargs(system_prompt, text, model))
+        increment("llm_calls")
+        _count_usage(response)
+        return (response.choices[0].message.content or "").strip()
+    except Exception:
+        return text
+
+
+# The translation rules below are written once as generators: each yields a
+# (system_prompt, text, model) request and receives the model's reply, so the
+# sync and async entry points only differ in how they run the requests.
+def _run_steps(steps):
+    try:
+        request = next(steps)
+        while True:
+            request = steps.send(_translate_with_prompt(*request))
+    except StopIteration as done:
+        return done.value
+
+
+async def _arun_steps(steps):
+    try:
+        request = next(steps)
+        while True:
+            request = steps.send(await _atranslate_with_prompt(*request))
+    except StopIteration as done:
+        return done.value
+
+
+def _translate_to_en_steps(text, detected_lang):
     lang = _normalize_lang_code(detected_lang)
     if lang == "en":
         return text
-    translated = _translate_with_prompt(
+    translated = yield (
         "Translate the following text to English. Only return translated English text.",
         text,
-        model="llama-3.1-8b-instant",
+        "llama-3.1-8b-instant",
     )
 
     # If the model returns a meta reply instead of a translation, keep original text.
@@ -173,12 +294,12 @@ def translate_to_en(text, detected_lang=None):
 
     # Retry with stronger instruction if Indic script still dominates.
     if _has_devanagari(translated) or _has_gujarati(translated):
-        translated_retry = _translate_with_prompt(
+        translated_retry = yield (
             "Strictly translate the input to natural English. "
             "Do not keep Gujarati/Hindi words unless they are proper nouns. "
             "Return only English text.",
             text,
-            model="llama-3.3-70b-versatile",
+            "llama-3.3-70b-versatile",
         )
         if translated_retry and not (_has_devanagari(translated_retry) or _has_gujarati(translated_retry)):
             translated = translated_retry
@@ -186,51 +307,72 @@ def translate_to_en(text, detected_lang=None):
     return translated
 
 
-# 🔁 Translate back to original language
-def translate_back(text, lang):
+def _translate_back_steps(text, lang):
     normalized_lang = _normalize_lang_code(lang)
     if normalized_lang == "en":
         # If caller asked English but text still contains Indic scripts, force cleanup translation.
         if _has_devanagari(text) or _has_gujarati(text):
-            cleaned = _translate_with_prompt(
+            cleaned = yield (
                 "Translate the following text to clear English only. "
                 "Do not keep Gujarati/Hindi script in output. Return only English text.",
                 text,
-                model="llama-3.3-70b-versatile",
+                "llama-3.3-70b-versatile",
             )
             return cleaned or text
         return text
 
     target_instruction = _target_language_instruction(normalized_lang)
-    translated = _translate_with_prompt(
+    translated = yield (
         (
             f"Translate the following text to {target_instruction} "
             "Only return translated text with no extra notes."
         ),
         text,
-        model="llama-3.1-8b-instant",
+        "llama-3.1-8b-instant",
     )
 
     # Enforce script direction for Hindi/Gujarati with one strong retry.
     if normalized_lang == "hi":
         if _has_gujarati(translated) and not _has_devanagari(translated):
-            retry = _translate_with_prompt(
+            retry = yield (
                 "Translate to Hindi using only Devanagari script. "
                 "Do not output Gujarati script.",
                 text,
-                model="llama-3.3-70b-versatile",
+                "llama-3.3-70b-versatile",
             )
             if retry:
                 translated = retry
     elif normalized_lang == "gu":
         if _has_devanagari(translated) and not _has_gujarati(translated):
-            retry = _translate_with_prompt(
+            retry = yield (
                 "Translate to Gujarati using only Gujarati script. "
                 "Do not output Devanagari script.",
                 text,
-                model="llama-3.3-70b-versatile",
+                "llama-3.3-70b-versatile",
             )
             if retry:
                 translated = retry
 
     return translated
+
+
+# 🔁 Translate to English
+def translate_to_en(text, detected_lang=None):
+    with stage("translate_to_en"):
+        return _run_steps(_translate_to_en_steps(text, detected_lang))
+
+
+async def atranslate_to_en(text, detected_lang=None):
+    with stage("translate_to_en"):
+        return await _arun_steps(_translate_to_en_steps(text, detected_lang))
+
+
+# 🔁 Translate back to original language (retries are part of the stage)
+def translate_back(text, lang):
+    with stage("translate_back"):
+        return _run_steps(_translate_back_steps(text, lang))
+
+
+async def atranslate_back(text, lang):
+    with stage("translate_back"):
+        return await _arun_steps(_translate_back_steps(text, lang))
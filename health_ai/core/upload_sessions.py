@@ -0,0 +1,143 @@
+import glob
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import UploadSession
+
+READ_CHUNK_BYTES = 64 * 1024
+
+# Running SHA-256 per session for chunks appended by this process, keyed by
+# session id as (offset, hasher). A session whose chunks landed on another
+# worker is re-hashed from its spool file when it is finalized.
+_hashers = {}
+_lock = threading.Lock()
+
+
+def spool_path(session):
+    return os.path.join(settings.UPLOAD_SESSION_DIR, f"{session.pk}.part")
+
+
+def create_upload_session(user, file_name, content_type, total_size):
+    os.makedirs(settings.UPLOAD_SESSION_DIR, exist_ok=True)
+    session = UploadSession.objects.create(
+        user=user,
+        file_name=file_name,
+        content_type=content_type,
+        total_size=total_size,
+    )
+    open(spool_path(session), "wb").close()
+    with _lock:
+        _hashers[session.pk] = (0, hashlib.sha256())
+    return session
+
+
+def _append_error(session, offset, length):
+    if session is None:
+        return "not_found"
+    if session.status != "active":
+        return "not_active"
+    if offset != session.received:
+        return "offset_mismatch"
+    if offset + length > session.total_size:
+        return "too_large"
+    return None
+
+
+def _receive_chunk(session, offset, stream, length):
+    # Reads the request body into a file of its own, outside any transaction:
+    # on a slow link this takes as long as the client needs to send it.
+    path = f"{spool_path(session)}.{uuid.uuid4().hex}.chunk"
+    with _lock:
+        entry = _hashers.get(session.pk)
+    hasher = entry[1].copy() if entry and entry[0] == offset else None
+    written = 0
+    with open(path, "wb") as chunk:
+        while written < length:
+            data = stream.read(min(READ_CHUNK_BYTES, length - written))
+            if not data:
+                break
+            chunk.write(data)
+            if hasher is not None:
+                hasher.update(data)
+            written += len(data)
+    return path, written, hasher
+
+
+def append_chunk(session_id, user, offset, stream, length):
+    # Returns (session, error); error is None, "not_found", "not_active",
+    # "offset_mismatch" or "too_large". The body is received first; the row
+    # lock is held only to re-check the offset, copy the received chunk into
+    # the spool file and advance it, which serialises appends per session.
+    session = UploadSession.objects.filter(pk=session_id, user=user).first()
+    error = _append_error(session, offset, length)
+    if error:
+        return session, error
+
+    path, written, hasher = _receive_chunk(session, offset, stream, length)
+    try:
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().filter(pk=session_id, user=user).first()
+            error = _append_error(session, offset, length)
+            if error:
+                return session, error
+
+            with open(path, "rb") as chunk, open(spool_path(session), "r+b") as spool:
+                spool.seek(offset)
+                # Drop bytes left behind by an interrupted earlier attempt at this offset.
+                spool.truncate()
+                shutil.copyfileobj(chunk, spool, READ_CHUNK_BYTES)
+
+            session.received = offset + written
+            session.save(update_fields=["received", "updated_at"])
+            with _lock:
+                if hasher is not None:
+                    _hashers[session.pk] = (session.received, hasher)
+                else:
+                    _hashers.pop(session.pk, None)
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return session, None
+
+
+def session_digest(session):
+    with _lock:
+        entry = _hashers.pop(session.pk, None)
+    if entry and entry[0] == session.received:
+        return entry[1].hexdigest()
+
+    hasher = hashlib.sha256()
+    with open(spool_path(session), "rb") as spool:
+        for data in iter(lambda: spool.read(READ_CHUNK_BYTES), b""):
+            hasher.update(data)
+    return hasher.hexdigest()
+
+
+def discard_upload_session(session):
+    with _lock:
+        _hashers.pop(session.pk, None)
+    # The spool file, plus chunks a killed worker left half-received.
+    for path in [spool_path(session), *glob.glob(f"{glob.escape(spool_path(session))}.*.chunk")]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def purge_expired_upload_sessions():
+    cutoff = timezone.now() - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    expired = list(UploadSession.objects.filter(updated_at__lt=cutoff))
+    for session in expired:
+        discard_upload_session(session)
+    if expired:
+        UploadSession.objects.filter(pk__in=[session.pk for session in expired]).delete()
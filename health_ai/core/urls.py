@@ -1,17 +1,31 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     chat_view,
     get_conversation_history,
     conversation_list,
     upload_report_view,
+    upload_report_stream_view,
+    upload_report_batch_view,
+    upload_session_create_view,
+    upload_session_view,
+    upload_session_chunk_view,
+    upload_session_finalize_view,
     delete_conversation,
     edit_chat_message,
     signup_view,
     login_view,
     google_login_view,
     current_user_view,
+    lanes_status_view,
+    metrics_view,
+    profile_download_view,
+    profile_list_view,
 )
 
+if settings.ASYNC_CHAT_VIEWS:
+    from .async_views import chat_view, edit_chat_message
+
 urlpatterns = [
     path("auth/signup/", signup_view),
     path("auth/login/", login_view),
@@ -23,5 +37,15 @@ urlpatterns = [
     path("conversation/<int:conversation_id>/delete/", delete_conversation),
     path('conversations/', conversation_list),
     path("upload-report/", upload_report_view),
+    path("upload-report/stream/", upload_report_stream_view),
+    path("upload-report/batch/", upload_report_batch_view),
+    path("upload-sessions/", upload_session_create_view),
+    path("upload-sessions/<int:upload_id>/", upload_session_view),
+    path("upload-sessions/<int:upload_id>/chunk/", upload_session_chunk_view),
+    path("upload-sessions/<int:upload_id>/finalize/", upload_session_finalize_view),
+    path("health/lanes/", lanes_status_view),
+    path("metrics/", metrics_view),
+    path("health/profiles/", profile_list_view),
+    path("health/profiles/<str:profile_id>/", profile_download_view),
 
 ]
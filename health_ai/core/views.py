@@ -1,21 +1,69 @@
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Q
+from django.db.models import Max, Q
+from django.utils import timezone
 from django.conf import settings
 from django.contrib.auth import authenticate
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from django.utils.http import parse_etags, quote_etag
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import ChatHistory, Conversation, UploadedReport, User
+from .models import ChatHistory, Conversation, UploadedReport, UploadSession, User
+from .chat_store import add_chat_message, refresh_conversation_summary
+from .admission import admission, admission_status
+from .db_router import replica_reads
+from .lanes import (
+    LaneFull,
+    chat_lane,
+    iter_report_pages,
+    lanes_status,
+    report_extraction_result,
+    submit_report_extraction,
+)
 from .json_search import search_faq_json, load_faqs
 from .translation import detect_language, translate_to_en, translate_back
+from .report_parser import parse_report
+from .metrics import count, render as render_metrics
+from .pipeline_stats import increment, stage
+from .profiling import collapsed_stacks, list_profiles, load_profile, profiled
+from . import warmup
+from .google_auth import verify_id_token as verify_google_id_token
+from .ocr_backend import (
+    available_languages as available_ocr_languages,
+    detect_orientation_script,
+    image_to_string as ocr_image_to_string,
+    is_ready as ocr_is_ready,
+)
+from .upload_sessions import (
+    append_chunk,
+    create_upload_session,
+    discard_upload_session,
+    purge_expired_upload_sessions,
+    session_digest,
+    spool_path,
+)
+from .report_store import (
+    cached_extracted_text,
+    cached_processed_output,
+    find_report_blob,
+    hash_uploaded_file,
+    remember_extracted_text,
+    remember_processed_output,
+    store_report_blob,
+    uploaded_file_digest,
+)
 import os
 import base64
 from io import BytesIO
-from datetime import date
+from datetime import date, datetime
 import secrets
 import re
-import shutil
+import json
+import hashlib
 import logging
 
 
@@ -38,19 +86,7 @@ def _clean_extracted_text(text):
 
 
 def _extract_report_field(text, labels):
-    value = " ".join((text or "").split())
-    if not value:
-        return ""
-
-    label_group = "|".join(re.escape(label) for label in labels)
-    pattern = (
-        rf"(?:{label_group})\s*[:\-]\s*(.+?)"
-        r"(?=(?:\bDisease(?:\s*Name)?\b|\bSymptoms?\b|\bPossible\s*Causes?\b|"
-        r"\bHome\s*Care(?:\s*Advice)?\b|\bHome\s*Management(?:\s*&\s*Support)?\b|"
-        r"\bWhen\s*to\s*Visit(?:\s*a)?\s*Doctor\b|$))"
-    )
-    match = re.search(pattern, value, flags=re.IGNORECASE)
-    return match.group(1).strip(" .;,\n\t") if match else ""
+    return parse_report(text).field(labels)
 
 
 def _build_upload_file_section(extracted_text):
@@ -79,16 +115,36 @@ def _build_upload_file_section(extracted_text):
     )
 
 
+WHITESPACE_RE = re.compile(r"\s+")
+SUMMARY_WATERMARK_RE = re.compile(
+    r"www\.onlinedoctranslator\.com|\bonlinedoctranslator\.com\b|"
+    r"\bTranslation\s+from\s+English\s+to\s+Hindi\b",
+    re.IGNORECASE,
+)
+# OCR noise: short uppercase tokens (e.g. "WRI WA SIS") and "$12:" artefacts.
+SUMMARY_NOISE_RE = re.compile(r"\b[A-Z]{2,4}\b|\$+\d+\s*:?")
+# Report headings, put on their own lines in one pass. Where headings overlap
+# ("Common symptoms:", "Name of the disease:") the leftmost, longer one wins.
+SUMMARY_HEADING_RE = re.compile(
+    r"\s*("
+    r"Name\s+of\s+the\s+disease\s*:|Disease\s*:|"
+    r"Common\s+symptoms\s*:|Symptoms?\s*:|"
+    r"Home\s*Care\s*:|Home\s+management\s+and\s+assistance\s*:|"
+    r"Medical\s+Report\s*:"
+    r")\s*",
+    re.IGNORECASE,
+)
+SUMMARY_SENTENCE_SPLIT_RE = re.compile(r"[.!?]\s+|[\n\r]+")
+
+
 def _build_brief_file_summary(extracted_text):
     value = " ".join((extracted_text or "").split())
     if not value:
         return "Brief Summary from file:\nNot clearly found."
 
     # Drop translator watermark/domain noise from uploaded text.
-    value = re.sub(r"www\.onlinedoctranslator\.com", " ", value, flags=re.IGNORECASE)
-    value = re.sub(r"\bonlinedoctranslator\.com\b", " ", value, flags=re.IGNORECASE)
-    value = re.sub(r"\bTranslation\s+from\s+English\s+to\s+Hindi\b", " ", value, flags=re.IGNORECASE)
-    value = re.sub(r"\s+", " ", value).strip()
+    value = SUMMARY_WATERMARK_RE.sub(" ", value)
+    value = WHITESPACE_RE.sub(" ", value).strip()
 
     disease = _extract_report_field(
         value,
@@ -109,32 +165,19 @@ def _build_brief_file_summary(extracted_text):
         summary = "\n".join(parts).strip()
     else:
         # Prefer first meaningful chunks over the full noisy body.
-        chunks = [part.strip(" -:;,.") for part in re.split(r"[.!?]\s+|[\n\r]+", value) if part.strip()]
+        chunks = [part.strip(" -:;,.") for part in SUMMARY_SENTENCE_SPLIT_RE.split(value) if part.strip()]
         summary = " ".join(chunks[:2]).strip()
         if not summary:
             summary = value
 
-    # Remove frequent OCR uppercase token noise (e.g., "WRI WA SIS").
-    summary = re.sub(r"\b[A-Z]{2,4}\b", " ", summary)
-    summary = re.sub(r"\$+\d+\s*:?", " ", summary)
-    summary = re.sub(r"\s+", " ", summary).strip()
+    summary = SUMMARY_NOISE_RE.sub(" ", summary)
+    summary = WHITESPACE_RE.sub(" ", summary).strip()
 
     # Keep key report headings readable on separate lines.
-    summary = re.sub(r"\s*(Disease\s*:)\s*", r"\n\1 ", summary, flags=re.IGNORECASE)
-    summary = re.sub(r"\s*(Symptoms?\s*:)\s*", r"\n\1 ", summary, flags=re.IGNORECASE)
-    summary = re.sub(r"\s*(Home\s*Care\s*:)\s*", r"\n\1 ", summary, flags=re.IGNORECASE)
-    summary = re.sub(
-        r"\s*(Home\s+management\s+and\s+assistance\s*:)\s*",
-        r"\n\1 ",
-        summary,
-        flags=re.IGNORECASE,
-    )
-    summary = re.sub(r"\s*(Medical\s+Report\s*:)\s*", r"\n\1 ", summary, flags=re.IGNORECASE)
-    summary = re.sub(r"\s*(Common\s+symptoms\s*:)\s*", r"\n\1 ", summary, flags=re.IGNORECASE)
-    summary = re.sub(r"\s*(Name\s+of\s+the\s+disease\s*:)\s*", r"\n\1 ", summary, flags=re.IGNORECASE)
+    summary = SUMMARY_HEADING_RE.sub(r"\n\1 ", summary).replace(" \n", "\n")
 
     # If summary still looks noisy, keep output safe and readable.
-    tokens = [token for token in re.split(r"\s+", summary) if token]
+    tokens = [token for token in WHITESPACE_RE.split(summary) if token]
     short_tokens = sum(1 for token in tokens if len(token) <= 2)
     if tokens and (short_tokens / len(tokens)) > 0.35:
         summary = "Not clearly found from uploaded text."
@@ -198,33 +241,8 @@ def _preferred_to_ocr_lang(preferred_language):
     return mapping.get((preferred_language or "").strip().lower(), "")
 
 
-def _resolve_tessdata_dir():
-    candidates = [
-        os.getenv("TESSDATA_PREFIX", "").strip(),
-        os.path.join(os.getenv("LOCALAPPDATA", ""), "TesseractData", "tessdata"),
-        r"C:\Program Files\Tesseract-OCR\tessdata",
-        r"C:\Program Files (x86)\Tesseract-OCR\tessdata",
-    ]
-    for raw in candidates:
-        if not raw:
-            continue
-        path = raw.rstrip("\\/")
-        if os.path.isdir(path):
-            return path
-    return ""
-
-
-def _available_tesseract_languages():
-    try:
-        import pytesseract
-        langs = pytesseract.get_languages(config="") or []
-        return {str(lang).strip().lower() for lang in langs}
-    except Exception:
-        return set()
-
-
 def _resolve_ocr_lang(preferred_language="", prefer_native=False):
-    available = _available_tesseract_languages()
+    available = available_ocr_languages()
     preferred_ocr = _preferred_to_ocr_lang(preferred_language)
 
     if prefer_native and preferred_ocr == "guj":
@@ -248,65 +266,95 @@ def _missing_required_ocr_lang(preferred_language=""):
     preferred_ocr = _preferred_to_ocr_lang(preferred_language)
     if preferred_ocr not in {"hin", "guj"}:
         return ""
-    available = _available_tesseract_languages()
+    available = available_ocr_languages()
     return preferred_ocr if preferred_ocr and preferred_ocr not in available else ""
 
 
 def _ocr_image_text(image, preferred_language="", prefer_native=False):
-    from PIL import Image, ImageFilter, ImageOps
-    import pytesseract
-
-    if image.mode not in {"L", "RGB"}:
-        image = image.convert("RGB")
-
-    gray = image.convert("L")
-    autocontrast = ImageOps.autocontrast(gray)
-    sharpened = autocontrast.filter(ImageFilter.SHARPEN)
-
-    if hasattr(Image, "Resampling"):
-        upsample_filter = Image.Resampling.LANCZOS
-    else:
-        upsample_filter = Image.LANCZOS
+    from .ocr_preprocess import ocr_variants, prepare_page
 
-    upscaled = sharpened.resize(
-        (max(1, sharpened.width * 2), max(1, sharpened.height * 2)),
-        upsample_filter,
-    )
-    thresholded = upscaled.point(lambda p: 255 if p > 165 else 0)
-
-    variants = [gray, autocontrast, sharpened, upscaled, thresholded]
-    configs = [
-        "--oem 3 --psm 6",
-        "--oem 3 --psm 11",
-        "--oem 3 --psm 4",
-    ]
+    page_seg_modes = [6, 11, 4]
     ocr_lang = _resolve_ocr_lang(preferred_language, prefer_native=prefer_native)
 
-    best_text = ""
-    for variant in variants:
-        for config in configs:
-            text = pytesseract.image_to_string(variant, lang=ocr_lang, config=config) or ""
-            cleaned = _clean_extracted_text(text)
-            if len(cleaned) > len(best_text):
-                best_text = cleaned
+    # Deskewed, margin-cropped page processed tile by tile to bound peak memory.
+    with stage("ocr_prepare"):
+        page = prepare_page(image)
+    try:
+        tile_texts = []
+        for tile, upscale in page.tiles():
+            best_text = ""
+            for variant in ocr_variants(tile, upscale):
+                with stage("ocr_variant"):
+                    for psm in page_seg_modes:
+                        text = ocr_image_to_string(variant, ocr_lang, psm=psm)
+                        cleaned = _clean_extracted_text(text)
+                        if len(cleaned) > len(best_text):
+                            best_text = cleaned
+            tile.close()
+            if best_text:
+                tile_texts.append(best_text)
+
+        if tile_texts:
+            return _clean_extracted_text(" ".join(tile_texts))
+
+        fallback = ocr_image_to_string(page.gray, ocr_lang, psm=3)
+        return _clean_extracted_text(fallback)
+    finally:
+        page.close()
+
+
+OSD_SCRIPT_TO_LANG = {
+    "devanagari": "hi",
+    "gujarati": "gu",
+    "latin": "en",
+}
 
-    if best_text:
-        return best_text
 
-    fallback = pytesseract.image_to_string(image, lang=ocr_lang, config="--oem 3 --psm 3") or ""
-    return _clean_extracted_text(fallback)
+def _triage_image(image):
+    # Cheap one-shot script/orientation guess on a thumbnail, so image uploads
+    # get a single targeted OCR sweep instead of one sweep per language.
+    thumb = image.convert("L") if image.mode not in {"L", "RGB"} else image.copy()
+    thumb.thumbnail((1200, 1200))
+    try:
+        osd = detect_orientation_script(thumb)
+        if osd and osd["script_conf"] > 0:
+            confident = osd["orient_conf"] >= getattr(settings, "OCR_OSD_MIN_ORIENT_CONF", 3.0)
+            return OSD_SCRIPT_TO_LANG.get(osd["script"].strip().lower(), ""), osd["orient_deg"] if confident else 0
+
+        # No OSD model installed: probe once with every script and count glyphs.
+        available = available_ocr_languages()
+        probe_langs = [lang for lang in ("eng", "hin", "guj") if lang in available]
+        if len(probe_langs) < 2:
+            return "", 0
+        probe = ocr_image_to_string(thumb, "+".join(probe_langs), psm=6)
+    finally:
+        thumb.close()
+
+    devanagari = sum(1 for ch in probe if "\u0900" <= ch <= "\u097f")
+    gujarati = sum(1 for ch in probe if "\u0a80" <= ch <= "\u0aff")
+    latin = sum(1 for ch in probe if ch.isascii() and ch.isalpha())
+    if max(devanagari, gujarati) < 8:
+        return ("en" if latin >= 16 else ""), 0
+    return ("hi" if devanagari >= gujarati else "gu"), 0
+
+
+MEDICAL_MARKERS = (
+    "disease", "symptom", "home care", "possible causes", "when to visit",
+    "रोग", "लक्षण", "घरेलू", "कारण",
+    "રોગ", "લક્ષણ", "ઘરેલુ", "સંભવિત", "કારણ",
+)
 
 
 def _looks_like_medical_extract(text):
     value = (text or "").lower()
     if not value:
         return False
-    markers = (
-        "disease", "symptom", "home care", "possible causes", "when to visit",
-        "रोग", "लक्षण", "घरेलू", "कारण",
-        "રોગ", "લક્ષણ", "ઘરેલુ", "સંભવિત", "કારણ",
-    )
-    return any(marker in value for marker in markers)
+    return any(marker in value for marker in MEDICAL_MARKERS)
+
+
+def _medical_marker_count(text):
+    value = (text or "").lower()
+    return sum(value.count(marker) for marker in MEDICAL_MARKERS)
 
 
 def _unique_username(base):
@@ -348,11 +396,146 @@ ALLOWED_REPORT_MIME_TYPES = {
 }
 
 
+def _is_supported_report_name(name, content_type=""):
+    ext = os.path.splitext((name or "").lower())[1]
+    return ext in ALLOWED_REPORT_EXTENSIONS or (content_type or "").lower() in ALLOWED_REPORT_MIME_TYPES
+
+
 def _is_supported_upload(uploaded_file):
-    name = (uploaded_file.name or "").lower()
-    ext = os.path.splitext(name)[1]
+    return _is_supported_report_name(uploaded_file.name, getattr(uploaded_file, "content_type", ""))
+
+
+def _ocr_pdf_page(rasterizer, page_index, preferred_language):
+    from .pdf_raster import render_page_for_ocr
+
+    page_image = render_page_for_ocr(rasterizer, page_index)
+    try:
+        return _ocr_image_text(page_image, preferred_language)
+    finally:
+        page_image.close()
+
+
+def _rank_pdf_pages(pdf, page_texts, rasterizer):
+    # Text-layer pages rank by medical-marker density; scanned pages are ranked
+    # from a low-resolution thumbnail by how much text they appear to hold.
+    from .ocr_preprocess import text_line_stats
+
+    scored = []
+    for page_index, page_text in enumerate(page_texts):
+        if page_text:
+            markers = _medical_marker_count(page_text)
+            score = 2.0 + markers * 1000.0 / max(len(page_text), 200)
+        elif rasterizer is not None:
+            try:
+                thumb = rasterizer.render(page_index, 24)
+                line_count, _height = text_line_stats(thumb)
+                thumb.close()
+            except Exception:
+                line_count = 0
+            score = min(line_count, 40) / 40.0
+        else:
+            score = 0.0
+        # Earlier pages usually carry the diagnosis; break ties toward them.
+        score += 0.5 / (page_index + 1)
+        scored.append((score, page_index))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [page_index for _score, page_index in scored]
+
+
+def _iter_pdf_pages(uploaded_file, preferred_language=""):
+    # Yields (page_index, text) for each page that has text, in visit order.
+    # (None, "__TESSERACT_NOT_FOUND__") is yielded when scanned pages could not be OCRed.
+    import pdfplumber
+    from .pdf_raster import open_rasterizer
+
+    tesseract_ready = ocr_is_ready()
+    rasterizer = None
+    found_text = False
+    with pdfplumber.open(uploaded_file) as pdf:
+        try:
+            page_count = len(pdf.pages)
+            increment("pages", page_count)
+            page_texts = []
+            for page in pdf.pages:
+                page_text = _clean_extracted_text(page.extract_text() or "")
+                page_texts.append(page_text if _has_meaningful_text(page_text) else "")
+                page.close()
+            needs_ocr = not all(page_texts)
+            if needs_ocr and tesseract_ready:
+                rasterizer = open_rasterizer(uploaded_file, pdf)
+
+            if page_count > getattr(settings, "PDF_LARGE_DOC_PAGES", 8):
+                # Large-document mode: visit pages by relevance and stop once the
+                # OCR page budget or the character budget is spent.
+                page_order = _rank_pdf_pages(pdf, page_texts, rasterizer)
+                ocr_page_budget = getattr(settings, "PDF_LARGE_DOC_MAX_OCR_PAGES", 6)
+                char_budget = getattr(settings, "PDF_LARGE_DOC_MAX_CHARS", 10000)
+            else:
+                page_order = range(page_count)
+                ocr_page_budget = page_count
+                char_budget = None
+
+            collected = 0
+            for page_index in page_order:
+                if char_budget is not None and collected >= char_budget:
+                    break
+                page_text = page_texts[page_index]
+                if not page_text and rasterizer is not None and ocr_page_budget > 0:
+                    ocr_page_budget -= 1
+                    try:
+                        ocr_text = _ocr_pdf_page(rasterizer, page_index, preferred_language)
+                    except Exception:
+                        ocr_text = ""
+                    page_text = ocr_text if _has_meaningful_text(ocr_text) else ""
+                if page_text:
+                    found_text = True
+                    collected += len(page_text)
+                    yield page_index, page_text
+        finally:
+            if rasterizer is not None:
+                rasterizer.close()
+
+    if not found_text and needs_ocr and not tesseract_ready:
+        yield None, "__TESSERACT_NOT_FOUND__"
+
+
+def _join_page_texts(pages):
+    text_parts = []
+    for page_index, page_text in pages:
+        if page_index is None:
+            return page_text
+        text_parts.append((page_index, page_text))
+    if text_parts:
+        # Large-document mode visits pages by relevance; join in page order.
+        text_parts.sort(key=lambda part: part[0])
+        return _clean_extracted_text("\n".join(page_text for _index, page_text in text_parts).strip())
+    return ""
+
+
+def _extract_pdf_text(uploaded_file, preferred_language=""):
+    return _join_page_texts(_iter_pdf_pages(uploaded_file, preferred_language))
+
+
+def _is_pdf_upload(uploaded_file):
+    ext = os.path.splitext((uploaded_file.name or "").lower())[1]
     content_type = (getattr(uploaded_file, "content_type", "") or "").lower()
-    return ext in ALLOWED_REPORT_EXTENSIONS or content_type in ALLOWED_REPORT_MIME_TYPES
+    return ext == ".pdf" or content_type == "application/pdf"
+
+
+def _iter_report_pages(uploaded_file, preferred_language=""):
+    # Page-by-page counterpart of _extract_text_from_file; images are one page.
+    if _is_pdf_upload(uploaded_file):
+        try:
+            yield from _iter_pdf_pages(uploaded_file, preferred_language)
+        except Exception:
+            return
+        return
+
+    text = _extract_text_from_file(uploaded_file, preferred_language)
+    if text == "__TESSERACT_NOT_FOUND__":
+        yield None, text
+    elif text:
+        yield 0, text
 
 
 def _extract_text_from_file(uploaded_file, preferred_language=""):
@@ -360,41 +543,15 @@ def _extract_text_from_file(uploaded_file, preferred_language=""):
     ext = os.path.splitext(name)[1]
     content_type = (getattr(uploaded_file, "content_type", "") or "").lower()
 
-    if ext == ".pdf" or content_type == "application/pdf":
+    if _is_pdf_upload(uploaded_file):
         try:
-            import pdfplumber
-            text_parts = []
-            tesseract_ready = _configure_tesseract_ocr()
-            needs_ocr = False
-            with pdfplumber.open(uploaded_file) as pdf:
-                for page in pdf.pages:
-                    page_text = _clean_extracted_text(page.extract_text() or "")
-                    if _has_meaningful_text(page_text):
-                        text_parts.append(page_text)
-                        continue
-
-                    needs_ocr = True
-                    if not tesseract_ready:
-                        continue
-                    try:
-                        page_image = page.to_image(resolution=300).original
-                        ocr_text = _ocr_image_text(page_image, preferred_language)
-                        if _has_meaningful_text(ocr_text):
-                            text_parts.append(ocr_text)
-                    except Exception:
-                        continue
-
-            if text_parts:
-                return _clean_extracted_text("\n".join(text_parts).strip())
-            if needs_ocr and not tesseract_ready:
-                return "__TESSERACT_NOT_FOUND__"
-            return _clean_extracted_text("\n".join(text_parts).strip())
+            return _extract_pdf_text(uploaded_file, preferred_language)
         except Exception:
             return ""
 
     if ext in {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp"} or content_type.startswith("image/"):
         try:
-            if not _configure_tesseract_ocr():
+            if not ocr_is_ready():
                 return "__TESSERACT_NOT_FOUND__"
             try:
                 uploaded_file.seek(0)
@@ -403,51 +560,49 @@ def _extract_text_from_file(uploaded_file, preferred_language=""):
 
             from PIL import Image
             image = Image.open(uploaded_file)
-            text_primary = _ocr_image_text(image, preferred_language)
-            if _has_meaningful_text(text_primary) and _looks_like_medical_extract(text_primary):
-                return text_primary
+            increment("pages")
+            script_lang, orient_deg = _triage_image(image)
+            if orient_deg:
+                image = image.rotate(orient_deg, expand=True)
+            text_triaged = ""
+            if script_lang:
+                text_triaged = _ocr_image_text(image, script_lang, prefer_native=script_lang in {"hi", "gu"})
+                if not _has_meaningful_text(text_triaged):
+                    text_triaged = ""
+                elif _looks_like_medical_extract(text_triaged):
+                    return text_triaged
+
+            # Triage was inconclusive: fall back to the per-language sweep,
+            # skipping the language that was already tried.
+            text_primary = ""
+            if script_lang != "en":
+                text_primary = _ocr_image_text(image, preferred_language)
+                if _has_meaningful_text(text_primary) and _looks_like_medical_extract(text_primary):
+                    return text_primary
 
             # Image-only Hindi fallback: improve Hindi source OCR even when
             # target response language is English/Gujarati.
-            text_hi = _ocr_image_text(image, "hi", prefer_native=True)
-            if _has_meaningful_text(text_hi) and _looks_like_medical_extract(text_hi):
-                return text_hi
+            text_hi = ""
+            if script_lang != "hi":
+                text_hi = _ocr_image_text(image, "hi", prefer_native=True)
+                if _has_meaningful_text(text_hi) and _looks_like_medical_extract(text_hi):
+                    return text_hi
 
             # Image-only Gujarati fallback: improve Gujarati source OCR even when
             # target response language is English/Hindi.
-            text_gu = _ocr_image_text(image, "gu", prefer_native=True)
-            if _has_meaningful_text(text_gu) and _looks_like_medical_extract(text_gu):
-                return text_gu
+            text_gu = ""
+            if script_lang != "gu":
+                text_gu = _ocr_image_text(image, "gu", prefer_native=True)
+                if _has_meaningful_text(text_gu) and _looks_like_medical_extract(text_gu):
+                    return text_gu
 
-            return text_primary or text_hi or text_gu
+            return text_triaged or text_primary or text_hi or text_gu
         except Exception:
             return ""
 
     return ""
 
 
-def _configure_tesseract_ocr():
-    try:
-        import pytesseract
-    except Exception:
-        return False
-
-    if shutil.which("tesseract"):
-        return True
-
-    candidates = [
-        os.getenv("TESSERACT_CMD", "").strip(),
-        r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-        r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
-    ]
-    for path in candidates:
-        if path and os.path.exists(path):
-            pytesseract.pytesseract.tesseract_cmd = path
-            return True
-
-    return False
-
-
 def _is_truthy(value):
     return str(value).strip().lower() in {"1", "true", "yes", "on"}
 
@@ -477,24 +632,53 @@ def _tts_lang(lang):
 
 def _text_to_speech_base64(text, lang):
     try:
+        if settings.BACKEND_STUBS:
+            from .stubs import speech_bytes
+            with stage("tts"):
+                return base64.b64encode(speech_bytes(text, _tts_lang(lang))).decode("utf-8")
         from gtts import gTTS
-        buffer = BytesIO()
-        gTTS(text=text, lang=_tts_lang(lang), slow=False).write_to_fp(buffer)
+        with stage("tts"):
+            buffer = BytesIO()
+            gTTS(text=text, lang=_tts_lang(lang), slow=False).write_to_fp(buffer)
         return base64.b64encode(buffer.getvalue()).decode("utf-8")
     except Exception:
         return None
 
 
-def _generate_chat_response(message, preferred_language=""):
-    source_lang = detect_language(message)
-    if _contains_devanagari(message):
-        source_lang = "hi"
+def _lane_speech(text, lang):
+    try:
+        return chat_lane().run(_text_to_speech_base64, text, lang)
+    except LaneFull:
+        return None
 
-    message_en = translate_to_en(message, source_lang)
 
+def _lane_busy_payload(exc):
+    if exc.lane.name == "ocr":
+        message = "Report processing is busy right now. Please try again in a moment."
+    else:
+        message = "The assistant is busy right now. Please try again in a moment."
+    return {"response": message, "retry_after": settings.LANE_RETRY_AFTER_SECONDS}
+
+
+def _count_faq_lookup(source, lang, faq):
+    count("faq_lookups_total", source=source, language=lang or "unknown", matched="true" if faq else "false")
+
+
+def _count_cache(cache, hit):
+    count("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+def _lane_busy_response(exc):
+    response = Response(_lane_busy_payload(exc), status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response["Retry-After"] = str(settings.LANE_RETRY_AFTER_SECONDS)
+    return response
+
+
+def _faq_answer_en(message, message_en, source_lang=""):
     faq = search_faq_json(message_en)
     if not faq and message_en.strip().lower() != message.strip().lower():
         faq = search_faq_json(message)
+    _count_faq_lookup("chat", source_lang, faq)
 
     if not faq:
         response_en = "Sorry, this information is not available in the FAQ data."
@@ -505,6 +689,16 @@ def _generate_chat_response(message, preferred_language=""):
             f"Home Care Advice: {faq['home_care']}. "
             f"When to Visit Doctor: {faq['when_to_visit']}."
         )
+    return response_en
+
+
+def _generate_chat_response(message, preferred_language=""):
+    source_lang = detect_language(message)
+    if _contains_devanagari(message):
+        source_lang = "hi"
+
+    message_en = translate_to_en(message, source_lang)
+    response_en = _faq_answer_en(message, message_en, source_lang)
 
     response_lang = preferred_language or source_lang
     final_response = translate_back(response_en, response_lang)
@@ -570,55 +764,34 @@ def google_login_view(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
-    try:
-        from google.oauth2 import id_token as google_id_token
-        from google.auth.transport import requests as google_requests
-    except Exception:
-        return Response(
-            {"error": "google-auth package is missing on server."},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        )
-
-    token_info = None
-    last_value_error = None
-
     def _redact_client_id(value: str) -> str:
         value = (value or "").strip()
         if len(value) <= 12:
             return value
         return f"{value[:6]}...{value[-6:]}"
 
-    for client_id in client_ids:
-        try:
-            token_info = google_id_token.verify_oauth2_token(
-                id_token_value,
-                google_requests.Request(),
-                client_id,
-            )
-            break
-        except ValueError as exc:
-            last_value_error = exc
-            logger.warning(
-                "Google token verification failed for audience %s: %s",
-                _redact_client_id(client_id),
-                str(exc),
-            )
-            continue
-        except Exception:
-            logger.exception("Google token verification failed due to server error.")
-            return Response(
-                {"error": "Google token verification failed."},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-
-    if not token_info:
-        _ = last_value_error
+    try:
+        # One decode, checked against every configured client id; signing
+        # keys come from the local cache (core/google_auth.py).
+        token_info = verify_google_id_token(id_token_value, client_ids)
+    except ImportError:
+        return Response(
+            {"error": "google-auth package is missing on server."},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+    except ValueError as exc:
         logger.warning(
-            "Google login failed: token invalid for all audiences. audiences=%s last_error=%s",
+            "Google login failed: token invalid. audiences=%s error=%s",
             [_redact_client_id(cid) for cid in client_ids],
-            str(last_value_error) if last_value_error else "",
+            str(exc),
         )
         return Response({"error": "Invalid Google token."}, status=status.HTTP_401_UNAUTHORIZED)
+    except Exception:
+        logger.exception("Google token verification failed due to server error.")
+        return Response(
+            {"error": "Google token verification failed."},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
 
     email = (token_info.get("email") or "").strip()
     full_name = (token_info.get("name") or "").strip()
@@ -644,6 +817,7 @@ def google_login_view(request):
     return Response(_build_auth_payload(user), status=status.HTTP_200_OK)
 
 
+@replica_reads
 @api_view(["GET", "PUT"])
 @permission_classes([IsAuthenticated])
 def current_user_view(request):
@@ -708,9 +882,56 @@ def current_user_view(request):
     )
 
 
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def lanes_status_view(request):
+    # Per-process view of the execution lanes (core/lanes.py) and admission
+    # control (core/admission.py), and this worker's startup warm-up (core/warmup.py).
+    return Response(
+        {
+            "pid": os.getpid(),
+            "lanes": lanes_status(),
+            "admission": admission_status(),
+            "warmup": warmup.last_report,
+        }
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def profile_list_view(request):
+    # Newest first; see core/profiling.py.
+    return Response({"profiles": list_profiles()})
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def profile_download_view(request, profile_id):
+    profile = load_profile(profile_id)
+    if profile is None:
+        return Response({"error": "Profile not found."}, status=status.HTTP_404_NOT_FOUND)
+    response = HttpResponse(collapsed_stacks(profile), content_type="text/plain; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{profile_id}.folded"'
+    return response
+
+
+@require_GET
+def metrics_view(request):
+    # Prometheus scrape target (core/metrics.py), enabled by METRICS_TOKEN and
+    # scraped with "Authorization: Bearer <METRICS_TOKEN>".
+    if not settings.METRICS_TOKEN:
+        raise Http404
+    supplied = request.META.get("HTTP_AUTHORIZATION", "")
+    if not secrets.compare_digest(supplied.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()):
+        return HttpResponse(status=401)
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # ✅ CHAT VIEW (UNCHANGED JSON LOGIC)
+@admission("chat")
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@profiled
 def chat_view(request):
     user = request.user
     message = request.data.get("message")
@@ -730,24 +951,22 @@ def chat_view(request):
     else:
         conversation = Conversation.objects.create(user=user)
 
-    final_response, detected_lang = _generate_chat_response(message, preferred_language)
+    try:
+        final_response, detected_lang = chat_lane().run(_generate_chat_response, message, preferred_language)
+    except LaneFull as exc:
+        return _lane_busy_response(exc)
 
     # 💾 Save chat
-    chat_entry = ChatHistory.objects.create(
-        user=user,
-        conversation=conversation,
-        message=message,
-        response=final_response,
-        language=detected_lang
-    )
+    chat_entry = add_chat_message(user, conversation, message, final_response, detected_lang)
 
     payload = {
         "response": final_response,
         "conversation_id": conversation.id,
         "chat_id": chat_entry.id,
     }
-    if is_voice:
-        audio_base64 = _text_to_speech_base64(final_response, detected_lang)
+    # Speech is optional; it is skipped while admission control reports load.
+    if is_voice and not getattr(request, "admission_degraded", False):
+        audio_base64 = _lane_speech(final_response, detected_lang)
         if audio_base64:
             payload["audio_base64"] = audio_base64
 
@@ -755,9 +974,13 @@ def chat_view(request):
 
 
 # ✅ GET SINGLE CONVERSATION HISTORY
+@replica_reads
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_conversation_history(request, conversation_id):
+    # Newest `limit` messages (returned oldest first). `before=<id>` pages back
+    # through older messages via `next_cursor`. Unchanged pages answer 304 via
+    # ETag before any message is read.
     user = request.user
 
     try:
@@ -765,22 +988,32 @@ def get_conversation_history(request, conversation_id):
     except Conversation.DoesNotExist:
         return Response({"error": "Conversation not found."}, status=404)
 
-    messages = conversation.messages.order_by("created_at")
-
-    data = []
-    for msg in messages:
-        data.append({
-            "id": msg.id,
-            "message": msg.message,
-            "response": msg.response,
-            "created_at": msg.created_at
-        })
-
-    return Response(data)
-
-
+    try:
+        limit = int(request.query_params.get("limit", HISTORY_PAGE_SIZE))
+        before = request.query_params.get("before")
+        before = int(before) if before else None
+    except ValueError:
+        return Response({"error": "limit and before must be integers."}, status=400)
+    limit = max(1, min(limit, HISTORY_PAGE_SIZE_MAX))
+
+    def page():
+        messages = conversation.messages.all()
+        if before is not None:
+            messages = messages.filter(id__lt=before)
+        rows = list(messages.order_by("-id").values("id", "message", "response", "created_at")[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        rows.reverse()
+        next_cursor = rows[0]["id"] if has_more else None
+        return {"results": rows, "next_cursor": next_cursor, "has_more": has_more}
+
+    return _etag_response(request, _history_etag(conversation, before, limit), page)
+
+
+@admission("chat")
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
+@profiled
 def edit_chat_message(request, chat_id):
     user = request.user
     new_message = request.data.get("message")
@@ -794,6 +1027,11 @@ def edit_chat_message(request, chat_id):
     except ChatHistory.DoesNotExist:
         return Response({"error": "Chat message not found."}, status=404)
 
+    try:
+        final_response, detected_lang = chat_lane().run(_generate_chat_response, new_message)
+    except LaneFull as exc:
+        return _lane_busy_response(exc)
+
     later_messages = ChatHistory.objects.filter(
         conversation=chat_entry.conversation
     ).filter(
@@ -803,11 +1041,12 @@ def edit_chat_message(request, chat_id):
     deleted_count = later_messages.count()
     later_messages.delete()
 
-    final_response, detected_lang = _generate_chat_response(new_message)
     chat_entry.message = new_message
     chat_entry.response = final_response
     chat_entry.language = detected_lang
     chat_entry.save(update_fields=["message", "response", "language"])
+    if chat_entry.conversation_id:
+        refresh_conversation_summary(chat_entry.conversation, touched_at=timezone.now())
 
     payload = {
         "id": chat_entry.id,
@@ -815,8 +1054,9 @@ def edit_chat_message(request, chat_id):
         "response": chat_entry.response,
         "deleted_messages_count": deleted_count,
     }
-    if is_voice:
-        audio_base64 = _text_to_speech_base64(final_response, detected_lang)
+    # Speech is optional; it is skipped while admission control reports load.
+    if is_voice and not getattr(request, "admission_degraded", False):
+        audio_base64 = _lane_speech(final_response, detected_lang)
         if audio_base64:
             payload["audio_base64"] = audio_base64
 
@@ -837,119 +1077,104 @@ def delete_conversation(request, conversation_id):
     return Response({"message": "Conversation deleted successfully."}, status=200)
 
 
-# ✅ GET ALL CONVERSATIONS (FOR SIDEBAR)
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def conversation_list(request):
-    conversations = Conversation.objects.filter(user=request.user).order_by('-created_at')
+HISTORY_PAGE_SIZE = 50
+HISTORY_PAGE_SIZE_MAX = 200
+
 
-    # data = [
-    #     {
-    #         "id": conv.id,
-    #         "created_at": conv.created_at
-    #     }
-    #     for conv in conversations
-    # ]
+def _etag_response(request, etag, build_payload):
+    # A matching If-None-Match gets an empty 304 without building the payload.
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = Response(status=304)
+    else:
+        response = Response(build_payload())
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _conditional_response(request, payload):
+    # Strong ETag over the serialized payload.
+    body = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True)
+    etag = quote_etag(hashlib.sha1(body.encode("utf-8")).hexdigest())
+    return _etag_response(request, etag, lambda: payload)
+
+
+def _history_etag(conversation, before, limit):
+    # Adding, editing or deleting messages moves the conversation's summary
+    # columns (core/chat_store.py), so they and the newest id identify a page.
+    last_id = conversation.messages.aggregate(last=Max("id"))["last"]
+    key = "|".join(
+        str(value)
+        for value in (
+            conversation.id, conversation.message_count, conversation.last_activity_at, last_id, before, limit,
+        )
+    )
+    return quote_etag(hashlib.sha1(key.encode("utf-8")).hexdigest())
 
-    data = []
 
-    for conv in conversations:
-        first_msg = conv.messages.order_by("created_at").first()
+CONVERSATION_PAGE_SIZE = 50
+CONVERSATION_PAGE_SIZE_MAX = 200
 
-        data.append({
-            "id": conv.id,
-            "created_at": conv.created_at,
-            "first_message": first_msg.message if first_msg else None
-        })
 
+def _encode_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
 
 
-    return Response(data)
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
 
 
-@api_view(["POST"])
+# ✅ GET ALL CONVERSATIONS (FOR SIDEBAR)
+@replica_reads
+@api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def upload_report_view(request):
-    user = request.user
-    uploaded_file = request.FILES.get("file")
-    conversation_id = request.data.get("conversation_id")
-    preferred_language = _normalize_preferred_language(request.data.get("preferred_language"))
-
-    if not uploaded_file:
-        return Response({"response": "Please upload a PDF or image file."}, status=400)
-    if not _is_supported_upload(uploaded_file):
-        return Response(
-            {"response": "Unsupported file type. Please upload PDF, PNG, JPG, JPEG, BMP, TIFF, or WEBP."},
-            status=400,
+def conversation_list(request):
+    # Newest first, keyset-paginated on (created_at, id): pass `next_cursor`
+    # back as `cursor` for the next page.
+    try:
+        limit = int(request.query_params.get("limit", CONVERSATION_PAGE_SIZE))
+    except ValueError:
+        limit = CONVERSATION_PAGE_SIZE
+    limit = max(1, min(limit, CONVERSATION_PAGE_SIZE_MAX))
+
+    # Served from the (user, -created_at, -id) index and the maintained
+    # summary columns; no per-row or correlated message lookups.
+    conversations = Conversation.objects.filter(user=request.user).order_by("-created_at", "-id")
+
+    cursor = request.query_params.get("cursor")
+    if cursor:
+        position = _decode_cursor(cursor)
+        if position is None:
+            return Response({"error": "Invalid cursor."}, status=400)
+        created_at, conv_id = position
+        conversations = conversations.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=conv_id)
         )
 
-    if conversation_id:
-        try:
-            conversation = Conversation.objects.get(id=conversation_id, user=user)
-        except Conversation.DoesNotExist:
-            conversation = Conversation.objects.create(user=user)
-    else:
-        conversation = Conversation.objects.create(user=user)
+    page = list(
+        conversations.values("id", "created_at", "first_message", "message_count", "last_activity_at")[:limit + 1]
+    )
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = _encode_cursor(page[-1]["created_at"], page[-1]["id"])
 
-    extracted_text = _extract_text_from_file(uploaded_file, preferred_language)
-    if extracted_text == "__TESSERACT_NOT_FOUND__":
-        response_text = (
-            "OCR engine not found for image reading. "
-            "Install Tesseract OCR and set TESSERACT_CMD or add tesseract to PATH."
-        )
-        response_lang = preferred_language or "en"
-        final_response = translate_back(response_text, response_lang)
+    return _conditional_response(request, {"results": page, "next_cursor": next_cursor})
 
-        ChatHistory.objects.create(
-            user=user,
-            conversation=conversation,
-            message=f"[Uploaded File] {uploaded_file.name}",
-            response=final_response,
-            language=response_lang,
-        )
 
-        return Response(
-            {
-                "response": final_response,
-                "conversation_id": conversation.id,
-            },
-            status=200,
-        )
+# Report text that translation and FAQ matching look at.
+REPORT_MATCH_CHARS = 4000
 
-    try:
-        uploaded_file.seek(0)
-    except Exception:
-        pass
-    if not extracted_text:
-        response_text = "I could not read text from this file. Please upload a clear PDF/image."
-        response_lang = preferred_language or "en"
-        final_response = translate_back(response_text, response_lang)
-
-        ChatHistory.objects.create(
-            user=user,
-            conversation=conversation,
-            message=f"[Uploaded File] {uploaded_file.name}",
-            response=final_response,
-            language=response_lang,
-        )
-
-        return Response(
-            {
-                "response": final_response,
-                "conversation_id": conversation.id,
-            },
-            status=200,
-        )
-
-    # Save uploaded report for record
-    report = UploadedReport.objects.create(
-        user=user,
-        file=uploaded_file,
-        extracted_text=extracted_text[:10000],
-    )
 
+def _match_report_faq(extracted_text):
     detected_lang = detect_language(extracted_text[:1200] or extracted_text)
-    extracted_text_slice = extracted_text[:4000]
+    extracted_text_slice = extracted_text[:REPORT_MATCH_CHARS]
     if detected_lang in {"gu", "hi"}:
         # For Gujarati/Hindi uploads, normalize to English first so FAQ parsing/matching
         # stays consistent, then translate final response to requested language.
@@ -984,6 +1209,11 @@ def upload_report_view(request):
             if fever_faq:
                 faq = fever_faq
 
+    _count_faq_lookup("report", detected_lang, faq)
+    return detected_lang, extracted_text_en, faq
+
+
+def _format_report_response(extracted_text, detected_lang, extracted_text_en, faq, preferred_language=""):
     file_section_source = extracted_text_en if extracted_text_en.strip() else extracted_text
     file_section = _build_upload_file_section(file_section_source)
     suppress_file_section = detected_lang in {"gu", "hi"}
@@ -1092,17 +1322,313 @@ def upload_report_view(request):
     else:
         final_response = translate_back(response_en, response_lang)
 
+    return final_response, response_lang
+
+
+def _build_report_response(extracted_text, preferred_language=""):
+    detected_lang, extracted_text_en, faq = _match_report_faq(extracted_text)
+    return _format_report_response(extracted_text, detected_lang, extracted_text_en, faq, preferred_language)
+
+
+def _save_upload_message(user, conversation, uploaded_file, response, language):
+    add_chat_message(user, conversation, f"[Uploaded File] {uploaded_file.name}", response, language)
+
+
+# The upload pipeline as a sequence of (event, data) steps; the last event is
+# always "response". Shared by the upload endpoints and `ingest_reports`.
+def _iter_report_events(user, conversation, uploaded_file, preferred_language="", digest=None, size=None):
+    if digest is None:
+        digest, size = hash_uploaded_file(uploaded_file)
+
+    # Re-uploads of the same content reuse the stored blob and its extraction.
+    blob = find_report_blob(digest)
+    language_key = preferred_language or "auto"
+    cached_text = cached_extracted_text(blob, language_key)
+    _count_cache("extraction", cached_text)
+    if cached_text:
+        increment("blob_hits")
+        extracted_text = cached_text
+        yield "page", {"page": None, "text": extracted_text, "cached": True}
+    else:
+        page_texts = []
+        for page_index, page_text in iter_report_pages(uploaded_file, preferred_language):
+            page_texts.append((page_index, page_text))
+            if page_index is not None:
+                yield "page", {"page": page_index + 1, "text": page_text}
+        extracted_text = _join_page_texts(page_texts)
+    if extracted_text == "__TESSERACT_NOT_FOUND__":
+        response_text = (
+            "OCR engine not found for image reading. "
+            "Install Tesseract OCR and set TESSERACT_CMD or add tesseract to PATH."
+        )
+        response_lang = preferred_language or "en"
+        final_response = translate_back(response_text, response_lang)
+        _save_upload_message(user, conversation, uploaded_file, final_response, response_lang)
+        yield "response", {"response": final_response, "language": response_lang}
+        return
+
+    try:
+        uploaded_file.seek(0)
+    except Exception:
+        pass
+    if not extracted_text:
+        response_text = "I could not read text from this file. Please upload a clear PDF/image."
+        response_lang = preferred_language or "en"
+        final_response = translate_back(response_text, response_lang)
+        _save_upload_message(user, conversation, uploaded_file, final_response, response_lang)
+        yield "response", {"response": final_response, "language": response_lang}
+        return
+
+    yield "summary", {"summary": _build_brief_file_summary(extracted_text)}
+
+    if blob is None:
+        blob = store_report_blob(uploaded_file, digest, size)
+    remember_extracted_text(blob, language_key, extracted_text[:10000])
+
+    # Save uploaded report for record
+    report = UploadedReport.objects.create(
+        user=user,
+        blob=blob,
+        file=blob.file.name,
+        extracted_text=extracted_text[:10000],
+    )
+
+    cached_output = cached_processed_output(blob, language_key)
+    _count_cache("output", cached_output)
+    if cached_output:
+        increment("output_hits")
+        final_response = cached_output["response"]
+        response_lang = cached_output.get("language") or preferred_language or "en"
+    else:
+        detected_lang, extracted_text_en, faq = _match_report_faq(extracted_text)
+        yield "faq", {"faq": faq or None, "detected_language": detected_lang}
+        final_response, response_lang = _format_report_response(
+            extracted_text, detected_lang, extracted_text_en, faq, preferred_language
+        )
+        remember_processed_output(blob, language_key, final_response, response_lang)
+
     report.processed_output = final_response
     report.save(update_fields=["processed_output"])
 
-    ChatHistory.objects.create(
-        user=user,
-        conversation=conversation,
-        message=f"[Uploaded File] {uploaded_file.name}",
-        response=final_response,
-        language=response_lang,
+    _save_upload_message(user, conversation, uploaded_file, final_response, response_lang)
+    yield "response", {"response": final_response, "language": response_lang}
+
+
+def _process_uploaded_report(user, conversation, uploaded_file, preferred_language="", digest=None, size=None):
+    for event, data in _iter_report_events(user, conversation, uploaded_file, preferred_language, digest, size):
+        if event == "response":
+            return data["response"]
+    return ""
+
+
+def _upload_conversation(user, conversation_id):
+    if conversation_id:
+        try:
+            return Conversation.objects.get(id=conversation_id, user=user)
+        except Conversation.DoesNotExist:
+            pass
+    return Conversation.objects.create(user=user)
+
+
+@admission("upload")
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@profiled
+def upload_report_view(request):
+    user = request.user
+    uploaded_file = request.FILES.get("file")
+    conversation_id = request.data.get("conversation_id")
+    preferred_language = _normalize_preferred_language(request.data.get("preferred_language"))
+
+    if not uploaded_file:
+        return Response({"response": "Please upload a PDF or image file."}, status=400)
+    if not _is_supported_upload(uploaded_file):
+        return Response(
+            {"response": "Unsupported file type. Please upload PDF, PNG, JPG, JPEG, BMP, TIFF, or WEBP."},
+            status=400,
+        )
+
+    conversation = _upload_conversation(user, conversation_id)
+    digest, size = uploaded_file_digest(request, uploaded_file)
+    try:
+        final_response = _process_uploaded_report(user, conversation, uploaded_file, preferred_language, digest, size)
+    except LaneFull as exc:
+        return _lane_busy_response(exc)
+
+    return Response(
+        {
+            "response": final_response,
+            "conversation_id": conversation.id,
+        }
     )
 
+
+def _sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@admission("upload")
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@profiled
+def upload_report_stream_view(request):
+    # Same pipeline as upload_report_view, streamed as Server-Sent Events:
+    # "start", one "page" per extracted page, "summary", "faq", then "response".
+    user = request.user
+    uploaded_file = request.FILES.get("file")
+    conversation_id = request.data.get("conversation_id")
+    preferred_language = _normalize_preferred_language(request.data.get("preferred_language"))
+
+    if not uploaded_file:
+        return Response({"response": "Please upload a PDF or image file."}, status=400)
+    if not _is_supported_upload(uploaded_file):
+        return Response(
+            {"response": "Unsupported file type. Please upload PDF, PNG, JPG, JPEG, BMP, TIFF, or WEBP."},
+            status=400,
+        )
+
+    conversation = _upload_conversation(user, conversation_id)
+    digest, size = uploaded_file_digest(request, uploaded_file)
+
+    def stream():
+        yield _sse_event("start", {"conversation_id": conversation.id, "file": uploaded_file.name})
+        try:
+            for event, data in _iter_report_events(
+                user, conversation, uploaded_file, preferred_language, digest, size
+            ):
+                if event == "response":
+                    data = {**data, "conversation_id": conversation.id}
+                yield _sse_event(event, data)
+        except LaneFull as exc:
+            yield _sse_event("error", {**_lane_busy_payload(exc), "conversation_id": conversation.id})
+        except Exception:
+            logger.exception("Streaming upload failed for %s", uploaded_file.name)
+            yield _sse_event("error", {"response": "Report processing failed. Please try again."})
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx-style proxies from buffering the event stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _upload_session_payload(session):
+    return {
+        "upload_id": session.id,
+        "file_name": session.file_name,
+        "offset": session.received,
+        "total_size": session.total_size,
+        "status": session.status,
+        "chunk_size": settings.UPLOAD_SESSION_CHUNK_BYTES,
+    }
+
+
+# Resumable uploads: create a session, PUT raw chunks with an Upload-Offset
+# header (GET the session to learn where to resume), then finalize.
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def upload_session_create_view(request):
+    file_name = os.path.basename(str(request.data.get("file_name") or "").strip())
+    content_type = str(request.data.get("content_type") or "").strip()
+    try:
+        total_size = int(request.data.get("total_size"))
+    except (TypeError, ValueError):
+        total_size = 0
+
+    if not file_name or total_size <= 0:
+        return Response({"error": "file_name and total_size are required."}, status=400)
+    if not _is_supported_report_name(file_name, content_type):
+        return Response(
+            {"error": "Unsupported file type. Please upload PDF, PNG, JPG, JPEG, BMP, TIFF, or WEBP."},
+            status=400,
+        )
+    if total_size > settings.UPLOAD_SESSION_MAX_BYTES:
+        return Response({"error": "File is too large."}, status=413)
+
+    purge_expired_upload_sessions()
+    session = create_upload_session(request.user, file_name[:255], content_type[:100], total_size)
+    return Response(_upload_session_payload(session), status=201)
+
+
+@api_view(["GET", "DELETE"])
+@permission_classes([IsAuthenticated])
+def upload_session_view(request, upload_id):
+    try:
+        session = UploadSession.objects.get(id=upload_id, user=request.user)
+    except UploadSession.DoesNotExist:
+        return Response({"error": "Upload not found."}, status=404)
+
+    if request.method == "DELETE":
+        discard_upload_session(session)
+        session.delete()
+        return Response({"message": "Upload cancelled."}, status=200)
+    return Response(_upload_session_payload(session))
+
+
+@api_view(["PUT"])
+@permission_classes([IsAuthenticated])
+def upload_session_chunk_view(request, upload_id):
+    try:
+        offset = int(request.headers.get("Upload-Offset", request.query_params.get("offset", "")))
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return Response({"error": "Upload-Offset header is required."}, status=400)
+    if length <= 0:
+        return Response({"error": "Chunk body is empty."}, status=400)
+    if length > settings.UPLOAD_SESSION_MAX_CHUNK_BYTES:
+        return Response({"error": "Chunk is too large."}, status=413)
+
+    # The raw body is streamed to the spool file; it is never parsed or buffered.
+    session, error = append_chunk(upload_id, request.user, offset, request.stream, length)
+    if error == "not_found":
+        return Response({"error": "Upload not found."}, status=404)
+    if error == "offset_mismatch":
+        return Response({"error": "Offset does not match.", **_upload_session_payload(session)}, status=409)
+    if error == "not_active":
+        return Response({"error": "Upload already finalized.", **_upload_session_payload(session)}, status=409)
+    if error == "too_large":
+        return Response({"error": "Chunk exceeds the declared file size."}, status=413)
+    return Response(_upload_session_payload(session))
+
+
+@admission("upload")
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@profiled
+def upload_session_finalize_view(request, upload_id):
+    user = request.user
+    conversation_id = request.data.get("conversation_id")
+    preferred_language = _normalize_preferred_language(request.data.get("preferred_language"))
+
+    try:
+        session = UploadSession.objects.get(id=upload_id, user=user)
+    except UploadSession.DoesNotExist:
+        return Response({"error": "Upload not found."}, status=404)
+    if session.received != session.total_size:
+        return Response({"error": "Upload is incomplete.", **_upload_session_payload(session)}, status=409)
+    # Claim the session so a retried finalize cannot process the file twice.
+    if not UploadSession.objects.filter(id=session.id, status="active").update(status="completed"):
+        return Response({"error": "Upload already finalized."}, status=409)
+
+    try:
+        digest = session_digest(session)
+        conversation = _upload_conversation(user, conversation_id)
+        with open(spool_path(session), "rb") as handle:
+            uploaded_file = File(handle, name=session.file_name)
+            uploaded_file.content_type = session.content_type
+            final_response = _process_uploaded_report(
+                user, conversation, uploaded_file, preferred_language, digest, session.total_size
+            )
+    except LaneFull as exc:
+        UploadSession.objects.filter(id=session.id).update(status="active")
+        return _lane_busy_response(exc)
+    except Exception:
+        UploadSession.objects.filter(id=session.id).update(status="active")
+        raise
+
+    UploadSession.objects.filter(id=session.id).update(sha256=digest)
+    discard_upload_session(session)
+
     return Response(
         {
             "response": final_response,
@@ -1111,3 +1637,114 @@ def upload_report_view(request):
     )
 
 
+@admission("upload")
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@profiled
+def upload_report_batch_view(request):
+    # Several reports (e.g. photos of one multi-page report) in one request:
+    # files are extracted concurrently, then language detection, translation
+    # and FAQ matching run once over the combined text.
+    user = request.user
+    uploaded_files = request.FILES.getlist("files") or request.FILES.getlist("file")
+    conversation_id = request.data.get("conversation_id")
+    preferred_language = _normalize_preferred_language(request.data.get("preferred_language"))
+
+    if not uploaded_files:
+        return Response({"response": "Please upload at least one PDF or image file."}, status=400)
+    if len(uploaded_files) > settings.REPORT_BATCH_MAX_FILES:
+        return Response(
+            {"response": f"Please upload at most {settings.REPORT_BATCH_MAX_FILES} files at once."},
+            status=400,
+        )
+    unsupported = [f.name for f in uploaded_files if not _is_supported_upload(f)]
+    if unsupported:
+        return Response(
+            {
+                "response": "Unsupported file type. Please upload PDF, PNG, JPG, JPEG, BMP, TIFF, or WEBP.",
+                "files": unsupported,
+            },
+            status=400,
+        )
+
+    conversation = _upload_conversation(user, conversation_id)
+
+    entries = []
+    for uploaded_file in uploaded_files:
+        digest, size = uploaded_file_digest(request, uploaded_file)
+        blob = find_report_blob(digest)
+        entry = {"file": uploaded_file, "digest": digest, "size": size, "blob": blob, "text": ""}
+        cached_text = cached_extracted_text(blob, preferred_language or "auto")
+        _count_cache("extraction", cached_text)
+        if cached_text:
+            increment("blob_hits")
+            entry["text"] = cached_text
+        entries.append(entry)
+
+    # Files are extracted concurrently on the OCR lane. Only the first file is
+    # admission-checked; once admitted, the rest of the batch waits for slots.
+    pending = [entry for entry in entries if not entry["text"]]
+    futures = []
+    try:
+        for entry in pending:
+            futures.append(submit_report_extraction(entry["file"], preferred_language, block=bool(futures)))
+    except LaneFull as exc:
+        return _lane_busy_response(exc)
+    for entry, future in zip(pending, futures):
+        try:
+            entry["text"] = _join_page_texts(report_extraction_result(future))
+        except Exception:
+            entry["text"] = ""
+
+    readable = [entry for entry in entries if entry["text"] and entry["text"] != "__TESSERACT_NOT_FOUND__"]
+    file_names = ", ".join(entry["file"].name for entry in entries)
+    message = f"[Uploaded Files] {file_names}"
+
+    if not readable:
+        if any(entry["text"] == "__TESSERACT_NOT_FOUND__" for entry in entries):
+            response_text = (
+                "OCR engine not found for image reading. "
+                "Install Tesseract OCR and set TESSERACT_CMD or add tesseract to PATH."
+            )
+        else:
+            response_text = "I could not read text from these files. Please upload clear PDFs/images."
+        response_lang = preferred_language or "en"
+        final_response = translate_back(response_text, response_lang)
+        add_chat_message(user, conversation, message, final_response, response_lang)
+        return Response({"response": final_response, "conversation_id": conversation.id})
+
+    # Give every file an equal share of the text window that translation and
+    # FAQ matching look at (with the joining newlines), so later files are not
+    # cut off by earlier ones.
+    share = (REPORT_MATCH_CHARS - (len(readable) - 1)) // len(readable)
+    combined_text = "\n".join(entry["text"][:share] for entry in readable)
+    final_response, response_lang = _build_report_response(combined_text, preferred_language)
+
+    for entry in readable:
+        uploaded_file = entry["file"]
+        try:
+            uploaded_file.seek(0)
+        except Exception:
+            pass
+        blob = entry["blob"] or store_report_blob(uploaded_file, entry["digest"], entry["size"])
+        remember_extracted_text(blob, preferred_language or "auto", entry["text"][:10000])
+        UploadedReport.objects.create(
+            user=user,
+            blob=blob,
+            file=blob.file.name,
+            extracted_text=entry["text"][:10000],
+            processed_output=final_response,
+        )
+
+    add_chat_message(user, conversation, message, final_response, response_lang)
+
+    return Response(
+        {
+            "response": final_response,
+            "conversation_id": conversation.id,
+            "files": [
+                {"name": entry["file"].name, "readable": entry in readable}
+                for entry in entries
+            ],
+        }
+    )
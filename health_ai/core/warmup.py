@@ -0,0 +1,151 @@
+import importlib
+import logging
+import os
+import time
+
+from django.conf import settings
+
+from .metrics import observe
+
+# Startup warm-up. A freshly started worker otherwise pays, on its first
+# requests, for loading the URLconf (views, DRF), the lazily imported PDF/OCR/
+# TTS/Google libraries, the Groq client, Tesseract language discovery, the FAQ
+# file, Google's signing keys and the OCR lane's spawned processes. warm_up()
+# does that work up front and records what each component cost; it runs from
+# gunicorn's post_worker_init (gunicorn.conf.py) or AppConfig.ready
+# (WARMUP_ON_READY).
+# The cost of each run is logged on "core.warmup", exported as
+# warmup_duration_seconds and shown at /api/health/lanes/.
+
+logger = logging.getLogger("core.warmup")
+
+# Imported lazily by the views and OCR code.
+WARM_IMPORTS = (
+    "PIL.Image",
+    "pdfplumber",
+    "pypdfium2",
+    "pytesseract",
+    "tesserocr",
+    "gtts",
+    "google.auth.jwt",
+    "core.ocr_preprocess",
+)
+
+last_report = None
+
+
+def _warm_urls():
+    from django.urls import get_resolver
+    return f"{len(get_resolver().url_patterns)} patterns"
+
+
+def _warm_import(module):
+    try:
+        importlib.import_module(module)
+    except ImportError:
+        return "not installed"
+    return ""
+
+
+def _warm_groq():
+    from . import groq_service, translation
+    translation._get_client()
+    if groq_service._get_client() is None:
+        return "no client (GROQ_API_KEY unset)"
+    return ""
+
+
+def _warm_ocr():
+    from . import ocr_backend
+    if not ocr_backend.warm_up(settings.OCR_PRELOAD_LANGUAGES):
+        return "OCR backend not available"
+    return f"{ocr_backend.get_backend().name}, {len(ocr_backend.available_languages())} languages"
+
+
+def _warm_faqs():
+    from .json_search import _search_faq_json, load_faqs
+    faqs = load_faqs()
+    # Compiles the tokenizer's patterns.
+    _search_faq_json("fever and headache")
+    return f"{len(faqs)} FAQs"
+
+
+def _warm_google_certs():
+    if not settings.GOOGLE_CLIENT_IDS:
+        return "Google sign-in not configured"
+    from .google_auth import prefetch_certs
+    return f"{len(prefetch_certs()['keys'])} signing keys"
+
+
+def warm_lane_process():
+    # Runs in an OCR lane process (already set up by its initializer).
+    return warm_up(["imports", "ocr"])
+
+
+def _warm_ocr_lane():
+    from .lanes import _inline_ocr, _page_queue, ocr_lane
+    if _inline_ocr:
+        return "inline OCR"
+    lane = ocr_lane()
+    # Starts the manager behind streamed uploads' page queues.
+    _page_queue()
+    # One job per worker makes the pool start all of its processes now.
+    futures = [lane._get_executor().submit(warm_lane_process) for _ in range(lane.workers)]
+    reports = [future.result() for future in futures]
+    return (
+        f"{lane.workers} processes started, {len({report['pid'] for report in reports})} warmed, "
+        f"slowest {max(report['total_ms'] for report in reports):.1f} ms"
+    )
+
+
+COMPONENTS = {
+    "urls": _warm_urls,
+    "imports": None,
+    "groq": _warm_groq,
+    "ocr": _warm_ocr,
+    "faqs": _warm_faqs,
+    "google_certs": _warm_google_certs,
+    "ocr_lane": _warm_ocr_lane,
+}
+
+
+def _steps(components):
+    for name in components:
+        if name == "imports":
+            for module in WARM_IMPORTS:
+                yield f"import:{module}", lambda module=module: _warm_import(module)
+        elif COMPONENTS.get(name) is not None:
+            yield name, COMPONENTS[name]
+        else:
+            logger.warning("Unknown warm-up component %r", name)
+
+
+def warm_up(components=None):
+    global last_report
+    if components is None:
+        components = settings.WARMUP_COMPONENTS
+    started = time.perf_counter()
+    results = []
+    for name, warm in _steps(components):
+        step_started = time.perf_counter()
+        try:
+            detail, ok = warm() or "", True
+        except Exception as exc:
+            detail, ok = f"{type(exc).__name__}: {exc}", False
+        elapsed = time.perf_counter() - step_started
+        observe("warmup_duration_seconds", elapsed, component=name)
+        results.append({"component": name, "ms": round(elapsed * 1000, 1), "ok": ok, "detail": detail})
+        logger.log(
+            logging.INFO if ok else logging.WARNING,
+            "warm-up %s: %.1f ms%s (pid %d)", name, elapsed * 1000, f", {detail}" if detail else "", os.getpid(),
+        )
+
+    total_ms = round((time.perf_counter() - started) * 1000, 1)
+    report = {"pid": os.getpid(), "finished_at": time.time(), "total_ms": total_ms, "components": results}
+    budget = settings.WARMUP_BUDGET_MS
+    if budget and total_ms > budget:
+        logger.warning("warm-up took %.1f ms, over the %d ms budget (pid %d)", total_ms, budget, os.getpid())
+    else:
+        logger.info("warm-up finished in %.1f ms (pid %d)", total_ms, os.getpid())
+    last_report = report
+    return report
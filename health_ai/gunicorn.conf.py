@@ -0,0 +1,12 @@
+# gunicorn reads this file from the working directory (see Procfile).
+
+
+def post_worker_init(worker):
+    # Runs once the worker has loaded the app and before it accepts requests,
+    # so its first requests do not pay for imports, clients and OCR processes.
+    # (post_fork is too early: Django is not set up yet in the worker.)
+    from django.conf import settings
+
+    if settings.WARMUP_ON_STARTUP:
+        from core.warmup import warm_up
+        warm_up()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 import dj_database_url
@@ -103,12 +104,45 @@ WSGI_APPLICATION = 'health_ai.wsgi.application'
 #         'PORT': '5432',
 #     }
 # }
+# Persistent connections: each worker reuses its connection for DB_CONN_MAX_AGE
+# seconds and checks it is still alive before reusing it.
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "600"))
 DATABASES = {
-    'default': dj_database_url.parse(os.getenv("DATABASE_URL"))
+    'default': dj_database_url.parse(
+        os.getenv("DATABASE_URL"),
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=True,
+    )
 }
+
+# Optional read replica. Views marked @replica_reads (core/db_router.py) read
+# from it; writes, and a user's reads for DATABASE_REPLICA_PIN_SECONDS after
+# they wrote, stay on the primary.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL", "").strip()
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv("DATABASE_REPLICA_PIN_SECONDS", "10"))
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=True,
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['core.db_router.ReadReplicaRouter']
+
+# The read-after-write pins live in the default cache, which every web worker
+# must share. CACHE_URL=redis://... uses Redis (needs the `redis` package);
+# otherwise, with a replica configured, pins are kept in a table on the
+# primary (create it with `python manage.py createcachetable`).
+CACHE_URL = os.getenv("CACHE_URL", "").strip()
+if CACHE_URL.startswith(("redis://", "rediss://")):
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": CACHE_URL}}
+elif DATABASE_REPLICA_URL:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "django_cache"}}
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
-MIDDLEWARE.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")
+MIDDLEWARE.insert(1, "core.middleware.AsyncWhiteNoiseMiddleware")
+MIDDLEWARE.insert(0, "core.middleware.ServerTimingMiddleware")
+MIDDLEWARE.append("core.db_router.PrimaryPinMiddleware")
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -148,6 +182,7 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_EXPOSE_HEADERS = ["Server-Timing", "Retry-After"]
 AUTH_USER_MODEL = 'core.User'
 
 from datetime import timedelta
@@ -165,6 +200,162 @@ SIMPLE_JWT = {
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are hashed while streaming in so identical reports are stored once.
+FILE_UPLOAD_HANDLERS = [
+    'core.report_store.ContentHashUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Resumable chunked uploads are spooled here (outside MEDIA_ROOT and the
+# source tree) until finalized.
+UPLOAD_SESSION_DIR = os.getenv(
+    "UPLOAD_SESSION_DIR", os.path.join(tempfile.gettempdir(), "health_ai", "upload_sessions")
+)
+UPLOAD_SESSION_MAX_BYTES = int(os.getenv("UPLOAD_SESSION_MAX_BYTES", str(50 * 1024 * 1024)))
+UPLOAD_SESSION_CHUNK_BYTES = int(os.getenv("UPLOAD_SESSION_CHUNK_BYTES", str(1024 * 1024)))
+UPLOAD_SESSION_MAX_CHUNK_BYTES = int(os.getenv("UPLOAD_SESSION_MAX_CHUNK_BYTES", str(8 * 1024 * 1024)))
+UPLOAD_SESSION_TTL_HOURS = int(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+
+# Batch uploads: at most this many files per request, extracted on the OCR lane.
+REPORT_BATCH_MAX_FILES = int(os.getenv("REPORT_BATCH_MAX_FILES", "10"))
+
+# Execution lanes (core/lanes.py), per web process. Report extraction runs in a
+# pool of OCR_LANE_WORKERS processes (0 = in the request thread) with at most
+# OCR_LANE_QUEUE more reports waiting; chat/LLM work runs on CHAT_LANE_WORKERS
+# threads. Work beyond a full lane is answered 503 with Retry-After.
+OCR_LANE_WORKERS = int(os.getenv("OCR_LANE_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+OCR_LANE_QUEUE = int(os.getenv("OCR_LANE_QUEUE", "8"))
+CHAT_LANE_WORKERS = int(os.getenv("CHAT_LANE_WORKERS", "64"))
+CHAT_LANE_QUEUE = int(os.getenv("CHAT_LANE_QUEUE", "256"))
+LANE_RETRY_AFTER_SECONDS = int(os.getenv("LANE_RETRY_AFTER_SECONDS", "5"))
+
+# Admission control (core/admission.py), per web process and endpoint class
+# ("chat": send/edit, "upload": report uploads). At most *_CONCURRENCY requests
+# run at once; others wait up to *_MAX_WAIT_MS for a slot, or are shed at once
+# (503) when recent service times say they would not get one. Each user also
+# gets a token bucket of *_BURST requests refilled at *_RATE_PER_MIN (429).
+# Above ADMISSION_DEGRADE_AT of chat capacity, voice replies skip TTS.
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_CHAT_CONCURRENCY = int(os.getenv("ADMISSION_CHAT_CONCURRENCY", "12"))
+ADMISSION_CHAT_MAX_WAIT_MS = int(os.getenv("ADMISSION_CHAT_MAX_WAIT_MS", "2000"))
+ADMISSION_CHAT_RATE_PER_MIN = float(os.getenv("ADMISSION_CHAT_RATE_PER_MIN", "30"))
+ADMISSION_CHAT_BURST = int(os.getenv("ADMISSION_CHAT_BURST", "10"))
+ADMISSION_UPLOAD_CONCURRENCY = int(os.getenv("ADMISSION_UPLOAD_CONCURRENCY", "4"))
+ADMISSION_UPLOAD_MAX_WAIT_MS = int(os.getenv("ADMISSION_UPLOAD_MAX_WAIT_MS", "5000"))
+ADMISSION_UPLOAD_RATE_PER_MIN = float(os.getenv("ADMISSION_UPLOAD_RATE_PER_MIN", "6"))
+ADMISSION_UPLOAD_BURST = int(os.getenv("ADMISSION_UPLOAD_BURST", "5"))
+ADMISSION_DEGRADE_AT = float(os.getenv("ADMISSION_DEGRADE_AT", "0.75"))
+
+# Per-stage request timings (detect_language, faq_search, translate_back, tts,
+# OCR, rasterize, db_read/db_write, ...) go to a Server-Timing header and to one
+# JSON record per request on the "core.timing" logger.
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "true").lower() == "true"
+REQUEST_TIMING_LOG_LEVEL = os.getenv("REQUEST_TIMING_LOG_LEVEL", "INFO").upper()
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "core.timing": {
+            "handlers": ["console"],
+            "level": REQUEST_TIMING_LOG_LEVEL,
+            "propagate": False,
+        },
+        "core.warmup": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
+# Prometheus metrics at /api/metrics/ (disabled unless METRICS_TOKEN is set;
+# scrape with "Authorization: Bearer <token>"). With several worker processes,
+# point METRICS_DIR at a directory they share (empty it on deploy) so the
+# endpoint reports all of them; each process writes its file at most every
+# METRICS_FLUSH_SECONDS.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+# Worker warm-up (core/warmup.py): WARMUP_COMPONENTS are loaded when a worker
+# starts, before it takes requests - from gunicorn's post_worker_init
+# (gunicorn.conf.py) when WARMUP_ON_STARTUP is set, and from AppConfig.ready in
+# every process (runserver, management commands) with WARMUP_ON_READY.
+# Components: urls, imports, groq, ocr, faqs, google_certs, ocr_lane (starts
+# the OCR lane processes and warms imports/OCR in them). A warm-up slower than
+# WARMUP_BUDGET_MS is logged as a warning; `manage.py startup_report` measures
+# the whole cold start, with import times.
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+WARMUP_ON_READY = os.getenv("WARMUP_ON_READY", "false").lower() == "true"
+WARMUP_COMPONENTS = [
+    v.strip() for v in os.getenv("WARMUP_COMPONENTS", "urls,imports,groq,faqs,google_certs,ocr_lane").split(",") if v.strip()
+]
+WARMUP_BUDGET_MS = int(os.getenv("WARMUP_BUDGET_MS", "5000"))
+
+# Sampling profiler for the chat/upload views: a staff user's request with
+# "X-Profile: 1" is profiled, as is a random PROFILE_SAMPLE_RATE fraction of all
+# requests. The newest PROFILE_RING_SIZE profiles are kept in PROFILE_DIR and
+# listed/downloaded at /api/health/profiles/ (staff only).
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_RING_SIZE = int(os.getenv("PROFILE_RING_SIZE", "50"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "health_ai", "profiles"))
+
+# Local stand-ins for Groq, gTTS and Tesseract (core/stubs.py) with the given
+# per-call latency, for load tests (`manage.py loadtest`) and offline runs.
+BACKEND_STUBS = os.getenv("BACKEND_STUBS", "false").lower() == "true"
+STUB_LLM_LATENCY_MS = float(os.getenv("STUB_LLM_LATENCY_MS", "300"))
+STUB_TTS_LATENCY_MS = float(os.getenv("STUB_TTS_LATENCY_MS", "400"))
+STUB_OCR_LATENCY_MS = float(os.getenv("STUB_OCR_LATENCY_MS", "150"))
+STUB_LATENCY_JITTER = float(os.getenv("STUB_LATENCY_JITTER", "0.25"))
+
+# Record/replay of the language-detection and translation LLM calls
+# (core/llm_cassette.py): "replay" answers only from the cassette file,
+# "record" calls Groq for requests it does not have yet and saves them.
+LLM_CASSETTE = os.getenv("LLM_CASSETTE", "")
+LLM_CASSETTE_MODE = os.getenv("LLM_CASSETTE_MODE", "replay").strip().lower()
+
+# Serve chat/ and chat/<id>/edit/ with the async views (core/async_views.py).
+# Set by the ASGI profile (Procfile.asgi); under WSGI the sync views are faster.
+ASYNC_CHAT_VIEWS = os.getenv("ASYNC_CHAT_VIEWS", "false").strip().lower() in {"1", "true", "yes"}
+
+# OCR engine: "auto" prefers in-process tesserocr and falls back to pytesseract;
+# "stub" is the load-test stand-in (also used whenever BACKEND_STUBS is set).
+OCR_BACKEND = os.getenv("OCR_BACKEND", "auto").strip().lower()
+OCR_WARM_ON_STARTUP = os.getenv("OCR_WARM_ON_STARTUP", "false").lower() == "true"
+OCR_PRELOAD_LANGUAGES = [
+    v.strip() for v in os.getenv("OCR_PRELOAD_LANGUAGES", "eng,hin+eng,guj+eng").split(",") if v.strip()
+]
+
+# Pages are deskewed, cropped to their text area and OCR'd in tiles of at most
+# this many pixels; pages with glyphs shorter than OCR_SMALL_GLYPH_PX are upscaled.
+OCR_TILE_MAX_PIXELS = int(os.getenv("OCR_TILE_MAX_PIXELS", "6000000"))
+OCR_SMALL_GLYPH_PX = int(os.getenv("OCR_SMALL_GLYPH_PX", "24"))
+
+# Image uploads are rotated by Tesseract's orientation guess only when its
+# confidence reaches this; low-confidence guesses leave the image upright.
+OCR_OSD_MIN_ORIENT_CONF = float(os.getenv("OCR_OSD_MIN_ORIENT_CONF", "3.0"))
+
+# Scanned PDF pages: "auto" renders with pypdfium2 (grayscale) and falls back to
+# pdfplumber. DPI adapts to page size and measured text line height.
+PDF_RASTERIZER = os.getenv("PDF_RASTERIZER", "auto").strip().lower()
+PDF_RASTER_MIN_DPI = int(os.getenv("PDF_RASTER_MIN_DPI", "150"))
+PDF_RASTER_MAX_DPI = int(os.getenv("PDF_RASTER_MAX_DPI", "300"))
+PDF_RASTER_TARGET_LINE_PX = int(os.getenv("PDF_RASTER_TARGET_LINE_PX", "32"))
+PDF_RASTER_MAX_PIXELS = int(os.getenv("PDF_RASTER_MAX_PIXELS", "9000000"))
+
+# PDFs with more pages than this are processed in large-document mode: pages are
+# ranked by medical-marker density and only the best ones are OCR'd, within an
+# OCR page budget and a character budget.
+PDF_LARGE_DOC_PAGES = int(os.getenv("PDF_LARGE_DOC_PAGES", "8"))
+PDF_LARGE_DOC_MAX_OCR_PAGES = int(os.getenv("PDF_LARGE_DOC_MAX_OCR_PAGES", "6"))
+PDF_LARGE_DOC_MAX_CHARS = int(os.getenv("PDF_LARGE_DOC_MAX_CHARS", "10000"))
+
 # Google OAuth (Google Identity Services)
 GOOGLE_CLIENT_ID = (
     os.environ.get("GOOGLE_CLIENT_ID")
@@ -182,3 +373,10 @@ _google_ios_client_id = os.environ.get("GOOGLE_IOS_CLIENT_ID", "").strip()
 for _candidate in (GOOGLE_CLIENT_ID, _google_android_client_id, _google_ios_client_id):
     if _candidate and _candidate not in GOOGLE_CLIENT_IDS:
         GOOGLE_CLIENT_IDS.append(_candidate)
+
+# Google ID tokens are verified against signing keys from GOOGLE_CERTS_URL (a
+# JWKS or Google's {kid: PEM} map), cached per process for the response's
+# Cache-Control max-age (core/google_auth.py). Point it at a local file or
+# server to test logins without Google.
+GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+GOOGLE_CERTS_TIMEOUT = float(os.getenv("GOOGLE_CERTS_TIMEOUT", "5"))
@@ -538,7 +538,7 @@ export default function App() {
   const refreshConversations = useCallback(async () => {
     if (!user) return;
     const data = await getConversations();
-    setConversations(data || []);
+    setConversations(data?.results || []);
   }, [user]);
 
   const normalizeQuestion = useCallback(
@@ -583,10 +583,14 @@ export default function App() {
     }
 
     try {
-      const convs = await getConversations();
-      const limited = (convs || []).slice(0, 30);
+      const page = await getConversations(null, 30);
+      const limited = page?.results || [];
       const histories = await Promise.all(
-        limited.map((conv) => getConversation(conv.id).catch(() => [])),
+        limited.map((conv) =>
+          getConversation(conv.id)
+            .then((page) => page?.results || [])
+            .catch(() => []),
+        ),
       );
 
       const groups = [];
@@ -638,7 +642,7 @@ export default function App() {
       return;
     }
     const data = await getConversation(id);
-    setMessages(data || []);
+    setMessages(data?.results || []);
     shouldAutoScrollRef.current = true;
     setHistoryOpen(false);
   }, []);
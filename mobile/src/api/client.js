@@ -65,6 +65,7 @@ async function request(path, options = {}, requireAuth = true) {
       rawText &&
       (rawText.startsWith('<!DOCTYPE') || rawText.startsWith('<html'));
     const errorMessage =
+      (data && data.retry_after && data.response) ||
       (data && (data.error || data.detail)) ||
       (htmlError ? 'Backend returned an HTML error page. Check Django server logs and host settings.' : '') ||
       rawText ||
@@ -132,12 +133,22 @@ export async function updateCurrentUser(profile) {
   });
 }
 
-export async function getConversations() {
-  return request('conversations/');
+// Returns one page: { results, next_cursor }. Pass next_cursor back to get the next page.
+export async function getConversations(cursor = null, limit = null) {
+  const params = [];
+  if (cursor) params.push(`cursor=${encodeURIComponent(cursor)}`);
+  if (limit) params.push(`limit=${limit}`);
+  return request(`conversations/${params.length ? `?${params.join('&')}` : ''}`);
 }
 
-export async function getConversation(conversationId) {
-  return request(`conversation/${conversationId}/`);
+// Returns { results, next_cursor, has_more }; `before` pages back through older
+// messages, `since` fetches only messages newer than that chat id.
+export async function getConversation(conversationId, { before = null, since = null, limit = null } = {}) {
+  const params = [];
+  if (before) params.push(`before=${before}`);
+  if (since) params.push(`since=${since}`);
+  if (limit) params.push(`limit=${limit}`);
+  return request(`conversation/${conversationId}/${params.length ? `?${params.join('&')}` : ''}`);
 }
 
 export async function sendMessage(message, conversationId, preferredLanguage = '') {